@@ -1,10 +1,24 @@
 #!/usr/bin/env python3
-"""ECUB UDP gateway - forwards datagrams from NET1 to NET2 without modification."""
+"""ECUB UDP gateway - forwards datagrams from NET1 to NET2 without modification.
+
+With BATCH_SIZE > 1 the gateway forwards in batches: up to BATCH_SIZE datagrams are received with one recvmmsg call and sent with
+one sendmmsg call. Where libc has no recvmmsg/sendmmsg (e.g. macOS, when run as the external ECU), the batches are received and sent
+with one call per datagram instead.
+
+Datagrams are received into buffers allocated at startup, and sent from memoryviews of them, so forwarding does not copy or allocate
+per datagram.
+
+The datagrams are counted per frame_id, up to STATS_MAX_FRAME_IDS frame ids, and a summary is logged every STATS_INTERVAL seconds, on
+SIGUSR1 and at exit. Single datagrams are only logged with LOG_SAMPLE > 0, every LOG_SAMPLE:th datagram, at debug level.
+"""
 
 from __future__ import annotations
 
+import ctypes
+import errno
 import logging
 import os
+import select
 import signal
 import socket
 import struct
@@ -16,9 +30,17 @@ SEND_BIND_HOST = os.environ.get("SEND_BIND_HOST", "172.41.0.1")
 SEND_BIND_PORT = int(os.environ.get("SEND_BIND_PORT", "4321"))
 SEND_HOST = os.environ.get("SEND_HOST", "172.41.0.2")
 SEND_PORT = int(os.environ.get("SEND_PORT", "4321"))
+BATCH_SIZE = max(1, int(os.environ.get("BATCH_SIZE", "1")))
+STATS_INTERVAL = float(os.environ.get("STATS_INTERVAL", "10"))  # 0 logs the stats on SIGUSR1 and at exit only
+LOG_SAMPLE = int(os.environ.get("LOG_SAMPLE", "0"))
 
 RECV_BUF_SIZE = 65535
-HEADER_SIZE = 8  # 4 bytes frame_id + 4 bytes payload_len
+HEADER = struct.Struct("!II")  # 4 bytes frame_id + 4 bytes payload_len
+HEADER_SIZE = HEADER.size
+POLL_TIMEOUT = 1.0
+SOCKADDR_IN_SIZE = 16
+STATS_FRAMES = 10  # frame ids in a stats summary, by number of packets
+STATS_MAX_FRAME_IDS = 1024  # frame ids counted separately, the datagrams of any further frame ids are counted as other
 
 logging.basicConfig(
     level=getattr(logging, os.environ.get("LOG_LEVEL", "INFO").upper(), logging.INFO),
@@ -53,44 +75,331 @@ def _bind_with_retry(sock, host, port, retries=5, delay=2.0):
                 raise
 
 
-def main() -> None:
-    recv_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+def _log_datagram(counter, addr, buffer, size):
+    if size >= HEADER_SIZE:
+        frame_id, payload_len = HEADER.unpack_from(buffer)
+        logger.debug("#%d from %s:%d frame_id=0x%03X payload_len=%d total=%d", counter, addr[0], addr[1], frame_id, payload_len, size)
+    else:
+        logger.debug("#%d from %s:%d raw_len=%d (short packet)", counter, addr[0], addr[1], size)
+
+
+class FrameStats:
+    """Counters of the datagrams of one frame_id. jitter is the smoothed variation of their inter-arrival times, as in RFC 3550.
+
+    Without an arrival time, as now=None, a datagram is counted but not included in the jitter.
+    """
+
+    __slots__ = ("packets", "bytes", "min_payload_len", "max_payload_len", "jitter", "_arrival", "_interval")
+
+    def __init__(self):
+        self.packets = 0
+        self.bytes = 0
+        self.min_payload_len = None
+        self.max_payload_len = None
+        self.jitter = 0.0
+        self._arrival = None
+        self._interval = None
+
+    def add(self, size, payload_len, now):
+        self.packets += 1
+        self.bytes += size
+        if self.min_payload_len is None or payload_len < self.min_payload_len:
+            self.min_payload_len = payload_len
+        if self.max_payload_len is None or payload_len > self.max_payload_len:
+            self.max_payload_len = payload_len
+        if now is None:
+            return
+        if self._arrival is not None:
+            interval = now - self._arrival
+            if self._interval is not None:
+                self.jitter += (abs(interval - self._interval) - self.jitter) / 16
+            self._interval = interval
+        self._arrival = now
+
+
+class GatewayStats:
+    """Counters of the forwarded datagrams by frame_id, and of short packets, without a frame header.
+
+    At most STATS_MAX_FRAME_IDS frame ids are counted separately, so that datagrams with arbitrary frame ids cannot grow the counters
+    without bound. The datagrams of any further frame ids are counted together as other.
+
+    The arrival time of a datagram is the time of the receive call. The datagrams of a batch are received with one call, so there is
+    no jitter with jitter=False, as for batched forwarding.
+    """
+
+    def __init__(self, interval, jitter=True):
+        self.interval = interval
+        self.jitter = jitter
+        self.frames = {}
+        self.other = FrameStats()
+        self.short_packets = 0
+        self.reported_at = time.monotonic()
+        self.reported_packets = 0
+        self.requested = False
 
+    def request(self, *_):
+        """Log the summary with the next report, e.g. on SIGUSR1."""
+        self.requested = True
+
+    def add(self, buffer, size, now):
+        if size < HEADER_SIZE:
+            self.short_packets += 1
+            return
+        frame_id, payload_len = HEADER.unpack_from(buffer)
+        stats = self.frames.get(frame_id)
+        if stats is None:
+            if len(self.frames) >= STATS_MAX_FRAME_IDS:
+                # the inter-arrival times of different frame ids are no jitter
+                self.other.add(size, payload_len, None)
+                return
+            stats = self.frames[frame_id] = FrameStats()
+        stats.add(size, payload_len, now if self.jitter else None)
+
+    def report(self, forwarded, now):
+        """Log the summary if it is requested, or due and there are new datagrams."""
+        due = self.interval > 0 and now - self.reported_at >= self.interval and forwarded > self.reported_packets
+        if self.requested or due:
+            self.requested = False
+            self.log(forwarded, now)
+
+    def log(self, forwarded, now):
+        elapsed = now - self.reported_at
+        rate = (forwarded - self.reported_packets) / elapsed if elapsed > 0 else 0.0
+        logger.info("Forwarded %d datagrams (%.0f/s), %d short, %d frame ids", forwarded, rate, self.short_packets, len(self.frames))
+        busiest = sorted(self.frames.items(), key=lambda item: item[1].packets, reverse=True)
+        for frame_id, stats in busiest[:STATS_FRAMES]:
+            jitter = f" jitter={stats.jitter * 1000:.3f}ms" if self.jitter else ""
+            logger.info("  frame_id=0x%03X %s%s", frame_id, self._counters(stats), jitter)
+        if self.other.packets:
+            logger.info("  other frame ids %s", self._counters(self.other))
+        self.reported_at = now
+        self.reported_packets = forwarded
+
+    @staticmethod
+    def _counters(stats):
+        return f"packets={stats.packets} bytes={stats.bytes} payload_len={stats.min_payload_len}..{stats.max_payload_len}"
+
+
+def _buffers(count):
+    """Preallocate count receive buffers, as memoryviews of one bytearray."""
+    view = memoryview(bytearray(count * RECV_BUF_SIZE))
+    return [view[i * RECV_BUF_SIZE : (i + 1) * RECV_BUF_SIZE] for i in range(count)]
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+def _load_mmsg():
+    """Return libc if it has recvmmsg and sendmmsg, else None."""
     try:
-        _bind_with_retry(recv_sock, LISTEN_HOST, LISTEN_PORT)
-        recv_sock.settimeout(1.0)
+        libc = ctypes.CDLL(None, use_errno=True)
+        recvmmsg, sendmmsg = libc.recvmmsg, libc.sendmmsg
+    except (OSError, AttributeError, TypeError):
+        return None
+    recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+    recvmmsg.restype = ctypes.c_int
+    sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    sendmmsg.restype = ctypes.c_int
+    return libc
 
-        _bind_with_retry(send_sock, SEND_BIND_HOST, SEND_BIND_PORT)
 
-        dest = (SEND_HOST, SEND_PORT)
+def _sockaddr_in(host, port):
+    address = (ctypes.c_char * SOCKADDR_IN_SIZE)()
+    struct.pack_into("=H", address, 0, socket.AF_INET)
+    struct.pack_into("!H4s", address, 2, port, socket.inet_aton(host))
+    return address
+
+
+class MmsgBatch:
+    """Receives up to size datagrams with one recvmmsg call, into preallocated buffers, and sends them with one sendmmsg call."""
+
+    def __init__(self, libc, size, dest):
+        self.libc = libc
+        self.size = size
+        self.buffers = (ctypes.c_char * RECV_BUF_SIZE * size)()
+        self.views = [memoryview(buffer).cast("B") for buffer in self.buffers]
+        self.senders = (ctypes.c_char * SOCKADDR_IN_SIZE * size)()
+        self.dest = _sockaddr_in(*dest)
+        self.recv_iov = (_IOVec * size)()
+        self.send_iov = (_IOVec * size)()
+        self.recv_msgs = (_MMsgHdr * size)()
+        self.send_msgs = (_MMsgHdr * size)()
+        for i in range(size):
+            self.recv_iov[i].iov_base = self.send_iov[i].iov_base = ctypes.addressof(self.buffers[i])
+            self.recv_iov[i].iov_len = RECV_BUF_SIZE
+            self._init_msg(self.recv_msgs[i].msg_hdr, self.senders[i], self.recv_iov, i)
+            self._init_msg(self.send_msgs[i].msg_hdr, self.dest, self.send_iov, i)
+
+    @staticmethod
+    def _init_msg(hdr, name, iov, i):
+        hdr.msg_name = ctypes.addressof(name)
+        # the kernel sets the length of the sender address, which is always a sockaddr_in on an AF_INET socket
+        hdr.msg_namelen = SOCKADDR_IN_SIZE
+        hdr.msg_iov = ctypes.pointer(iov[i])
+        hdr.msg_iovlen = 1
+
+    def receive(self, sock):
+        count = self.libc.recvmmsg(sock.fileno(), self.recv_msgs, self.size, socket.MSG_DONTWAIT, None)
+        if count < 0:
+            err = ctypes.get_errno()
+            if err in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                return 0
+            raise OSError(err, os.strerror(err))
+        return count
+
+    def send(self, sock, count):
+        for i in range(count):
+            self.send_iov[i].iov_len = self.recv_msgs[i].msg_len
+        sent = 0
+        while sent < count:
+            # sendmmsg may send fewer datagrams than given, the rest are sent with the next call
+            msgs = ctypes.cast(ctypes.byref(self.send_msgs, sent * ctypes.sizeof(_MMsgHdr)), ctypes.POINTER(_MMsgHdr))
+            result = self.libc.sendmmsg(sock.fileno(), msgs, count - sent, 0)
+            if result < 0:
+                err = ctypes.get_errno()
+                if err == errno.EINTR:
+                    continue
+                raise OSError(err, os.strerror(err))
+            sent += result
+
+    def datagram(self, i):
+        return self.views[i], self.recv_msgs[i].msg_len
+
+    def sender(self, i):
+        sender = bytes(self.senders[i])
+        return socket.inet_ntoa(sender[4:8]), struct.unpack("!H", sender[2:4])[0]
+
+
+class LoopBatch:
+    """Receives up to size datagrams with one recvfrom_into call each, into preallocated buffers, and sends them with one sendto each."""
+
+    def __init__(self, size, dest):
+        self.size = size
+        self.dest = dest
+        self.buffers = _buffers(size)
+        self.sizes = [0] * size
+        self.senders = [None] * size
+
+    def receive(self, sock):
+        count = 0
+        while count < self.size:
+            try:
+                self.sizes[count], self.senders[count] = sock.recvfrom_into(self.buffers[count])
+            except (BlockingIOError, InterruptedError):
+                break
+            count += 1
+        return count
+
+    def send(self, sock, count):
+        for i in range(count):
+            sock.sendto(self.buffers[i][: self.sizes[i]], self.dest)
+
+    def datagram(self, i):
+        return self.buffers[i], self.sizes[i]
+
+    def sender(self, i):
+        return self.senders[i]
 
-        logger.info(
-            "ECUB gateway started: listening on %s:%d, forwarding to %s:%d (from %s:%d)",
-            LISTEN_HOST, LISTEN_PORT, SEND_HOST, SEND_PORT, SEND_BIND_HOST, SEND_BIND_PORT,
-        )
 
-        counter = 0
+class Gateway:
+    def __init__(self, recv_sock, send_sock, dest):
+        self.recv_sock = recv_sock
+        self.send_sock = send_sock
+        self.dest = dest
+        self.counter = 0
+        self.stats = GatewayStats(STATS_INTERVAL, jitter=BATCH_SIZE == 1)
+
+    def forward(self):
+        self.recv_sock.settimeout(POLL_TIMEOUT)
+        buffer = _buffers(1)[0]
         while running:
             try:
-                data, addr = recv_sock.recvfrom(RECV_BUF_SIZE)
+                size, addr = self.recv_sock.recvfrom_into(buffer)
             except socket.timeout:
+                self.stats.report(self.counter, time.monotonic())
                 continue
 
-            send_sock.sendto(data, dest)
+            self.send_sock.sendto(buffer[:size], self.dest)
+            now = time.monotonic()
+            self.stats.add(buffer, size, now)
+            if LOG_SAMPLE and self.counter % LOG_SAMPLE == 0:
+                _log_datagram(self.counter, addr, buffer, size)
+            self.counter += 1
+            self.stats.report(self.counter, now)
 
-            if len(data) >= HEADER_SIZE:
-                frame_id, payload_len = struct.unpack("!II", data[:HEADER_SIZE])
-                logger.info("#%d from %s:%d frame_id=0x%03X payload_len=%d total=%d", counter, addr[0], addr[1], frame_id, payload_len, len(data))
-            else:
-                logger.info("#%d from %s:%d raw_len=%d (short packet)", counter, addr[0], addr[1], len(data))
+    def forward_batched(self, batch):
+        self.recv_sock.setblocking(False)
+        while running:
+            count = batch.receive(self.recv_sock)
+            if count == 0:
+                # wait for datagrams only when the socket is drained
+                select.select([self.recv_sock], [], [], POLL_TIMEOUT)
+                self.stats.report(self.counter, time.monotonic())
+                continue
+
+            batch.send(self.send_sock, count)
+            now = time.monotonic()
+            for i in range(count):
+                buffer, size = batch.datagram(i)
+                self.stats.add(buffer, size, now)
+                if LOG_SAMPLE and (self.counter + i) % LOG_SAMPLE == 0:
+                    _log_datagram(self.counter + i, batch.sender(i), buffer, size)
+            self.counter += count
+            self.stats.report(self.counter, now)
+
+
+def main() -> None:
+    recv_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    dest = (SEND_HOST, SEND_PORT)
+    gateway = Gateway(recv_sock, send_sock, dest)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, gateway.stats.request)
+
+    try:
+        _bind_with_retry(recv_sock, LISTEN_HOST, LISTEN_PORT)
+        _bind_with_retry(send_sock, SEND_BIND_HOST, SEND_BIND_PORT)
+
+        logger.info(
+            "ECUB gateway started: listening on %s:%d, forwarding to %s:%d (from %s:%d)",
+            LISTEN_HOST,
+            LISTEN_PORT,
+            SEND_HOST,
+            SEND_PORT,
+            SEND_BIND_HOST,
+            SEND_BIND_PORT,
+        )
 
-            counter += 1
+        if BATCH_SIZE == 1:
+            gateway.forward()
+        else:
+            libc = _load_mmsg()
+            batch = MmsgBatch(libc, BATCH_SIZE, dest) if libc is not None else LoopBatch(BATCH_SIZE, dest)
+            logger.info("Forwarding in batches of up to %d datagrams with %s", BATCH_SIZE, type(batch).__name__)
+            gateway.forward_batched(batch)
 
     finally:
         recv_sock.close()
         send_sock.close()
-        logger.info("ECUB gateway stopped after %d forwarded datagrams", counter)
+        gateway.stats.log(gateway.counter, time.monotonic())
+        logger.info("ECUB gateway stopped after %d forwarded datagrams", gateway.counter)
 
 
 if __name__ == "__main__":
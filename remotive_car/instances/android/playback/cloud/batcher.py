@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+
+import structlog
+from remotivelabs.broker import BrokerClient, RestbusSignalConfig
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class BatcherStats:
+    updates: int = 0
+    coalesced: int = 0
+    writes: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {"updates": self.updates, "coalesced": self.coalesced, "writes": self.writes}
+
+
+class WriteBatcher:
+    """
+    Collects restbus updates for several namespaces and writes them as one update_signals call per tick.
+
+    Only the latest value of each signal in a tick is written, so bursts of frames (e.g. after WAN jitter) become one write instead of
+    one write per frame.
+    """
+
+    def __init__(self, broker_client: BrokerClient, tick_s: float = 0.02) -> None:
+        self.broker_client = broker_client
+        self.tick_s = tick_s
+        self.stats = BatcherStats()
+        self._pending: dict[tuple[str, str], RestbusSignalConfig] = {}
+        self._ready = asyncio.Event()
+
+    def put(self, namespace: str, *signals: RestbusSignalConfig) -> None:
+        for signal in signals:
+            self.stats.updates += 1
+            if self._pending.setdefault((namespace, signal.name), signal) is not signal:
+                self.stats.coalesced += 1
+                self._pending[(namespace, signal.name)] = signal
+        self._ready.set()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        by_namespace: dict[str, list[RestbusSignalConfig]] = {}
+        for (namespace, _), signal in self._pending.items():
+            by_namespace.setdefault(namespace, []).append(signal)
+        self._pending = {}
+        self.stats.writes += 1
+        await self.broker_client.restbus.update_signals(*by_namespace.items())
+
+    async def run(self) -> None:
+        """
+        Flush the pending updates once per tick, while there are any. Runs until cancelled.
+        """
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            await self.flush()
+            await asyncio.sleep(self.tick_s)
@@ -0,0 +1,190 @@
+"""
+Declarative translations of the signals of the cloud broker to the restbus, see mapping.yaml.
+
+Each mapping translates one frame of a cloud namespace to one restbus signal:
+
+    - source: { type: broker, frame: ID2D3UI_solarData, channel: ChassisBus }
+      target: { type: restbus, signal: LocationFrame.Heading, channel: TCU-BodyCan0 }
+      expression: (UI_solarAzimuthAngle - UI_solarAzimuthAngleCarRef) % 360
+      when: UI_solarAzimuthAngle > 0
+      unit: { from: km/h, to: m/s }
+
+A source with a signal (Frame.Signal) instead of a frame uses the value of that signal. The expression and the condition refer to the
+signals of the source frame by name, without the frame prefix. A frame where any of the signals they refer to is missing is not
+translated. Expressions are compiled to functions once, when the mappings are loaded.
+"""
+
+from __future__ import annotations
+
+import ast
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Mapping, Sequence
+
+import yaml
+from remotivelabs.broker import Frame, RestbusSignalConfig
+
+SCHEMA = "remotive-topology-mapping:0.1"
+DEFAULT_MAPPING = Path(__file__).with_name("mapping.yaml")
+
+Translation = Callable[[Frame], list[tuple[str, RestbusSignalConfig]]]
+
+# unit conversions as (scale, offset), applied to the value of the expression
+UNITS: dict[tuple[str, str], tuple[float, float]] = {
+    ("km/h", "m/s"): (1 / 3.6, 0.0),
+    ("m/s", "km/h"): (3.6, 0.0),
+    ("mph", "km/h"): (1.609344, 0.0),
+    ("km/h", "mph"): (1 / 1.609344, 0.0),
+    ("deg", "rad"): (math.pi / 180, 0.0),
+    ("rad", "deg"): (180 / math.pi, 0.0),
+    ("degC", "degF"): (1.8, 32.0),
+    ("degF", "degC"): (1 / 1.8, -32.0 / 1.8),
+    ("ratio", "%"): (100.0, 0.0),
+    ("%", "ratio"): (0.01, 0.0),
+}
+
+# the functions expressions may call
+FUNCTIONS: dict[str, Callable[..., Any]] = {"abs": abs, "min": min, "max": max, "round": round, "int": int, "float": float}
+
+_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.BoolOp,
+    ast.Compare,
+    ast.IfExp,
+    ast.Call,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.Tuple,
+    ast.operator,
+    ast.unaryop,
+    ast.boolop,
+    ast.cmpop,
+)
+
+
+@dataclass(frozen=True)
+class CompiledMapping:
+    """
+    A mapping with its expression and condition compiled to functions of the values of its inputs, in order.
+    """
+
+    namespace: str
+    signal: str
+    inputs: tuple[str, ...]
+    expression: Callable[..., Any]
+    when: Callable[..., Any] | None = None
+
+    def apply(self, signals: Mapping[str, Any]) -> RestbusSignalConfig | None:
+        values = [signals.get(name) for name in self.inputs]
+        if any(value is None for value in values):
+            return None
+        if self.when is not None and not self.when(*values):
+            return None
+        return RestbusSignalConfig.set(name=self.signal, value=self.expression(*values))
+
+
+def _names(expression: ast.Expression, source: str) -> list[str]:
+    names = []
+    for node in ast.walk(expression):
+        if not isinstance(node, _NODES):
+            raise ValueError(f"Unsupported {type(node).__name__} in expression: {source}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS):
+            raise ValueError(f"Unsupported function call in expression: {source}")
+        if isinstance(node, ast.Name) and node.id not in FUNCTIONS and node.id not in names:
+            names.append(node.id)
+    return names
+
+
+def _parse(source: str) -> tuple[ast.Expression, list[str]]:
+    try:
+        expression = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {source}: {e.msg}") from e
+    return expression, _names(expression, source)
+
+
+def _function(source: str, inputs: Sequence[str]) -> Callable[..., Any]:
+    # a lambda of the inputs, so applying a mapping is a single call without a namespace dict per frame
+    code = compile(f"lambda {', '.join(inputs)}: ({source.strip()})", "<mapping>", "eval")
+    function: Callable[..., Any] = eval(code, {"__builtins__": {}, **FUNCTIONS})  # only names and the FUNCTIONS, see _names
+    return function
+
+
+def compile_mapping(mapping: Mapping[str, Any]) -> tuple[str, str, CompiledMapping]:
+    """
+    Compile one mapping of a spec to the cloud namespace and frame it translates, and its evaluator.
+
+    Raises:
+        ValueError: If the mapping is invalid.
+    """
+    source, target = mapping.get("source") or {}, mapping.get("target") or {}
+    namespace, frame_name = source.get("channel"), source.get("frame")
+    expression = mapping.get("expression")
+    if "signal" in source:
+        frame_name, _, signal_name = str(source["signal"]).partition(".")
+        expression = expression or signal_name
+    if not namespace or not frame_name or not expression:
+        raise ValueError("A source needs a channel, and a signal, or a frame and an expression")
+    if not target.get("channel") or not target.get("signal"):
+        raise ValueError("A target needs a channel and a signal")
+
+    if unit := mapping.get("unit"):
+        if (unit.get("from"), unit.get("to")) not in UNITS:
+            raise ValueError(f"Unsupported unit conversion from {unit.get('from')} to {unit.get('to')}")
+        scale, offset = UNITS[(unit["from"], unit["to"])]
+        expression = f"({expression}) * {scale!r} + {offset!r}"
+
+    _, inputs = _parse(str(expression))
+    when = mapping.get("when")
+    if when is not None:
+        inputs += [name for name in _parse(str(when))[1] if name not in inputs]
+    return (
+        namespace,
+        frame_name,
+        CompiledMapping(
+            namespace=target["channel"],
+            signal=target["signal"],
+            inputs=tuple(f"{frame_name}.{name}" for name in inputs),
+            expression=_function(str(expression), inputs),
+            when=_function(str(when), inputs) if when is not None else None,
+        ),
+    )
+
+
+def _translation(mappings: Sequence[CompiledMapping]) -> Translation:
+    def translate(frame: Frame) -> list[tuple[str, RestbusSignalConfig]]:
+        translated = []
+        for mapping in mappings:
+            if (signal := mapping.apply(frame.signals)) is not None:
+                translated.append((mapping.namespace, signal))
+        return translated
+
+    return translate
+
+
+def compile_spec(spec: Mapping[str, Any]) -> dict[str, dict[str, Translation]]:
+    """
+    Compile a mapping spec to the translations of its frames, by cloud namespace and frame name.
+
+    Raises:
+        ValueError: If the spec is invalid.
+    """
+    if spec.get("schema") != SCHEMA:
+        raise ValueError(f"Unsupported mapping schema {spec.get('schema')!r}, expected {SCHEMA!r}")
+    by_frame: dict[str, dict[str, list[CompiledMapping]]] = {}
+    for index, mapping in enumerate(spec.get("mappings") or []):
+        try:
+            namespace, frame_name, compiled = compile_mapping(mapping)
+        except ValueError as e:
+            raise ValueError(f"Invalid mapping {index}: {e}") from e
+        by_frame.setdefault(namespace, {}).setdefault(frame_name, []).append(compiled)
+    return {namespace: {name: _translation(mappings) for name, mappings in frames.items()} for namespace, frames in by_frame.items()}
+
+
+def load_mappings(path: Path = DEFAULT_MAPPING) -> dict[str, dict[str, Translation]]:
+    with path.open(encoding="utf-8") as file:
+        return compile_spec(yaml.safe_load(file) or {})
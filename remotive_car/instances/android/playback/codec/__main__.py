@@ -0,0 +1,68 @@
+"""
+Decodes a candump log (or random payloads) with a DBC or LDF outside the broker, and reports the time it took.
+
+    python -m playback.codec ../../../tesla/platform/Model3CAN_VehicleBus.dbc --candump VehicleBus.log
+    python -m playback.codec ../../../tesla/platform/Model3CAN_VehicleBus.dbc --synthetic 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Mapping
+
+import numpy as np
+
+from .batch import decode_log
+from .files import load_database, read_candump
+from .plan import MessagePlan
+
+
+def synthetic_log(plans: Mapping[int, MessagePlan], count: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    frame_ids = rng.choice(np.array(list(plans), dtype=np.int64), size=count)
+    payloads = rng.integers(0, 256, size=(count, max(plan.length for plan in plans.values())), dtype=np.uint8)
+    return frame_ids, payloads
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Decode a log with a DBC or LDF, and report the decode time.")
+    parser.add_argument("database", type=Path, help="DBC or LDF file")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--candump", type=Path, help="candump log to decode")
+    source.add_argument("--synthetic", type=int, help="Decode this many random frames of the database")
+    parser.add_argument("--no-cache", action="store_true", help="Always parse the database, instead of loading it from the cache")
+    parser.add_argument("--cache-dir", type=Path, help="Cache directory. Defaults to $XDG_CACHE_HOME/remotive-playback/codec")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    plans = load_database(args.database, cache=not args.no_cache, cache_dir=args.cache_dir).plans
+    compiled = time.perf_counter()
+    if args.candump:
+        _, frame_ids, payloads = read_candump(args.candump)
+    else:
+        frame_ids, payloads = synthetic_log(plans, args.synthetic)
+    loaded = time.perf_counter()
+    decoded = decode_log(plans, frame_ids, payloads)
+    done = time.perf_counter()
+
+    print(
+        json.dumps(
+            {
+                "messages": len(plans),
+                "frames": len(frame_ids),
+                "decoded_frames": sum(len(frames.rows) for frames in decoded.values()),
+                "compile_ms": round(1000 * (compiled - started), 3),
+                "load_ms": round(1000 * (loaded - compiled), 3),
+                "decode_ms": round(1000 * (done - loaded), 3),
+                "frames_per_s": round(len(frame_ids) / (done - loaded)) if done > loaded else None,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
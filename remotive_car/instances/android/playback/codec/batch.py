@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Literal, Mapping
+
+import numpy as np
+import numpy.typing as npt
+
+from .plan import MessagePlan, SignalPlan
+
+Payloads = npt.NDArray[np.uint8]
+
+
+@dataclass
+class DecodedFrames:
+    """
+    The decoded signals of the frames of one message in a log. rows are the indices of the frames in the log, and each signal is a float
+    array with one value per frame, NaN where a multiplexed signal is not present.
+    """
+
+    rows: npt.NDArray[np.intp]
+    signals: dict[str, npt.NDArray[np.float64]]
+
+
+def _words(payloads: Payloads, little_endian: bool) -> npt.NDArray[np.uint64]:
+    """
+    Read each payload of (at most) 8 bytes as one integer, as if it had the length of the payloads, so the word shifts of the plan apply.
+    """
+    count, length = payloads.shape
+    padded = np.zeros((count, 8), dtype=np.uint8)
+    if little_endian:
+        padded[:, :length] = payloads
+        return padded.view("<u8").ravel().astype(np.uint64)
+    padded[:, 8 - length :] = payloads
+    return padded.view(">u8").ravel().astype(np.uint64)
+
+
+def _window(payloads: Payloads, signal: SignalPlan) -> npt.NDArray[np.uint64]:
+    """
+    Combine the bytes of a signal (in frames longer than 8 bytes) into one integer per payload.
+    """
+    columns = payloads[:, signal.byte_offset : signal.byte_offset + signal.byte_count].astype(np.uint64)
+    shifts = np.arange(signal.byte_count, dtype=np.uint64) * np.uint64(8)
+    if not signal.little_endian:
+        shifts = shifts[::-1]
+    return np.asarray(np.bitwise_or.reduce(columns << shifts, axis=1) >> np.uint64(signal.shift), dtype=np.uint64)
+
+
+def _raw(payloads: Payloads, signal: SignalPlan, words: dict[bool, npt.NDArray[np.uint64]]) -> npt.NDArray[np.uint64]:
+    if payloads.shape[1] <= 8:
+        if signal.little_endian not in words:
+            words[signal.little_endian] = _words(payloads, signal.little_endian)
+        raw: npt.NDArray[np.uint64] = (words[signal.little_endian] >> np.uint64(signal.word_shift)) & np.uint64(signal.mask)
+        return raw
+    if signal.byte_count <= 8:
+        return np.asarray(_window(payloads, signal) & np.uint64(signal.mask), dtype=np.uint64)
+    # a signal over more than 8 bytes (only possible with unaligned 64 bit signals in CAN FD frames) is extracted one payload at a time
+    order: Literal["little", "big"] = "little" if signal.little_endian else "big"
+    start, end = signal.byte_offset, signal.byte_offset + signal.byte_count
+    values = [(int.from_bytes(payload[start:end].tobytes(), order) >> signal.shift) & signal.mask for payload in payloads]
+    return np.array(values, dtype=np.uint64)
+
+
+def _physical(raw: npt.NDArray[np.uint64], signal: SignalPlan) -> npt.NDArray[np.float64]:
+    if signal.float_bits == 32:
+        return raw.astype(np.uint32).view(np.float32).astype(np.float64)
+    if signal.float_bits == 64:
+        doubles: npt.NDArray[np.float64] = raw.view(np.float64).copy()
+        return doubles
+    values = raw.astype(np.float64)
+    if signal.signed:
+        values = np.where(raw >> np.uint64(signal.length - 1), values - float(1 << signal.length), values)
+    return values * signal.scale + signal.offset
+
+
+def decode_batch(plan: MessagePlan, payloads: Payloads) -> dict[str, npt.NDArray[np.float64]]:
+    """
+    Decode an array of payloads (one row of bytes per frame) of one message to physical values by signal name. Payloads shorter than the
+    message are zero padded, and multiplexed signals are NaN in the frames where they are not selected.
+    """
+    payloads = np.ascontiguousarray(payloads, dtype=np.uint8)
+    if payloads.shape[1] < plan.length:
+        payloads = np.pad(payloads, ((0, 0), (0, plan.length - payloads.shape[1])))
+    payloads = payloads[:, : plan.length]
+
+    words: dict[bool, npt.NDArray[np.uint64]] = {}
+    selector = _raw(payloads, plan.multiplexer, words) if plan.multiplexer is not None else None
+    decoded = {}
+    for signal in plan.signals:
+        values = _physical(_raw(payloads, signal, words), signal)
+        if signal.multiplexer_value is not None and selector is not None:
+            values[selector != signal.multiplexer_value] = np.nan
+        decoded[signal.name] = values
+    return decoded
+
+
+def decode_log(plans: Mapping[int, MessagePlan], frame_ids: npt.ArrayLike, payloads: Payloads) -> dict[str, DecodedFrames]:
+    """
+    Decode a log of frames of many messages, e.g. a drive log, by message name. The frames are grouped by frame id once, and each message
+    is decoded as one batch. Frames without a plan are skipped.
+    """
+    ids = np.asarray(frame_ids)
+    order = np.argsort(ids, kind="stable")
+    unique_ids, starts, counts = np.unique(ids[order], return_index=True, return_counts=True)
+
+    decoded = {}
+    for frame_id, start, count in zip(unique_ids.tolist(), starts, counts):
+        plan = plans.get(frame_id)
+        if plan is None:
+            continue
+        rows = order[start : start + count]
+        decoded[plan.name] = DecodedFrames(rows, decode_batch(plan, payloads[rows]))
+    return decoded
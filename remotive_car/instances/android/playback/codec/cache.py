@@ -0,0 +1,287 @@
+"""
+Persistent cache of parsed and compiled signal databases.
+
+A cache file holds the frames and signal plans of one database as fixed size little endian records, followed by a table of the
+strings, so it is loaded with a memory map and no parsing:
+
+    header    magic, version, number of messages, number of signals, size of the strings
+    messages  MESSAGE_DTYPE records
+    signals   SIGNAL_DTYPE records, the signals of each message after each other
+    strings   UTF-8, referenced by (offset, length) from the records
+
+Cache files are named by the hash of the source file content, so a changed source is parsed again. Files of earlier versions of the
+same source (file path) are removed when a new one is written.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Callable, Iterator, Mapping
+
+import numpy as np
+import structlog
+
+from .database import Database, MessageDef, SignalDef
+from .plan import MessagePlan, SignalPlan, compile_database
+
+logger = structlog.get_logger(__name__)
+
+MAGIC = b"PBCODEC\0"
+VERSION = 1
+_HEADER = struct.Struct("<8sIIII")
+
+MESSAGE_DTYPE = np.dtype(
+    [
+        ("frame_id", "<u4"),
+        ("length", "<u2"),
+        ("extended", "u1"),
+        ("multiplexer", "<i2"),
+        ("first_signal", "<u4"),
+        ("signal_count", "<u4"),
+        ("name", "<u4", 2),
+        ("sender", "<u4", 2),
+    ]
+)
+SIGNAL_DTYPE = np.dtype(
+    [
+        ("start_bit", "<u2"),
+        ("length", "<u2"),
+        ("little_endian", "u1"),
+        ("signed", "u1"),
+        ("float_bits", "u1"),
+        ("is_multiplexer", "u1"),
+        ("multiplexer_value", "<i8"),
+        ("scale", "<f8"),
+        ("offset", "<f8"),
+        ("byte_offset", "<u2"),
+        ("byte_count", "<u2"),
+        ("shift", "<u2"),
+        ("word_shift", "<u2"),
+        ("name", "<u4", 2),
+        ("unit", "<u4", 2),
+    ]
+)
+
+
+class CompiledDatabase:
+    """
+    A database and the plans of its frames, by frame id. Either may be built lazily, e.g. when loaded from a cache file.
+    """
+
+    def __init__(self, database: Database | Callable[[], Database], plans: Mapping[int, MessagePlan]) -> None:
+        self._database = database
+        self.plans = plans
+
+    @property
+    def database(self) -> Database:
+        if callable(self._database):
+            self._database = self._database()
+        return self._database
+
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "remotive-playback" / "codec"
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha256(data + MAGIC + VERSION.to_bytes(4, "little")).hexdigest()[:32]
+
+
+class _Strings:
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.offsets: dict[str, tuple[int, int]] = {}
+
+    def add(self, value: str) -> tuple[int, int]:
+        if value not in self.offsets:
+            encoded = value.encode("utf-8")
+            self.offsets[value] = (len(self.data), len(encoded))
+            self.data += encoded
+        return self.offsets[value]
+
+
+def dump(compiled: CompiledDatabase) -> bytes:
+    strings = _Strings()
+    messages = np.zeros(len(compiled.database.messages), dtype=MESSAGE_DTYPE)
+    signals = np.zeros(sum(len(message.signals) for message in compiled.database.messages), dtype=SIGNAL_DTYPE)
+    index = 0
+    for row, message in enumerate(compiled.database.messages):
+        plan = compiled.plans[message.frame_id]
+        multiplexer = next((i for i, signal in enumerate(message.signals) if signal.is_multiplexer), -1)
+        messages[row] = (
+            message.frame_id,
+            message.length,
+            message.extended,
+            multiplexer,
+            index,
+            len(message.signals),
+            strings.add(message.name),
+            strings.add(message.sender),
+        )
+        for signal, signal_plan in zip(message.signals, plan.signals):
+            signals[index] = (
+                signal.start_bit,
+                signal.length,
+                signal.little_endian,
+                signal.signed,
+                signal.float_bits or 0,
+                signal.is_multiplexer,
+                -1 if signal.multiplexer_value is None else signal.multiplexer_value,
+                signal.scale,
+                signal.offset,
+                signal_plan.byte_offset,
+                signal_plan.byte_count,
+                signal_plan.shift,
+                signal_plan.word_shift,
+                strings.add(signal.name),
+                strings.add(signal.unit),
+            )
+            index += 1
+    header = _HEADER.pack(MAGIC, VERSION, len(messages), len(signals), len(strings.data))
+    return header + messages.tobytes() + signals.tobytes() + bytes(strings.data)
+
+
+class _CachedPlans(Mapping[int, MessagePlan]):
+    """
+    The plans of a cache file, built from its records when first used, so loading does not depend on the size of the database.
+    """
+
+    def __init__(self, messages: np.ndarray, signals: np.ndarray, strings: bytes) -> None:
+        self.messages = messages
+        self.signals = signals
+        self.strings = strings
+        self._rows = {frame_id: row for row, frame_id in enumerate(messages["frame_id"].tolist())}
+        self._plans: dict[int, MessagePlan] = {}
+
+    def text(self, reference: tuple[int, int]) -> str:
+        return self.strings[reference[0] : reference[0] + reference[1]].decode("utf-8")
+
+    def message(self, row: int) -> tuple[MessageDef, MessagePlan]:
+        frame_id, length, extended, multiplexer, first_signal, signal_count, name, sender = self.messages[row].tolist()
+        signals = [_signal(record, self.text) for record in self.signals[first_signal : first_signal + signal_count].tolist()]
+        message = MessageDef(self.text(name), frame_id, length, self.text(sender), tuple(s for s, _ in signals), bool(extended))
+        plans = tuple(plan for _, plan in signals)
+        return message, MessagePlan(message.name, frame_id, length, plans, plans[multiplexer] if multiplexer >= 0 else None)
+
+    def database(self) -> Database:
+        return Database([self.message(row)[0] for row in range(len(self.messages))])
+
+    def __getitem__(self, frame_id: int) -> MessagePlan:
+        if frame_id not in self._plans:
+            self._plans[frame_id] = self.message(self._rows[frame_id])[1]
+        return self._plans[frame_id]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+def load(buffer: bytes | mmap.mmap) -> CompiledDatabase:
+    """
+    Load a cache file. The records are used in place, so a memory mapped buffer must stay open while the database is used.
+
+    Raises:
+        ValueError: If the buffer is not a cache file of this version.
+    """
+    if len(buffer) < _HEADER.size:
+        raise ValueError("Invalid codec cache: truncated header")
+    magic, version, message_count, signal_count, strings_size = _HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Invalid codec cache: magic {magic!r}, version {version}")
+    signals_at = _HEADER.size + message_count * MESSAGE_DTYPE.itemsize
+    strings_at = signals_at + signal_count * SIGNAL_DTYPE.itemsize
+    if len(buffer) != strings_at + strings_size:
+        raise ValueError("Invalid codec cache: truncated")
+
+    plans = _CachedPlans(
+        np.frombuffer(buffer, dtype=MESSAGE_DTYPE, count=message_count, offset=_HEADER.size),
+        np.frombuffer(buffer, dtype=SIGNAL_DTYPE, count=signal_count, offset=signals_at),
+        bytes(buffer[strings_at:]),
+    )
+    return CompiledDatabase(plans.database, plans)
+
+
+def _signal(record: tuple, text: Callable[[tuple[int, int]], str]) -> tuple[SignalDef, SignalPlan]:
+    (start_bit, length, little_endian, signed, float_bits, is_multiplexer, multiplexer_value, scale, offset) = record[:9]
+    byte_offset, byte_count, shift, word_shift, name, unit = record[9:]
+    signal = SignalDef(
+        name=text(name),
+        start_bit=start_bit,
+        length=length,
+        little_endian=bool(little_endian),
+        signed=bool(signed),
+        scale=scale,
+        offset=offset,
+        unit=text(unit),
+        float_bits=float_bits or None,
+        is_multiplexer=bool(is_multiplexer),
+        multiplexer_value=None if multiplexer_value < 0 else multiplexer_value,
+    )
+    plan = SignalPlan(
+        name=signal.name,
+        byte_offset=byte_offset,
+        byte_count=byte_count,
+        little_endian=signal.little_endian,
+        shift=shift,
+        word_shift=word_shift,
+        length=length,
+        mask=(1 << length) - 1,
+        signed=signal.signed,
+        scale=scale,
+        offset=offset,
+        float_bits=signal.float_bits,
+        multiplexer_value=signal.multiplexer_value,
+    )
+    return signal, plan
+
+
+def _read_cache(cache_file: Path) -> CompiledDatabase | None:
+    try:
+        with cache_file.open("rb") as file:
+            # the mapping stays open (after the file is closed) as long as the loaded database uses it
+            return load(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring invalid codec cache file", path=str(cache_file), error=str(e))
+        return None
+
+
+def _write_cache(cache_dir: Path, cache_file: Path, compiled: CompiledDatabase) -> None:
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cache_dir, suffix=".tmp", delete=False) as file:
+            file.write(dump(compiled))
+        os.replace(file.name, cache_file)
+        stem = cache_file.name.rsplit("-", 1)[0]
+        for stale in cache_dir.glob(f"{stem}-*.codec"):
+            if stale != cache_file:
+                stale.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning("Could not write codec cache file", path=str(cache_file), error=str(e))
+
+
+def load_cached(path: Path, parse: Callable[[bytes], Database], cache_dir: Path | None = None) -> CompiledDatabase:
+    """
+    Load the compiled database of a source file from the cache, or parse and compile it and write it to the cache. A cache that cannot be
+    read or written is logged, and the source file is parsed.
+    """
+    data = path.read_bytes()
+    cache_dir = cache_dir or default_cache_dir()
+    # the source is identified by its name and the hash of its path, so sources with the same name do not replace each other's files
+    source = f"{path.stem}-{hashlib.sha256(str(path.resolve()).encode()).hexdigest()[:8]}"
+    cache_file = cache_dir / f"{source}-{_content_hash(data)}.codec"
+    if (compiled := _read_cache(cache_file)) is not None:
+        return compiled
+
+    database = parse(data)
+    compiled = CompiledDatabase(database, compile_database(database))
+    _write_cache(cache_dir, cache_file, compiled)
+    return compiled
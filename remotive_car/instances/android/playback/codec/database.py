@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class SignalDef:
+    """
+    A signal of a frame, as defined in a DBC or LDF.
+
+    The start bit follows the DBC convention: the least significant bit for little endian (Intel) signals, and the most significant bit
+    (in the sawtooth bit numbering) for big endian (Motorola) signals. A signal with a multiplexer value is only present in a frame when
+    the multiplexer signal of the frame has that value.
+    """
+
+    name: str
+    start_bit: int
+    length: int
+    little_endian: bool = True
+    signed: bool = False
+    scale: float = 1.0
+    offset: float = 0.0
+    unit: str = ""
+    # 32 or 64 for IEEE float signals (SIG_VALTYPE_), else None
+    float_bits: int | None = None
+    is_multiplexer: bool = False
+    multiplexer_value: int | None = None
+
+
+@dataclass(frozen=True)
+class MessageDef:
+    name: str
+    frame_id: int
+    length: int
+    sender: str = ""
+    signals: tuple[SignalDef, ...] = ()
+    extended: bool = False
+
+
+@dataclass
+class Database:
+    messages: list[MessageDef] = field(default_factory=list)
+
+    def by_name(self) -> dict[str, MessageDef]:
+        return {message.name: message for message in self.messages}
+
+    def by_frame_id(self) -> dict[int, MessageDef]:
+        return {message.frame_id: message for message in self.messages}
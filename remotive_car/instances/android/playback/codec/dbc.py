@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import re
+from dataclasses import replace
+from pathlib import Path
+
+from .database import Database, MessageDef, SignalDef
+
+_MESSAGE = re.compile(r"^BO_\s+(\d+)\s+(\w+)\s*:\s*(\d+)\s+(\S+)")
+_SIGNAL = re.compile(
+    r"^SG_\s+(\w+)\s*(M|m\d+M?)?\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*\(([^,]+),([^)]+)\)\s*\[[^\]]*\]\s*\"([^\"]*)\"",
+)
+_VALUE_TYPE = re.compile(r"^SIG_VALTYPE_\s+(\d+)\s+(\w+)\s*:\s*([12])\s*;")
+
+# frame ids of extended (29 bit) frames have this bit set in a DBC
+_EXTENDED = 0x80000000
+
+
+def _signal(match: re.Match[str]) -> SignalDef:
+    name, mux, start, length, byte_order, sign, scale, offset, unit = match.groups()
+    return SignalDef(
+        name=name,
+        start_bit=int(start),
+        length=int(length),
+        little_endian=byte_order == "1",
+        signed=sign == "-",
+        scale=float(scale),
+        offset=float(offset),
+        unit=unit,
+        is_multiplexer=bool(mux) and mux.endswith("M"),
+        multiplexer_value=int(mux[1:].rstrip("M")) if mux and mux.startswith("m") else None,
+    )
+
+
+def parse_dbc(text: str) -> Database:
+    """
+    Parse the frames and signals of a DBC. Value tables, attributes and comments are ignored.
+
+    Raises:
+        ValueError: If a signal is defined outside of a frame.
+    """
+    messages: list[MessageDef] = []
+    signals: dict[int, list[SignalDef]] = {}
+    float_bits: dict[tuple[int, str], int] = {}
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if match := _MESSAGE.match(line):
+            raw_id = int(match.group(1))
+            messages.append(
+                MessageDef(match.group(2), raw_id & ~_EXTENDED, int(match.group(3)), match.group(4), (), bool(raw_id & _EXTENDED))
+            )
+            signals[len(messages) - 1] = []
+        elif match := _SIGNAL.match(line):
+            if not messages:
+                raise ValueError(f"Invalid DBC: signal {match.group(1)} is not part of a frame")
+            signals[len(messages) - 1].append(_signal(match))
+        elif match := _VALUE_TYPE.match(line):
+            float_bits[(int(match.group(1)) & ~_EXTENDED, match.group(2))] = 32 if match.group(3) == "1" else 64
+
+    return Database(
+        [
+            replace(
+                message,
+                signals=tuple(replace(s, float_bits=float_bits.get((message.frame_id, s.name))) for s in signals[index]),
+            )
+            for index, message in enumerate(messages)
+        ]
+    )
+
+
+def decode_dbc(data: bytes) -> Database:
+    """
+    Parse the content of a DBC file. DBC files are often latin-1 encoded, which is also used when they are not valid UTF-8.
+    """
+    try:
+        return parse_dbc(data.decode("utf-8"))
+    except UnicodeDecodeError:
+        return parse_dbc(data.decode("latin-1"))
+
+
+def read_dbc(path: Path) -> Database:
+    return decode_dbc(path.read_bytes())
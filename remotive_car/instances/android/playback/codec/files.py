@@ -0,0 +1,59 @@
+"""
+Loading of the databases and logs the codec decodes.
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from .cache import CompiledDatabase, load_cached
+from .database import Database
+from .dbc import decode_dbc
+from .ldf import parse_ldf
+from .plan import compile_database
+
+# (1436509052.249713) vcan0 044#2A366C2BBA
+_CANDUMP = re.compile(r"^\((\d+\.\d+)\)\s+(\S+)\s+([0-9A-Fa-f]+)#([0-9A-Fa-f]*)")
+
+
+def parse_database(path: Path, data: bytes) -> Database:
+    return parse_ldf(data.decode("utf-8")) if path.suffix.lower() == ".ldf" else decode_dbc(data)
+
+
+def load_database(path: Path, cache: bool = True, cache_dir: Path | None = None) -> CompiledDatabase:
+    """
+    Load and compile a DBC or LDF, from the cache unless disabled.
+    """
+    if cache:
+        return load_cached(path, lambda data: parse_database(path, data), cache_dir)
+    database = parse_database(path, path.read_bytes())
+    return CompiledDatabase(database, compile_database(database))
+
+
+def iter_candump(path: Path) -> Iterator[tuple[float, str, int, bytes]]:
+    """
+    Read the frames of a candump log (-l format) one by one, as timestamp (seconds), interface, frame id and payload.
+    """
+    with path.open(encoding="utf-8") as file:
+        for line in file:
+            if match := _CANDUMP.match(line):
+                yield float(match.group(1)), match.group(2), int(match.group(3), 16), bytes.fromhex(match.group(4))
+
+
+def read_candump(path: Path) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Read a candump log (-l format) to arrays of timestamps, frame ids and payloads (zero padded to the longest payload).
+    """
+    timestamps, frame_ids, data = [], [], []
+    for timestamp, _, frame_id, payload in iter_candump(path):
+        timestamps.append(timestamp)
+        frame_ids.append(frame_id)
+        data.append(payload)
+    payloads = np.zeros((len(data), max((len(d) for d in data), default=8)), dtype=np.uint8)
+    for row, payload in enumerate(data):
+        payloads[row, : len(payload)] = np.frombuffer(payload, dtype=np.uint8)
+    return np.array(timestamps), np.array(frame_ids, dtype=np.int64), payloads
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from rlcm import ldf
+
+from .database import Database, MessageDef, SignalDef
+
+
+def parse_ldf(text: str) -> Database:
+    """
+    Parse the unconditional frames of an LDF, with the LDF parser of the RLCM (models/rlcm/python). LIN signals are little endian and
+    unsigned.
+
+    Raises:
+        ValueError: If the LDF is invalid, e.g. a frame refers to a signal that is not defined.
+    """
+    parsed = ldf.parse_ldf(text)
+    messages = []
+    for frame in parsed.frames.values():
+        signals = []
+        for frame_signal in frame.signals:
+            signal = parsed.signals[frame_signal.name]
+            signals.append(
+                SignalDef(signal.name, frame_signal.offset, frame_signal.size, scale=signal.scale, offset=signal.offset, unit=signal.unit)
+            )
+        messages.append(MessageDef(frame.name, frame.frame_id, frame.length, frame.publisher, tuple(signals)))
+    return Database(messages)
+
+
+def read_ldf(path: Path) -> Database:
+    return parse_ldf(path.read_text(encoding="utf-8"))
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+
+from .database import Database, MessageDef, SignalDef
+
+
+@dataclass(frozen=True)
+class SignalPlan:
+    """
+    Precomputed extraction of one signal: the raw value is `(window >> shift) & mask`, where the window is the byte_count bytes from
+    byte_offset, read in the byte order of the signal. word_shift is the same shift applied to the whole payload read as one integer.
+    """
+
+    name: str
+    byte_offset: int
+    byte_count: int
+    little_endian: bool
+    shift: int
+    word_shift: int
+    length: int
+    mask: int
+    signed: bool
+    scale: float
+    offset: float
+    float_bits: int | None
+    multiplexer_value: int | None
+
+    @property
+    def is_raw(self) -> bool:
+        return self.scale == 1.0 and self.offset == 0.0 and self.float_bits is None
+
+    def physical(self, raw: int) -> int | float:
+        if self.float_bits == 32:
+            return float(struct.unpack("<f", raw.to_bytes(4, "little"))[0])
+        if self.float_bits == 64:
+            return float(struct.unpack("<d", raw.to_bytes(8, "little"))[0])
+        if self.signed and raw >> (self.length - 1):
+            raw -= 1 << self.length
+        return raw if self.is_raw else raw * self.scale + self.offset
+
+
+@dataclass(frozen=True)
+class MessagePlan:
+    name: str
+    frame_id: int
+    length: int
+    signals: tuple[SignalPlan, ...]
+    multiplexer: SignalPlan | None = None
+
+    def decode(self, payload: bytes) -> dict[str, int | float]:
+        """
+        Decode one payload to physical values by signal name. Multiplexed signals are only included when the multiplexer selects them.
+        Shorter payloads are zero padded.
+        """
+        if len(payload) < self.length:
+            payload = payload.ljust(self.length, b"\0")
+        little = int.from_bytes(payload[: self.length], "little")
+        big = int.from_bytes(payload[: self.length], "big")
+        selector = None
+        if self.multiplexer is not None:
+            selector = ((little if self.multiplexer.little_endian else big) >> self.multiplexer.word_shift) & self.multiplexer.mask
+
+        values = {}
+        for signal in self.signals:
+            if signal.multiplexer_value is not None and signal.multiplexer_value != selector:
+                continue
+            values[signal.name] = signal.physical(((little if signal.little_endian else big) >> signal.word_shift) & signal.mask)
+        return values
+
+
+def compile_signal(signal: SignalDef, message_length: int) -> SignalPlan:
+    """
+    Raises:
+        ValueError: If the signal does not fit in the frame.
+    """
+    if signal.little_endian:
+        first_bit, last_bit = signal.start_bit, signal.start_bit + signal.length - 1
+        byte_offset, byte_count = first_bit // 8, last_bit // 8 - first_bit // 8 + 1
+        shift = first_bit % 8
+        word_shift = first_bit
+    else:
+        # position of the msb and lsb when the payload is read as one big endian integer, counted from its most significant bit
+        msb = (signal.start_bit // 8) * 8 + 7 - signal.start_bit % 8
+        lsb = msb + signal.length - 1
+        byte_offset, byte_count = msb // 8, lsb // 8 - msb // 8 + 1
+        shift = (byte_offset + byte_count) * 8 - 1 - lsb
+        word_shift = message_length * 8 - 1 - lsb
+    if byte_offset + byte_count > message_length or word_shift < 0:
+        raise ValueError(f"Signal {signal.name} does not fit in a frame of {message_length} bytes")
+
+    return SignalPlan(
+        name=signal.name,
+        byte_offset=byte_offset,
+        byte_count=byte_count,
+        little_endian=signal.little_endian,
+        shift=shift,
+        word_shift=word_shift,
+        length=signal.length,
+        mask=(1 << signal.length) - 1,
+        signed=signal.signed,
+        scale=signal.scale,
+        offset=signal.offset,
+        float_bits=signal.float_bits,
+        multiplexer_value=signal.multiplexer_value,
+    )
+
+
+def compile_message(message: MessageDef) -> MessagePlan:
+    plans = tuple(compile_signal(signal, message.length) for signal in message.signals)
+    multiplexer = next((plan for plan, signal in zip(plans, message.signals) if signal.is_multiplexer), None)
+    return MessagePlan(message.name, message.frame_id, message.length, plans, multiplexer)
+
+
+def compile_database(database: Database) -> dict[int, MessagePlan]:
+    """
+    Compile the extraction plans of all frames of a database, by frame id.
+    """
+    return {message.frame_id: compile_message(message) for message in database.messages}
@@ -0,0 +1,25 @@
+"""
+Durations of recording sessions, e.g. 120s or 1753865213743274us, as microseconds.
+
+Without dependencies, so that entry points of the playback containers can parse durations without importing the offline tools.
+"""
+
+from __future__ import annotations
+
+import re
+
+_DURATION = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*(us|ms|s|m|h)\s*$")
+_UNITS = {"us": 1, "ms": 1_000, "s": 1_000_000, "m": 60_000_000, "h": 3_600_000_000}
+
+
+def parse_duration(value: str | int) -> int:
+    """
+    Parse a time or offset of a session (e.g. 1753865338s, -2s, 1753865213743274us) to microseconds.
+
+    Raises:
+        ValueError: If the value has no unit.
+    """
+    match = _DURATION.match(str(value))
+    if match is None:
+        raise ValueError(f"Invalid duration {value!r}, expected a number with a unit (us, ms, s, m or h)")
+    return round(float(match.group(1)) * _UNITS[match.group(2)])
@@ -2,31 +2,45 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+from pathlib import Path
 
 import structlog
+from remotivelabs.broker import BrokerClient
 from remotivelabs.broker.recording_session import RecordingSessionClient
 from remotivelabs.topology.cli.behavioral_model import BehavioralModelArgs
 
+from ..duration import parse_duration
+from .keyframes import Keyframes, seek
 from .log import configure_logging
 
 logger = structlog.get_logger(__name__)
 
 
-async def main(avp: BehavioralModelArgs, recording_session: str):
-    logger.info("Starting csv playback", args=avp, recording_session=recording_session)
+async def main(avp: BehavioralModelArgs, recording_session: str, start: int | None = None, keyframes: Path | None = None):
+    logger.info("Starting csv playback", args=avp, recording_session=recording_session, start=start)
     async with (
         RecordingSessionClient(avp.url, auth=avp.auth) as client,
         client.get_session(recording_session, force_reopen=True) as session,
     ):
         await session.set_repeat(0)
-        await session.play(0)
+        if start is not None and keyframes is not None:
+            async with BrokerClient(avp.url, auth=avp.auth) as broker_client:
+                keyframe = await seek(broker_client, session, Keyframes.load(keyframes), start)
+            logger.info("Restored keyframe", timestamp=keyframe.timestamp, namespaces=list(keyframe.restbus))
+            await session.play()
+        else:
+            await session.play(0)
         await asyncio.Event().wait()
 
 
 def parse_recording_args(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--recording-session", help="Path to recording session file", required=True)
+    parser.add_argument("--start", type=parse_duration, help="Offset in the recording session to start from, e.g. 120s")
+    parser.add_argument("--keyframes", type=Path, help="Keyframes of the recording session to start from, see keyframes.py")
     recording_args, _ = parser.parse_known_args(argv)
+    if (recording_args.start is None) != (recording_args.keyframes is None):
+        parser.error("--start and --keyframes are used together")
     return recording_args
 
 
@@ -35,4 +49,4 @@ if __name__ == "__main__":
     configure_logging(args.loglevel)
     recording_args = parse_recording_args()
 
-    asyncio.run(main(args, recording_args.recording_session))
+    asyncio.run(main(args, recording_args.recording_session, recording_args.start, recording_args.keyframes))
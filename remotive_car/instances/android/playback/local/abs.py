@@ -1,14 +1,16 @@
 import asyncio
 from dataclasses import dataclass
+from typing import Any
 
 import structlog
-from remotivelabs.broker import BrokerClient, Frame, RestbusSignalConfig
+from remotivelabs.broker import BrokerClient, RestbusSignalConfig
 from remotivelabs.topology.behavioral_model import BehavioralModel
 from remotivelabs.topology.cli.behavioral_model import BehavioralModelArgs
 from remotivelabs.topology.namespaces import filters
 from remotivelabs.topology.namespaces.can import CanNamespace, RestbusConfig
 from remotivelabs.topology.namespaces.generic import GenericNamespace
 
+from .joiner import JoinGroup, SignalJoiner
 from .log import configure_logging
 
 logger = structlog.get_logger(__name__)
@@ -22,6 +24,7 @@ class ABS:
 
     speed_signal_vss: str = "Vehicle.Speed"
     speed_signal: str = "UISpeedFrame.uispeed"
+    join_window_s: float = 0.05
 
     def __init__(self, avp: BehavioralModelArgs) -> None:
         self._broker_client = BrokerClient(avp.url, auth=avp.auth)
@@ -34,13 +37,14 @@ class ABS:
             ABS.vss_namespace_name,
             broker_client=self._broker_client,
         )
+        self.joiner = SignalJoiner(
+            self.chassis_can.restbus, [JoinGroup("speed", (ABS.speed_signal_vss,), self.speed_signals)], window_s=ABS.join_window_s
+        )
         self.bm = BehavioralModel(
             ABS.ecu_name,
             namespaces=[self.vss, self.chassis_can],
             broker_client=self._broker_client,
-            input_handlers=[
-                self.vss.create_input_handler([filters.FrameFilter(frame_name=ABS.speed_signal_vss)], self.on_speed_frame),
-            ],
+            input_handlers=[self.vss.create_input_handler(self.joiner.frame_filters(), self.joiner.on_frame)],
         )
 
     async def __aenter__(self):
@@ -49,16 +53,16 @@ class ABS:
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.joiner.close()
+        logger.info("Joined VSS signals", **self.joiner.stats.as_dict())
         await self.bm.stop()
         await self._broker_client.disconnect()
 
     def __await__(self):
         return self.bm.run_forever().__await__()
 
-    async def on_speed_frame(self, frame: Frame) -> None:
-        await self.chassis_can.restbus.update_signals(
-            RestbusSignalConfig.set(name=ABS.speed_signal, value=(float(frame.value or 0.0) / 3.6)),
-        )
+    def speed_signals(self, values: dict[str, Any]) -> list[RestbusSignalConfig]:
+        return [RestbusSignalConfig.set(name=ABS.speed_signal, value=(float(values[ABS.speed_signal_vss] or 0.0) / 3.6))]
 
 
 async def main(avp: BehavioralModelArgs):
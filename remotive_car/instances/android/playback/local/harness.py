@@ -0,0 +1,451 @@
+"""
+Plays a recording session into the local playback ECUs (TCU, ABS and SCCM), and into the BCM and GWM if they are installed in the same
+environment, without a broker and faster than real time.
+
+    python -m playback.local.harness ../../recordings/tesla.recordingsession.yaml --speed 10
+    python -m playback.local.harness ../../recordings/tesla.recordingsession.yaml --write-expected tesla.expected.json
+    python -m playback.local.harness ../../recordings/tesla.recordingsession.yaml --expected tesla.expected.json
+    python -m playback.local.harness ../../recordings/tesla.recordingsession.yaml --write-keyframes 10s
+    python -m playback.local.harness ../../recordings/tesla.recordingsession.yaml --start 120s
+
+The frames are played on a virtual clock that follows their timestamps, so the join windows of the ECUs see the timing of the recording
+at any speed. With --speed 0 (the default) the recording is played as fast as possible, with back-pressure: each frame is handled by the
+ECUs, and their restbus updates by the ECUs downstream, before the next frame is played.
+
+The restbus updates of all ECUs are summarized per signal, and can be compared with the summary of an earlier run. The BCM blinks the
+turn lights on a real time timer, so the turn lights (and the GWM events forwarding them) are left out of the comparison.
+
+With --write-keyframes, the session is played into the playback ECUs only, and their state is written as keyframes next to the session
+(see keyframes.py). With --start, the playback starts from the keyframe at or before the given offset, restored into the ECUs. The
+recording files are still read and parsed from their start, and the frames before the keyframe dropped: the seek saves the work of the
+ECUs, not the parsing of the files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import heapq
+import importlib
+import itertools
+import json
+import logging
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable, Mapping, Sequence
+
+import structlog
+from remotivelabs.broker import Frame, RestbusSignalConfig
+from remotivelabs.broker.auth import NoAuth
+from remotivelabs.topology.cli.behavioral_model import BehavioralModelArgs
+from remotivelabs.topology.namespaces.some_ip import SomeIPEvent
+
+from ..duration import parse_duration
+from ..session.session import RecordingSession, load_platform
+from .abs import ABS
+from .joiner import SignalJoiner
+from .keyframes import Keyframe, Keyframes, keyframes_path
+from .log import configure_logging
+from .sccm import SCCM
+from .tcu import TCU
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_PLATFORM = Path(__file__).resolve().parents[4] / "platform" / "remotive-car.platform.yaml"
+
+# outputs that follow a real time timer, and differ between runs at different speeds
+TIMED_OUTPUTS = ("BCM-BodyCan0/TurnLightControl.", "GWM-SOMEIP/TurnlightControlEvent.")
+
+Handler = Callable[[Frame], Awaitable[None]]
+
+
+def _optional(module: str, name: str) -> Any:
+    # the BCM and GWM are separate projects, so they are only played if they are installed (or on the path)
+    try:
+        return getattr(importlib.import_module(module), name)
+    except ImportError:
+        return None
+
+
+BCM = _optional("bcm.__main__", "BCM")
+GWM = _optional("gwm.__main__", "GWM")
+
+
+class PlaybackClock:
+    """
+    Virtual time of the playback, in microseconds of the recording. A sleep ends when the playback passes its deadline.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0
+        self._sleepers: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+
+    async def sleep(self, seconds: float) -> None:
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + round(seconds * 1_000_000), next(self._order), future))
+        await future
+
+    async def advance(self, timestamp: int) -> None:
+        while self._sleepers and self._sleepers[0][0] <= timestamp:
+            deadline, _, future = heapq.heappop(self._sleepers)
+            if future.done():
+                continue  # the sleeper was cancelled
+            self.now = max(self.now, deadline)
+            future.set_result(None)
+            # let the sleeper run (e.g. close a join window) at its deadline, before the time moves on
+            await asyncio.sleep(0)
+        self.now = max(self.now, timestamp)
+
+
+class SignalSummary:
+    """
+    The updates of one signal: their number, the number of times the value changed, a hash of the values it changed between, and the
+    last value.
+    """
+
+    def __init__(self) -> None:
+        self.updates = 0
+        self.changes = 0
+        self.last: Any = None
+        self._hash = hashlib.sha256()
+
+    def add(self, value: Any) -> None:
+        value = round(value, 6) if isinstance(value, float) else value
+        self.updates += 1
+        if self.changes == 0 or value != self.last:
+            self.changes += 1
+            self.last = value
+            self._hash.update(repr(value).encode())
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"updates": self.updates, "changes": self.changes, "digest": self._hash.hexdigest()[:16], "last": self.last}
+
+
+@dataclass
+class HarnessStats:
+    frames: int = 0
+    ignored: int = 0
+    outputs: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {"frames": self.frames, "ignored": self.ignored, "outputs": self.outputs, "errors": self.errors}
+
+
+class RecordingRestbus:
+    """
+    Stands in for the restbus of a namespace of an ECU. The updates are recorded, and passed on to the ECUs on the same channel.
+    """
+
+    def __init__(self, harness: Harness, namespace: str) -> None:
+        self.harness = harness
+        self.namespace = namespace
+
+    async def update_signals(self, *signals: RestbusSignalConfig | tuple[str, Any]) -> None:
+        values = [
+            (signal.name, signal.loop[0] if signal.loop else None) if isinstance(signal, RestbusSignalConfig) else signal
+            for signal in signals
+        ]
+        await self.harness.output(self.namespace, values)
+
+    async def reset(self) -> None:
+        pass
+
+
+@dataclass
+class RecordingNamespace:
+    name: str
+    restbus: RecordingRestbus
+
+
+class RecordingSomeIP:
+    """
+    Stands in for the SOME/IP namespace of an ECU. The parameters of the events are recorded as signals, named Event.Parameter.
+    """
+
+    def __init__(self, harness: Harness, namespace: str) -> None:
+        self.harness = harness
+        self.namespace = namespace
+
+    async def notify(self, event: SomeIPEvent) -> None:
+        await self.harness.output(self.namespace, [(f"{event.name}.{name}", value) for name, value in event.parameters.items()])
+
+
+def _channel(namespace: str) -> str:
+    # the namespaces of an ECU are named by the ECU and the channel, e.g. SCCM-DriverCan0
+    return namespace.split("-", 1)[-1]
+
+
+class Harness:
+    """
+    Routes the frames of a recording to the playback ECUs, and the restbus updates of the ECUs, as frames of the channel, to the ECUs
+    subscribing to them. The frames of a channel start with all signals of the database of the channel set to 0.
+    """
+
+    def __init__(self, platform: Path, cache_dir: Path | None = None) -> None:
+        self.clock = PlaybackClock()
+        self.stats = HarnessStats()
+        self.summaries: dict[str, SignalSummary] = {}
+        self.errors: list[str] = []
+        # the last values of the restbus signals of each namespace, and of the signals of the recording played into the ECUs
+        self.restbus: dict[str, dict[str, Any]] = {}
+        self.signals: dict[str, Any] = {}
+        self._frames: dict[str, dict[str, dict[str, Any]]] = {
+            channel: {
+                message.name: {f"{message.name}.{signal.name}": 0 for signal in message.signals} for message in compiled.database.messages
+            }
+            for channel, compiled in load_platform(platform, cache_dir).items()
+        }
+        self._inputs: dict[str, list[Handler]] = {}
+        self._joiners: list[SignalJoiner] = []
+        self._subscribers: dict[tuple[str, str], list[tuple[str, Handler]]] = {}
+
+    def add_playback_ecu(self, ecu: TCU | ABS | SCCM, namespace: str) -> None:
+        """
+        Play the VSS signals of the recording that the joiner of the ECU handles, and record its restbus updates in namespace.
+        """
+        ecu.joiner.restbus = RecordingRestbus(self, namespace)  # type: ignore[assignment]
+        ecu.joiner.sleep = self.clock.sleep
+        self._joiners.append(ecu.joiner)
+        for signal in ecu.joiner.signals:
+            self._inputs.setdefault(signal, []).append(ecu.joiner.on_frame)
+
+    def subscribe(self, namespace: str, frame_name: str, handler: Handler) -> None:
+        self._subscribers.setdefault((_channel(namespace), frame_name), []).append((namespace, handler))
+
+    async def output(self, namespace: str, signals: Sequence[tuple[str, Any]]) -> None:
+        self.stats.outputs += 1
+        channel = self._frames.setdefault(_channel(namespace), {})
+        restbus = self.restbus.setdefault(namespace, {})
+        changed: dict[str, bool] = {}
+        for name, value in signals:
+            restbus[name] = value
+            if f"{namespace}/{name}" not in self.summaries:
+                self.summaries[f"{namespace}/{name}"] = SignalSummary()
+            self.summaries[f"{namespace}/{name}"].add(value)
+            frame_name = name.split(".", 1)[0]
+            frame_signals = channel.setdefault(frame_name, {})
+            changed[frame_name] = changed.get(frame_name, False) or frame_signals.get(name) != value
+            frame_signals[name] = value
+
+        # as the subscriptions of the ECUs, only frames with changed signals are delivered
+        for frame_name in (name for name, is_changed in changed.items() if is_changed):
+            for subscriber, handler in self._subscribers.get((_channel(namespace), frame_name), []):
+                frame = Frame(timestamp=self.clock.now, name=frame_name, namespace=subscriber, signals=dict(channel[frame_name]), value=b"")
+                await self._handle(handler, frame)
+
+    async def _handle(self, handler: Handler, frame: Frame) -> None:
+        try:
+            await handler(frame)
+        except Exception as e:
+            # reported, so one failing handler does not stop the run
+            self.stats.errors += 1
+            if len(self.errors) < 10:
+                self.errors.append(f"{frame.namespace}/{frame.name}: {e!r}")
+
+    async def feed(self, frame: Frame) -> None:
+        """
+        Play one frame, at its timestamp, into the ECUs handling it.
+        """
+        handlers = self._inputs.get(frame.name)
+        if handlers is None:
+            self.stats.ignored += 1
+            return
+        await self.clock.advance(frame.timestamp)
+        self.signals[frame.name] = frame.value
+        for handler in handlers:
+            await self._handle(handler, frame)
+        self.stats.frames += 1
+
+    async def play(self, frames: Iterable[Frame], speed: float = 0.0) -> None:
+        """
+        Play the frames speed times faster than real time, or as fast as possible if speed is 0.
+        """
+        loop = asyncio.get_running_loop()
+        started, first = loop.time(), None
+        for frame in frames:
+            if speed > 0 and frame.name in self._inputs:
+                first = frame.timestamp if first is None else first
+                await asyncio.sleep(max(0.0, started + (frame.timestamp - first) / 1_000_000 / speed - loop.time()))
+            await self.feed(frame)
+
+    async def restore(self, timestamp: int, restbus: Mapping[str, Mapping[str, Any]], signals: Mapping[str, Any]) -> None:
+        """
+        Continue the playback from a snapshot of the restbus and the recording at timestamp, e.g. a keyframe. The restbus signals are
+        set as one update per namespace, and the joiners of the ECUs start over from the values of the recording.
+        """
+        self.clock.now = max(self.clock.now, timestamp)
+        self.signals.update(signals)
+        for joiner in self._joiners:
+            joiner.restore(signals)
+        for namespace, values in restbus.items():
+            await self.output(namespace, list(values.items()))
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        return {name: self.summaries[name].as_dict() for name in sorted(self.summaries)}
+
+
+def compare(summary: dict[str, dict[str, Any]], expected: dict[str, dict[str, Any]]) -> list[str]:
+    """
+    The signals whose summary differs from the expected one, leaving out the TIMED_OUTPUTS.
+    """
+    names = sorted(name for name in set(summary) | set(expected) if not name.startswith(TIMED_OUTPUTS))
+    return [name for name in names if summary.get(name) != expected.get(name)]
+
+
+def offline_args() -> BehavioralModelArgs:
+    # the broker clients of the models are needed to create them, but never connected
+    return BehavioralModelArgs(url="http://localhost:50051", auth=NoAuth(), delay_multiplier=1.0, loglevel="WARNING")
+
+
+def playback_ecus(harness: Harness, avp: BehavioralModelArgs) -> dict[str, TCU | ABS | SCCM]:
+    """
+    Create the TCU, ABS and SCCM, playing into the harness.
+    """
+    ecus: dict[str, TCU | ABS | SCCM] = {"TCU": TCU(avp), "ABS": ABS(avp), "SCCM": SCCM(avp)}
+    harness.add_playback_ecu(ecus["TCU"], TCU.body_can_namespace_name)
+    harness.add_playback_ecu(ecus["ABS"], ABS.chassis_can_namespace_name)
+    harness.add_playback_ecu(ecus["SCCM"], SCCM.driver_can_namespace_name)
+    return ecus
+
+
+def _downstream(harness: Harness, avp: BehavioralModelArgs) -> list[Any]:
+    """
+    Create the BCM and GWM, if installed, with their namespaces replaced by the harness.
+    """
+    ecus = []
+    if BCM is not None:
+        bcm = BCM(avp)
+        bcm.body_can_0 = RecordingNamespace(BCM.target_namespace, RecordingRestbus(harness, BCM.target_namespace))
+        for frame_name, handler in [
+            (BCM.turn_stalk_frame, bcm.on_turn_stalk),
+            (BCM.brake_pedal_position_frame, bcm.on_brake),
+            (BCM.accelerator_pedal_position_frame, bcm.on_accelerator),
+            (BCM.steering_angle_frame, bcm.on_steering_angle),
+        ]:
+            harness.subscribe(BCM.src_namespace, frame_name, handler)
+        ecus.append(bcm)
+    if GWM is not None:
+        gwm = GWM(avp)
+        gwm.someip_bus = RecordingSomeIP(harness, GWM.someip_ns)
+        gwm.body_can_0 = RecordingNamespace(GWM.can_ns, RecordingRestbus(harness, GWM.can_ns))
+        harness.subscribe(GWM.can_ns, "TurnLightControl", gwm.on_frame)
+        harness.subscribe(GWM.can_ns, "LocationFrame", gwm.on_location_frame)
+        harness.subscribe(GWM.can_ns, "GearInfo", gwm.on_gear_frame)
+        harness.subscribe(GWM.chassis_ns, "UISpeedFrame", gwm.on_speed_frame)
+        ecus.append(gwm)
+    return ecus
+
+
+async def run(
+    session_path: Path, platform: Path, speed: float, start: int | None = None, cache_dir: Path | None = None
+) -> tuple[Harness, dict[str, Any]]:
+    session = RecordingSession.load(session_path)
+    harness = Harness(platform, cache_dir)
+    avp = offline_args()
+    ecus = playback_ecus(harness, avp)
+    downstream = _downstream(harness, avp)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    keyframe = None
+    try:
+        if start is not None:
+            keyframe = Keyframes.load(keyframes_path(session.path)).at_offset(start)
+            await harness.restore(keyframe.timestamp, keyframe.restbus, keyframe.signals)
+        await harness.play(session.frames(start=keyframe.timestamp if keyframe else None, decode=False), speed)
+        for ecu in ecus.values():
+            await ecu.joiner.close()
+    finally:
+        for ecu in downstream:
+            if hasattr(ecu, "turn_signals_machine"):
+                ecu.turn_signals_machine.close()
+    wall_s = loop.time() - started
+
+    played_from = keyframe.timestamp if keyframe else session.start_time
+    recording_s = (harness.clock.now - played_from) / 1_000_000 if played_from is not None else None
+    return harness, {
+        **harness.stats.as_dict(),
+        "downstream": [type(ecu).__name__ for ecu in downstream],
+        "keyframe": keyframe.timestamp if keyframe else None,
+        "joiners": {name: ecu.joiner.stats.as_dict() for name, ecu in ecus.items()},
+        "signals": len(harness.summaries),
+        "recording_s": round(recording_s, 3) if recording_s is not None else None,
+        "wall_s": round(wall_s, 3),
+        "realtime_factor": round(recording_s / wall_s, 1) if recording_s and wall_s > 0 else None,
+        "frames_per_s": round(harness.stats.frames / wall_s) if wall_s > 0 else None,
+        "first_errors": harness.errors,
+    }
+
+
+async def build_keyframes(session: RecordingSession, platform: Path, interval: int, cache_dir: Path | None = None) -> Keyframes:
+    """
+    Play the session into the playback ECUs, without the ECUs downstream, and take a keyframe every interval µs of it.
+
+    Raises:
+        ValueError: If the interval is not positive.
+    """
+    if interval <= 0:
+        raise ValueError(f"Invalid keyframe interval {interval} us")
+    harness = Harness(platform, cache_dir)
+    ecus = playback_ecus(harness, offline_args())
+    keyframes: list[Keyframe] = []
+    start = session.start_time
+    for frame in session.frames(decode=False):
+        start = frame.timestamp if start is None else start
+        while frame.timestamp >= (timestamp := start + interval * (len(keyframes) + 1)):
+            # the join windows that end before the keyframe are sent first
+            await harness.clock.advance(timestamp)
+            restbus = {namespace: dict(signals) for namespace, signals in harness.restbus.items()}
+            keyframes.append(Keyframe(timestamp, restbus, dict(harness.signals)))
+        await harness.feed(frame)
+    for ecu in ecus.values():
+        await ecu.joiner.close()
+    return Keyframes(start=start or 0, interval=interval, keyframes=keyframes)
+
+
+async def write_keyframes(session_path: Path, platform: Path, interval: int) -> dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    keyframes = await build_keyframes(RecordingSession.load(session_path), platform, interval)
+    path = keyframes_path(session_path)
+    keyframes.save(path)
+    return {"keyframes": len(keyframes.keyframes), "path": str(path), "wall_s": round(loop.time() - started, 3)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play a recording session into the playback ECUs faster than real time.")
+    parser.add_argument("session", type=Path, help="Recording session file")
+    parser.add_argument("--speed", type=float, default=0.0, help="Times faster than real time. Defaults to 0, as fast as possible.")
+    parser.add_argument("--platform", type=Path, default=DEFAULT_PLATFORM, help="Platform with the databases of the ECU channels")
+    parser.add_argument("--expected", type=Path, help="Compare the outputs with this summary, and fail if they differ")
+    parser.add_argument("--write-expected", type=Path, help="Write the summary of the outputs to this file")
+    parser.add_argument("--write-keyframes", type=parse_duration, metavar="INTERVAL", help="Write keyframes every interval, e.g. 10s")
+    parser.add_argument("--start", type=parse_duration, help="Offset in the session to start from, e.g. 120s, from its keyframes")
+    parser.add_argument("--loglevel", type=str, default="WARNING")
+    args = parser.parse_args()
+
+    configure_logging(args.loglevel)
+    # the models log every update at debug level, which would dominate the run time
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.getLevelName(args.loglevel)))
+    if args.write_keyframes is not None:
+        print(json.dumps(asyncio.run(write_keyframes(args.session, args.platform, args.write_keyframes)), indent=2))
+        return
+    harness, result = asyncio.run(run(args.session, args.platform, args.speed, args.start))
+    summary = harness.summary()
+    if args.write_expected:
+        args.write_expected.write_text(json.dumps(summary, indent=1, default=str) + "\n", encoding="utf-8")
+    if args.expected:
+        expected = json.loads(args.expected.read_text(encoding="utf-8"))
+        # compare as read back from JSON, so values that JSON changes (e.g. tuples) compare equal
+        result["mismatches"] = compare(json.loads(json.dumps(summary, default=str)), expected)
+    print(json.dumps(result, indent=2))
+    if result.get("mismatches") or result["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
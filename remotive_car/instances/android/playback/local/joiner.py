@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Mapping, Sequence
+
+import structlog
+from remotivelabs.broker import Frame, RestbusSignalConfig
+from remotivelabs.topology.namespaces import filters
+from remotivelabs.topology.namespaces.generic import Restbus
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class JoinGroup:
+    """
+    VSS signals that are sent to the restbus together, e.g. latitude and longitude. to_restbus maps the values of a complete group, by
+    VSS signal name, to the restbus signals to set.
+
+    With fill_missing, a group that is not complete at the end of the window is still sent, with the latest earlier values of the missing
+    signals (e.g. the indicators, where only the one that changes may be sent), or their defaults. Otherwise it is reported as unmatched.
+    """
+
+    name: str
+    signals: tuple[str, ...]
+    to_restbus: Callable[[dict[str, Any]], Sequence[RestbusSignalConfig]]
+    fill_missing: bool = False
+    defaults: Mapping[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class JoinerStats:
+    groups: int = 0
+    late: int = 0
+    unmatched: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {"groups": self.groups, "late": self.late, "unmatched": self.unmatched}
+
+
+@dataclass
+class _Pending:
+    started_at: int
+    samples: dict[str, tuple[int, Any]] = field(default_factory=dict)
+    expiry: asyncio.Task | None = None
+
+
+@dataclass
+class _GroupState:
+    group: JoinGroup
+    pending: _Pending | None = None
+    latest: dict[str, Any] = field(default_factory=dict)
+    sent_until: int | None = None
+
+
+class SignalJoiner:
+    """
+    Joins VSS signals of a playback into groups by their source timestamps, and sends each complete group as one restbus update.
+
+    A group collects the samples with timestamps within window_s of its first sample. It is sent as soon as all its signals are present,
+    or handled at the end of the window (see JoinGroup.fill_missing). Samples older than the last sent group of their signals are late,
+    and are dropped. The end of a window is awaited with sleep, which a playback faster than real time replaces with its own clock.
+    """
+
+    def __init__(
+        self,
+        restbus: Restbus,
+        groups: Sequence[JoinGroup],
+        window_s: float = 0.05,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.restbus = restbus
+        self.window_s = window_s
+        self.sleep = sleep
+        self.stats = JoinerStats()
+        self._window_us = int(window_s * 1_000_000)
+        self._states = {group.name: _GroupState(group, latest=dict(group.defaults)) for group in groups}
+        self._state_by_signal = {signal: self._states[group.name] for group in groups for signal in group.signals}
+
+    @property
+    def signals(self) -> list[str]:
+        return list(self._state_by_signal)
+
+    def frame_filters(self) -> list[filters.FrameFilter]:
+        return [filters.FrameFilter(frame_name=signal) for signal in self.signals]
+
+    async def on_frame(self, frame: Frame) -> None:
+        state = self._state_by_signal.get(frame.name)
+        if state is None:
+            return
+        if state.sent_until is not None and frame.timestamp < state.sent_until:
+            self.stats.late += 1
+            logger.debug("Dropping late sample", signal=frame.name, group=state.group.name, late=self.stats.late)
+            return
+
+        pending = state.pending
+        if pending is not None and (frame.name in pending.samples or abs(frame.timestamp - pending.started_at) > self._window_us):
+            await self._close(state, pending)
+            pending = None
+        if pending is None:
+            pending = state.pending = _Pending(started_at=frame.timestamp)
+            if len(state.group.signals) > 1:
+                pending.expiry = asyncio.create_task(self._expire(state, pending))
+
+        pending.samples[frame.name] = (frame.timestamp, frame.value)
+        if len(pending.samples) == len(state.group.signals):
+            await self._send(state, pending)
+
+    async def close(self) -> None:
+        """
+        Handle the groups that are still pending, as if their windows ended.
+        """
+        for state in self._states.values():
+            if state.pending is not None:
+                await self._close(state, state.pending)
+
+    def restore(self, latest: Mapping[str, Any]) -> None:
+        """
+        Start over from the latest values of the signals, e.g. after a seek. Pending groups are dropped, no samples are late, and the
+        latest values fill the missing signals of groups as their defaults do.
+        """
+        for state in self._states.values():
+            if state.pending is not None:
+                self._cancel_expiry(state.pending)
+            state.pending, state.sent_until = None, None
+            state.latest.update((signal, latest[signal]) for signal in state.group.signals if signal in latest)
+
+    async def _expire(self, state: _GroupState, pending: _Pending) -> None:
+        await self.sleep(self.window_s)
+        pending.expiry = None
+        if state.pending is pending:
+            await self._close(state, pending)
+
+    async def _close(self, state: _GroupState, pending: _Pending) -> None:
+        missing = [signal for signal in state.group.signals if signal not in pending.samples]
+        if state.group.fill_missing and all(signal in state.latest for signal in missing):
+            await self._send(state, pending)
+            return
+        state.pending = None
+        self._cancel_expiry(pending)
+        self.stats.unmatched += len(pending.samples)
+        logger.debug("Unmatched samples", group=state.group.name, missing=missing, unmatched=self.stats.unmatched)
+
+    async def _send(self, state: _GroupState, pending: _Pending) -> None:
+        state.pending = None
+        self._cancel_expiry(pending)
+        state.latest.update((signal, value) for signal, (_, value) in pending.samples.items())
+        state.sent_until = max(timestamp for timestamp, _ in pending.samples.values())
+        self.stats.groups += 1
+        await self.restbus.update_signals(*state.group.to_restbus(dict(state.latest)))
+
+    @staticmethod
+    def _cancel_expiry(pending: _Pending) -> None:
+        if pending.expiry is not None and pending.expiry is not asyncio.current_task():
+            pending.expiry.cancel()
+        pending.expiry = None
@@ -0,0 +1,131 @@
+"""
+Keyframes of a recording session: snapshots of the restbus of the playback ECUs (TCU, ABS and SCCM), and of the last values of the
+recording signals they play, at fixed intervals of the session. They are built by the harness, and stored next to the session:
+
+    python -m playback.local.harness ../../recordings/tesla.recordingsession.yaml --write-keyframes 10s
+
+A playback can then start anywhere in the session without replaying it from the start: seek restores the keyframe at or before the
+offset in one restbus update, and moves the recording session to the keyframe, from where it is played. A keyframe holds no positions
+in the recording files: the harness, which reads the files itself, still reads the frames before it and skips them.
+
+A live seek only restores the restbus on the broker. The playback ECUs run as separate models, and their joiners start from the
+defaults of their groups, not from the recording signals of the keyframe: until the signals of a group that fills missing signals (the
+indicators of the SCCM) have all been played again, the missing ones are sent as their defaults. The harness restores both (see
+Harness.restore).
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from remotivelabs.broker import BrokerClient, RestbusSignalConfig
+from remotivelabs.broker.recording_session import RecordingSession
+
+VERSION = 1
+
+# the values a keyframe can hold, so that it reads back as it was written
+_JSON_VALUES = (str, int, float, bool, type(None))
+
+
+def keyframes_path(session_path: Path) -> Path:
+    """
+    The keyframes of a session, e.g. tesla.recordingsession.keyframes.json next to tesla.recordingsession.yaml.
+    """
+    return session_path.with_suffix(".keyframes.json")
+
+
+@dataclass(frozen=True)
+class Keyframe:
+    """
+    The state of the playback at timestamp (µs): the restbus signals by namespace, and the values of the recording signals.
+    """
+
+    timestamp: int
+    restbus: dict[str, dict[str, Any]] = field(default_factory=dict)
+    signals: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Keyframes:
+    """
+    The keyframes of a session, in time order, every interval µs from start, the start of the session.
+    """
+
+    start: int
+    interval: int
+    keyframes: list[Keyframe]
+
+    @classmethod
+    def load(cls, path: Path) -> Keyframes:
+        """
+        Raises:
+            ValueError: If path is not a keyframes file of this version.
+        """
+        try:
+            spec = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Invalid keyframes {path}: {e}") from e
+        if spec.get("version") != VERSION:
+            raise ValueError(f"Invalid keyframes {path}: version {spec.get('version')}")
+        keyframes = [Keyframe(keyframe["timestamp"], keyframe["restbus"], keyframe["signals"]) for keyframe in spec["keyframes"]]
+        return cls(start=spec["start"], interval=spec["interval"], keyframes=keyframes)
+
+    def save(self, path: Path) -> None:
+        """
+        Raises:
+            ValueError: If a value is not a JSON scalar (e.g. bytes or a tuple), which would not read back as it was written.
+        """
+        for keyframe in self.keyframes:
+            _check_values(keyframe)
+        keyframes = [{"timestamp": k.timestamp, "restbus": k.restbus, "signals": k.signals} for k in self.keyframes]
+        spec = {"version": VERSION, "start": self.start, "interval": self.interval, "keyframes": keyframes}
+        path.write_text(json.dumps(spec) + "\n", encoding="utf-8")
+
+    def at(self, timestamp: int) -> Keyframe:
+        """
+        The last keyframe at or before timestamp, or an empty keyframe at the start of the session.
+        """
+        index = bisect.bisect_right(self.keyframes, timestamp, key=lambda keyframe: keyframe.timestamp)
+        return self.keyframes[index - 1] if index > 0 else Keyframe(self.start)
+
+    def at_offset(self, offset: int) -> Keyframe:
+        """
+        The last keyframe at or before offset (µs) from the start of the session.
+        """
+        return self.at(self.start + offset)
+
+
+def _check_values(keyframe: Keyframe) -> None:
+    values = [(f"{namespace}/{name}", value) for namespace, signals in keyframe.restbus.items() for name, value in signals.items()]
+    values += keyframe.signals.items()
+    for name, value in values:
+        if not isinstance(value, _JSON_VALUES):
+            raise ValueError(f"Invalid keyframe at {keyframe.timestamp}: {name} is a {type(value).__name__}, not a JSON value")
+
+
+async def restore(broker_client: BrokerClient, keyframe: Keyframe) -> None:
+    """
+    Set the restbus signals of the keyframe, of all namespaces, in one update.
+    """
+    await broker_client.restbus.update_signals(
+        *(
+            (namespace, [RestbusSignalConfig.set(name=name, value=value) for name, value in signals.items()])
+            for namespace, signals in keyframe.restbus.items()
+            if signals
+        )
+    )
+
+
+async def seek(broker_client: BrokerClient, session: RecordingSession, keyframes: Keyframes, offset: int) -> Keyframe:
+    """
+    Restore the keyframe at or before offset (µs) from the start of the session, and seek the open recording session to it. Returns
+    the keyframe, whose offset is where the session plays from. Only the restbus is restored, not the joiners of the ECUs (see above).
+    """
+    keyframe = keyframes.at_offset(offset)
+    await restore(broker_client, keyframe)
+    await session.seek(keyframe.timestamp - keyframes.start)
+    return keyframe
@@ -2,16 +2,17 @@ from __future__ import annotations
 
 import asyncio
 from dataclasses import dataclass
-from typing import cast
+from typing import Any
 
 import structlog
-from remotivelabs.broker import BrokerClient, Frame, RestbusSignalConfig
+from remotivelabs.broker import BrokerClient, RestbusSignalConfig
 from remotivelabs.topology.behavioral_model import BehavioralModel
 from remotivelabs.topology.cli.behavioral_model import BehavioralModelArgs
 from remotivelabs.topology.namespaces import filters
 from remotivelabs.topology.namespaces.can import CanNamespace, RestbusConfig
 from remotivelabs.topology.namespaces.generic import GenericNamespace
 
+from .joiner import JoinGroup, SignalJoiner
 from .log import configure_logging
 
 logger = structlog.get_logger(__name__)
@@ -41,11 +42,7 @@ class SCCM:
     steering_angle_frame: str = "SteeringAngle"
     steering_angle_signal: str = "SteeringAngle.SteeringAngle"
 
-    indicator_left: bool | None = None
-    indicator_right: bool | None = None
-    accelerator_pedal: int = 0
-    brake_pedal: int = 0
-    steering_angle: float = 0.0
+    join_window_s: float = 0.05
 
     def __init__(self, avp: BehavioralModelArgs) -> None:
         self._broker_client = BrokerClient(avp.url, auth=avp.auth)
@@ -68,32 +65,27 @@ class SCCM:
             SCCM.vss_namespace_name,
             broker_client=self._broker_client,
         )
+        self.joiner = SignalJoiner(
+            self.driver_can.restbus,
+            [
+                JoinGroup(
+                    "indicators",
+                    (SCCM.vss_indicator_left, SCCM.vss_indicator_right),
+                    self.turnstalk_signals,
+                    fill_missing=True,
+                    defaults={SCCM.vss_indicator_left: False, SCCM.vss_indicator_right: False},
+                ),
+                JoinGroup("accelerator_pedal", (SCCM.vss_accelerator_pedal_position,), self.accelerator_pedal_signals),
+                JoinGroup("brake_pedal", (SCCM.vss_brake_pedal_position,), self.brake_pedal_signals),
+                JoinGroup("steering_angle", (SCCM.vss_steering_wheel_angle,), self.steering_angle_signals),
+            ],
+            window_s=SCCM.join_window_s,
+        )
         self.bm = BehavioralModel(
             SCCM.ecu_name,
             namespaces=[self.vss, self.driver_can],
             broker_client=self._broker_client,
-            input_handlers=[
-                self.vss.create_input_handler(
-                    [filters.FrameFilter(frame_name=SCCM.vss_indicator_left)],
-                    self.on_indicator_left,
-                ),
-                self.vss.create_input_handler(
-                    [filters.FrameFilter(frame_name=SCCM.vss_indicator_right)],
-                    self.on_indicator_right,
-                ),
-                self.vss.create_input_handler(
-                    [filters.FrameFilter(frame_name=SCCM.vss_accelerator_pedal_position)],
-                    self.on_accelerator_pedal,
-                ),
-                self.vss.create_input_handler(
-                    [filters.FrameFilter(frame_name=SCCM.vss_brake_pedal_position)],
-                    self.on_brake_pedal,
-                ),
-                self.vss.create_input_handler(
-                    [filters.FrameFilter(frame_name=SCCM.vss_steering_wheel_angle)],
-                    self.on_steering_angle,
-                ),
-            ],
+            input_handlers=[self.vss.create_input_handler(self.joiner.frame_filters(), self.joiner.on_frame)],
         )
 
     async def __aenter__(self):
@@ -102,51 +94,31 @@ class SCCM:
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.joiner.close()
+        logger.info("Joined VSS signals", **self.joiner.stats.as_dict())
         await self.bm.stop()
         await self._broker_client.disconnect()
 
     def __await__(self):
         return self.bm.run_forever().__await__()
 
-    async def on_indicator_left(self, frame: Frame) -> None:
-        self.indicator_left = cast(bool, frame.value)
-        await self._handle_direction_state()
-
-    async def on_indicator_right(self, frame: Frame) -> None:
-        self.indicator_right = cast(bool, frame.value)
-        await self._handle_direction_state()
-
-    async def on_accelerator_pedal(self, frame: Frame) -> None:
-        self.accelerator_pedal = cast(int, frame.value)
-        await self.driver_can.restbus.update_signals(
-            RestbusSignalConfig.set(name=SCCM.accelerator_pedal_signal, value=self.accelerator_pedal),
-        )
+    def turnstalk_signals(self, values: dict[str, Any]) -> list[RestbusSignalConfig]:
+        if values[SCCM.vss_indicator_left]:
+            turn_signal = 1
+        elif values[SCCM.vss_indicator_right]:
+            turn_signal = 2
+        else:
+            turn_signal = 0
+        return [RestbusSignalConfig.set(name=SCCM.turnstalk_signal, value=turn_signal)]
 
-    async def on_brake_pedal(self, frame: Frame) -> None:
-        self.brake_pedal = cast(int, frame.value)
-        await self.driver_can.restbus.update_signals(
-            RestbusSignalConfig.set(name=SCCM.brake_pedal_signal, value=self.brake_pedal),
-        )
+    def accelerator_pedal_signals(self, values: dict[str, Any]) -> list[RestbusSignalConfig]:
+        return [RestbusSignalConfig.set(name=SCCM.accelerator_pedal_signal, value=values[SCCM.vss_accelerator_pedal_position])]
 
-    async def on_steering_angle(self, frame: Frame) -> None:
-        self.steering_angle = cast(int, frame.value)
-        await self.driver_can.restbus.update_signals(
-            RestbusSignalConfig.set(name=SCCM.steering_angle_signal, value=-self.steering_angle),
-        )
+    def brake_pedal_signals(self, values: dict[str, Any]) -> list[RestbusSignalConfig]:
+        return [RestbusSignalConfig.set(name=SCCM.brake_pedal_signal, value=values[SCCM.vss_brake_pedal_position])]
 
-    async def _handle_direction_state(self) -> None:
-        if self.indicator_left:
-            await self.driver_can.restbus.update_signals(
-                RestbusSignalConfig.set(name=SCCM.turnstalk_signal, value=1),
-            )
-        elif self.indicator_right:
-            await self.driver_can.restbus.update_signals(
-                RestbusSignalConfig.set(name=SCCM.turnstalk_signal, value=2),
-            )
-        else:
-            await self.driver_can.restbus.update_signals(
-                RestbusSignalConfig.set(name=SCCM.turnstalk_signal, value=0),
-            )
+    def steering_angle_signals(self, values: dict[str, Any]) -> list[RestbusSignalConfig]:
+        return [RestbusSignalConfig.set(name=SCCM.steering_angle_signal, value=-values[SCCM.vss_steering_wheel_angle])]
 
 
 async def main(avp: BehavioralModelArgs):
@@ -2,16 +2,17 @@ from __future__ import annotations
 
 import asyncio
 from dataclasses import dataclass
-from typing import cast
+from typing import Any
 
 import structlog
-from remotivelabs.broker import BrokerClient, Frame, RestbusSignalConfig
+from remotivelabs.broker import BrokerClient, RestbusSignalConfig
 from remotivelabs.topology.behavioral_model import BehavioralModel
 from remotivelabs.topology.cli.behavioral_model import BehavioralModelArgs
 from remotivelabs.topology.namespaces import filters
 from remotivelabs.topology.namespaces.can import CanNamespace, RestbusConfig
 from remotivelabs.topology.namespaces.generic import GenericNamespace
 
+from .joiner import JoinGroup, SignalJoiner
 from .log import configure_logging
 
 logger = structlog.get_logger(__name__)
@@ -29,9 +30,7 @@ class TCU:
     latitude_signal: str = "LocationFrame.Latitude"
     longitude_signal: str = "LocationFrame.Longitude"
     heading_signal: str = "LocationFrame.Heading"
-    lat: float | None = None
-    lng: float | None = None
-    heading: float | None = None
+    join_window_s: float = 0.05
 
     def __init__(self, avp: BehavioralModelArgs) -> None:
         self._broker_client = BrokerClient(avp.url, auth=avp.auth)
@@ -44,24 +43,19 @@ class TCU:
             TCU.vss_namespace_name,
             broker_client=self._broker_client,
         )
+        self.joiner = SignalJoiner(
+            self.body_can.restbus,
+            [
+                JoinGroup("location", (TCU.vss_latitude, TCU.vss_longitude), self.location_signals),
+                JoinGroup("heading", (TCU.vss_heading,), self.heading_signals),
+            ],
+            window_s=TCU.join_window_s,
+        )
         self.bm = BehavioralModel(
             TCU.ecu_name,
             namespaces=[self.vss, self.body_can],
             broker_client=self._broker_client,
-            input_handlers=[
-                self.vss.create_input_handler(
-                    [filters.FrameFilter(frame_name=TCU.vss_latitude)],
-                    self.on_latitude,
-                ),
-                self.vss.create_input_handler(
-                    [filters.FrameFilter(frame_name=TCU.vss_longitude)],
-                    self.on_longitude,
-                ),
-                self.vss.create_input_handler(
-                    [filters.FrameFilter(frame_name=TCU.vss_heading)],
-                    self.on_heading,
-                ),
-            ],
+            input_handlers=[self.vss.create_input_handler(self.joiner.frame_filters(), self.joiner.on_frame)],
         )
 
     async def __aenter__(self):
@@ -70,38 +64,22 @@ class TCU:
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.joiner.close()
+        logger.info("Joined VSS signals", **self.joiner.stats.as_dict())
         await self.bm.stop()
         await self._broker_client.disconnect()
 
     def __await__(self):
         return self.bm.run_forever().__await__()
 
-    async def on_latitude(self, frame: Frame) -> None:
-        self.lat = cast(float, frame.value)
-        await self._handle_location_state()
-
-    async def on_longitude(self, frame: Frame) -> None:
-        self.lng = cast(float, frame.value)
-        await self._handle_location_state()
-
-    async def on_heading(self, frame: Frame) -> None:
-        self.heading = cast(float, frame.value)
-        await self._handle_location_state()
-
-    async def _handle_location_state(self) -> None:
-        if self.lat is not None and self.lng is not None:
-            await self.body_can.restbus.update_signals(
-                RestbusSignalConfig.set(name=TCU.latitude_signal, value=self.lat),
-                RestbusSignalConfig.set(name=TCU.longitude_signal, value=self.lng),
-            )
-            self.lat = None
-            self.lng = None
-
-        if self.heading is not None:
-            await self.body_can.restbus.update_signals(
-                RestbusSignalConfig.set(name=TCU.heading_signal, value=self.heading),
-            )
-            self.heading = None
+    def location_signals(self, values: dict[str, Any]) -> list[RestbusSignalConfig]:
+        return [
+            RestbusSignalConfig.set(name=TCU.latitude_signal, value=values[TCU.vss_latitude]),
+            RestbusSignalConfig.set(name=TCU.longitude_signal, value=values[TCU.vss_longitude]),
+        ]
+
+    def heading_signals(self, values: dict[str, Any]) -> list[RestbusSignalConfig]:
+        return [RestbusSignalConfig.set(name=TCU.heading_signal, value=values[TCU.vss_heading])]
 
 
 async def main(avp: BehavioralModelArgs):
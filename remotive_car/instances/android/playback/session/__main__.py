@@ -0,0 +1,54 @@
+"""
+Reads the frames of a recording session in time order, as the broker plays them, and reports the time it took.
+
+    python -m playback.session ../../../tesla/roundabout/roundabout.recordingsession.yaml
+    python -m playback.session ../../recordings/tesla.recordingsession.yaml --no-decode
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from .session import RecordingSession
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Read the frames of a recording session in time order.")
+    parser.add_argument("session", type=Path, help="Recording session file")
+    parser.add_argument("--no-decode", action="store_true", help="Do not decode the signals of candump frames")
+    args = parser.parse_args()
+
+    session = RecordingSession.load(args.session)
+    started = time.perf_counter()
+    frames, namespaces, first, last, unordered = 0, set(), None, None, 0
+    for frame in session.frames(decode=not args.no_decode):
+        frames += 1
+        namespaces.add(frame.namespace)
+        unordered += last is not None and frame.timestamp < last
+        first = frame.timestamp if first is None else first
+        last = frame.timestamp
+    done = time.perf_counter()
+
+    print(
+        json.dumps(
+            {
+                "name": session.name,
+                "recordings": [str(file.location) for file in session.recordings],
+                "namespaces": sorted(namespaces),
+                "frames": frames,
+                "unordered": unordered,
+                "first": first,
+                "last": last,
+                "read_ms": round(1000 * (done - started), 3),
+                "frames_per_s": round(frames / (done - started)) if done > started else None,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Streaming reader of recording sessions (remotive-recording-session:0.2), for offline tools.
+
+The recordings of a session are read as broker frames, in the order the broker plays them: the offset of each file is applied to its
+timestamps, and the files are merged by timestamp with a heap, one frame per file at a time, so the memory used does not depend on the
+length of the recordings. Each file is assumed to be in time order, as it is recorded.
+
+CSV rows are frames named by their signal, with the value of the signal, as the VSS signals of the local playback. Candump frames are
+named by the database of their channel in the platform of the session, with decoded signals (Frame.Signal), or by their hex frame id
+when they have no database. The channel of a candump frame is the default device of its file, or its interface, or the name of its
+file when the interface is not a channel of the platform.
+"""
+
+from __future__ import annotations
+
+import csv
+import heapq
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Mapping
+
+import yaml
+from remotivelabs.broker import Frame
+
+from ..codec.cache import CompiledDatabase
+from ..codec.files import iter_candump, load_database
+from ..codec.plan import MessagePlan
+from ..duration import parse_duration
+from ..store.ingest import csv_columns, parse_value
+
+SCHEMA = "remotive-recording-session:0.2"
+SCHEMAS = ("remotive-recording-session:0.1", SCHEMA)
+
+
+def load_platform(platform: Path, cache_dir: Path | None = None) -> dict[str, CompiledDatabase]:
+    """
+    The compiled databases (DBC or LDF) of the channels of a platform, by channel name and physical channel name, cached in cache_dir
+    (the default cache directory of the codec if None). Channels with other databases (e.g. VSS or FIBEX) are left out.
+    """
+    with platform.open(encoding="utf-8") as file:
+        channels: dict[str, Any] = (yaml.safe_load(file) or {}).get("channels") or {}
+    databases = {}
+    for name, channel in channels.items():
+        path = platform.parent / channel.get("database", "")
+        if path.suffix.lower() not in (".dbc", ".ldf"):
+            continue
+        databases[name] = load_database(path, cache_dir=cache_dir)
+        if physical := channel.get("can_physical_channel_name"):
+            databases[physical] = databases[name]
+    return databases
+
+
+@dataclass(frozen=True)
+class RecordingFile:
+    location: Path
+    type: str
+    offset: int = 0
+    default_device: str | None = None
+
+
+@dataclass
+class RecordingSession:
+    path: Path
+    name: str
+    files: tuple[RecordingFile, ...]
+    platforms: tuple[Path, ...] = ()
+    start_time: int | None = None
+    end_time: int | None = None
+    _plans: dict[str, Mapping[int, MessagePlan]] = field(default_factory=dict, init=False, compare=False, repr=False)
+
+    @classmethod
+    def load(cls, path: Path) -> RecordingSession:
+        """
+        Raises:
+            ValueError: If the file is not a recording session.
+        """
+        with path.open(encoding="utf-8") as file:
+            spec = yaml.safe_load(file) or {}
+        if spec.get("schema") not in SCHEMAS:
+            raise ValueError(f"Unsupported recording session schema {spec.get('schema')!r}, expected {SCHEMA!r}")
+        files = tuple(
+            RecordingFile(
+                location=path.parent / entry["location"],
+                type=entry.get("type", "recording"),
+                offset=parse_duration(entry["offset"]) if "offset" in entry else 0,
+                default_device=entry.get("default_device"),
+            )
+            for entry in spec.get("files") or []
+        )
+        return cls(
+            path=path,
+            name=spec.get("name", path.stem),
+            files=files,
+            platforms=tuple(path.parent / platform for platform in (spec.get("mapping") or {}).get("platform") or []),
+            start_time=parse_duration(spec["start_time"]) if "start_time" in spec else None,
+            end_time=parse_duration(spec["end_time"]) if "end_time" in spec else None,
+        )
+
+    @property
+    def recordings(self) -> list[RecordingFile]:
+        return [file for file in self.files if file.type == "recording"]
+
+    def channel_plans(self) -> dict[str, Mapping[int, MessagePlan]]:
+        """
+        The compiled databases (DBC or LDF) of the channels of the platforms of the session, by channel name and physical channel name.
+        """
+        if not self._plans:
+            for platform in self.platforms:
+                self._plans.update((channel, database.plans) for channel, database in load_platform(platform).items())
+        return self._plans
+
+    def frames(self, start: int | None = None, end: int | None = None, decode: bool = True) -> Iterator[Frame]:
+        """
+        The frames of the recordings of the session in time order, from start until (not including) end, by default the start and end
+        time of the session. Candump frames are decoded unless decode is False. The files are read from their start, also with a start.
+        """
+        start = self.start_time if start is None else start
+        end = self.end_time if end is None else end
+        plans = self.channel_plans()
+        if not decode:
+            plans = {channel: {} for channel in plans}
+        merged = heapq.merge(*(_read(file, plans) for file in self.recordings), key=lambda frame: frame.timestamp)
+        for frame in merged:
+            if start is not None and frame.timestamp < start:
+                continue
+            if end is not None and frame.timestamp >= end:
+                return
+            yield frame
+
+
+def _read(file: RecordingFile, plans: Mapping[str, Mapping[int, MessagePlan]]) -> Iterator[Frame]:
+    if file.location.suffix.lower() == ".csv":
+        return _read_csv(file)
+    return _read_candump(file, plans)
+
+
+def _read_csv(file: RecordingFile) -> Iterator[Frame]:
+    with file.location.open(encoding="utf-8", newline="") as log:
+        rows = csv.reader(log)
+        timestamp, signal, value, namespace = csv_columns(next(rows, []))
+        for row in rows:
+            if not row:
+                continue
+            parsed = parse_value(row[value])
+            yield Frame(
+                timestamp=round(float(row[timestamp]) * 1_000_000) + file.offset,
+                name=row[signal],
+                namespace=(row[namespace] if namespace is not None else "") or file.default_device or "",
+                signals={row[signal]: parsed},
+                value=parsed,
+            )
+
+
+def _namespace(file: RecordingFile, interface: str, plans: Mapping[str, Mapping[int, MessagePlan]]) -> str:
+    # logs recorded on a plain interface (e.g. can0) are often named by their channel, as ChassisBus.log
+    if file.default_device:
+        return file.default_device
+    return file.location.stem if interface not in plans and file.location.stem in plans else interface
+
+
+def _read_candump(file: RecordingFile, plans: Mapping[str, Mapping[int, MessagePlan]]) -> Iterator[Frame]:
+    for timestamp, interface, frame_id, payload in iter_candump(file.location):
+        namespace = _namespace(file, interface, plans)
+        plan = plans[namespace].get(frame_id) if namespace in plans else None
+        name = plan.name if plan is not None else f"{frame_id:X}"
+        yield Frame(
+            timestamp=round(timestamp * 1_000_000) + file.offset,
+            name=name,
+            namespace=namespace,
+            signals={f"{name}.{signal}": value for signal, value in plan.decode(payload).items()} if plan is not None else {},
+            value=payload,
+        )
@@ -0,0 +1,51 @@
+"""
+Converts a recording log to a columnar store next to it, and reports the time it took.
+
+    python -m playback.store ../../recordings/m_drive_2025-07-30/log.csv --default-device VSS
+    python -m playback.store ../../../tesla/roundabout/ChassisBus.log --database ../../../tesla/platform/Model3CAN_ChassisBus.dbc
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from .ingest import ingest
+from .store import Store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a CSV or candump log to a columnar store.")
+    parser.add_argument("log", type=Path, help="CSV or candump log")
+    parser.add_argument("--out", type=Path, help="Store directory. Defaults to the log name with .store appended")
+    parser.add_argument("--database", type=Path, help="DBC or LDF to decode a candump log with")
+    parser.add_argument("--default-device", help="Namespace of the signals, when the log does not name it")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    manifest = ingest(args.log, args.out, args.database, args.default_device)
+    ingested = time.perf_counter()
+    store = Store.open(args.out or args.log.with_name(f"{args.log.name}.store"))
+    snapshot = store.snapshot(store.end)
+    done = time.perf_counter()
+
+    print(
+        json.dumps(
+            {
+                "signals": len(manifest["signals"]),
+                "samples": sum(signal["count"] for signal in manifest["signals"]),
+                "start": manifest["start"],
+                "end": manifest["end"],
+                "ingest_ms": round(1000 * (ingested - started), 3),
+                "snapshot_ms": round(1000 * (done - ingested), 3),
+                "snapshot_signals": len(snapshot),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
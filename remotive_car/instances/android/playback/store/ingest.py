@@ -0,0 +1,107 @@
+"""
+Conversion of recording logs to stores, see store.py.
+
+CSV logs have one sample per row, with a header naming the timestamp (seconds), signal and value columns, and optionally the namespace
+(device) column. Rows without a namespace are stored in the default device of the log, as in a recording session. Candump logs are
+decoded with the DBC or LDF of their channel, and stored in the default device, or the namespace named by the file (e.g. ChassisBus).
+"""
+
+from __future__ import annotations
+
+import csv
+from array import array
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+
+from ..codec.batch import decode_log
+from ..codec.files import load_database, read_candump
+from .store import Value, write_store
+
+Samples = tuple[str, str, np.ndarray, "list[Value] | np.ndarray"]
+
+_TIMESTAMP = ("timestamp", "time", "t")
+_SIGNAL = ("signal", "name")
+_VALUE = ("value",)
+_NAMESPACE = ("namespace", "device", "channel")
+_BOOLEANS = {"true": True, "false": False}
+
+
+def _column(header: list[str], names: tuple[str, ...]) -> int | None:
+    return next((header.index(name) for name in names if name in header), None)
+
+
+def csv_columns(header: list[str]) -> tuple[int, int, int, int | None]:
+    """
+    The indices of the timestamp, signal, value and (optional) namespace columns of a CSV log, by its header.
+
+    Raises:
+        ValueError: If a column is missing.
+    """
+    lowered = [name.strip().lower() for name in header]
+    timestamp, signal, value = _column(lowered, _TIMESTAMP), _column(lowered, _SIGNAL), _column(lowered, _VALUE)
+    if timestamp is None or signal is None or value is None:
+        raise ValueError(f"A CSV log needs timestamp, signal and value columns, got {header}")
+    return timestamp, signal, value, _column(lowered, _NAMESPACE)
+
+
+def parse_value(value: str) -> Value:
+    """
+    Parse a value of a CSV log: a number, a boolean (true or false, as the VSS signals), or else text.
+    """
+    if value.strip().lower() in _BOOLEANS:
+        return _BOOLEANS[value.strip().lower()]
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def read_csv(path: Path, default_device: str) -> Iterator[Samples]:
+    """
+    Read the samples of a CSV log by signal. The log is read once, and the samples are kept as compact arrays until it is read.
+    """
+    samples: dict[tuple[str, str], tuple[array, list[Value]]] = {}
+    with path.open(encoding="utf-8", newline="") as file:
+        rows = csv.reader(file)
+        timestamp, signal, value, namespace = csv_columns(next(rows, []))
+        for row in rows:
+            if not row:
+                continue
+            key = (row[namespace] if namespace is not None and row[namespace] else default_device, row[signal])
+            if key not in samples:
+                samples[key] = (array("q"), [])
+            times, values = samples[key]
+            times.append(round(float(row[timestamp]) * 1_000_000))
+            values.append(parse_value(row[value]))
+    for (namespace_name, signal_name), (times, values) in samples.items():
+        yield namespace_name, signal_name, np.frombuffer(times, dtype=np.int64), values
+
+
+def read_candump_signals(path: Path, database: Path, namespace: str) -> Iterator[Samples]:
+    """
+    Read the decoded signals of a candump log, named Frame.Signal. Multiplexed signals only have samples in the frames that select them.
+    """
+    plans = load_database(database).plans
+    timestamps, frame_ids, payloads = read_candump(path)
+    times = np.round(timestamps * 1_000_000).astype(np.int64)
+    for message, frames in decode_log(plans, frame_ids, payloads).items():
+        for signal, values in frames.signals.items():
+            present = ~np.isnan(values)
+            yield namespace, f"{message}.{signal}", times[frames.rows][present], values[present]
+
+
+def ingest(path: Path, out: Path | None = None, database: Path | None = None, default_device: str | None = None) -> dict[str, Any]:
+    """
+    Convert a CSV or candump log to a store, by default next to the log (log.csv.store). Returns the manifest of the store.
+
+    Raises:
+        ValueError: If the log cannot be read, or a candump log has no database.
+    """
+    out = out or path.with_name(f"{path.name}.store")
+    if path.suffix.lower() == ".csv":
+        return write_store(out, read_csv(path, default_device or "default"), source=str(path))
+    if database is None:
+        raise ValueError(f"A database is needed to decode {path}")
+    return write_store(out, read_candump_signals(path, database, default_device or path.stem), source=str(path))
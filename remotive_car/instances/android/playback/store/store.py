@@ -0,0 +1,200 @@
+"""
+Columnar, time indexed store of the signals of a recording, see ingest.py.
+
+A store is a directory with a manifest and two NumPy arrays per signal, its timestamps (µs, ascending) and its values:
+
+    manifest.json   the signals, with the files of their columns, the kinds of their values, and the categories of text signals
+    00000.t.npy     the timestamps of signal 0
+    00000.v.npy     the values of signal 0: float64, int64 or bool by kind, or int32 indices of the categories of a text signal
+    00000.i.npy     a sparse index of signal 0, every BLOCK:th timestamp
+
+The arrays are memory mapped when read, so reading one signal of a whole drive, or the values at one point in time, does not read the
+rest of the store. A seek searches the sparse index of a column, and then reads one block of its timestamps.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Sequence, Union
+
+import numpy as np
+import numpy.typing as npt
+
+VERSION = 1
+BLOCK = 1024
+MANIFEST = "manifest.json"
+
+Value = Union[bool, float, str]
+SignalKey = tuple[str, str]
+
+# the kinds of values of a signal, by the NumPy dtype kind of its values
+KINDS = {"b": "bool", "i": "int", "u": "int", "f": "float"}
+_DTYPES = {"bool": np.bool_, "int": np.int64, "float": np.float64}
+
+
+@dataclass
+class Column:
+    """
+    The samples of one signal. timestamps and values are memory mapped, index is every BLOCK:th timestamp. kind is the kind of the values
+    (bool, int, float or text), which are returned as Python values of that type.
+    """
+
+    namespace: str
+    name: str
+    timestamps: npt.NDArray[np.int64]
+    values: np.ndarray
+    index: npt.NDArray[np.int64]
+    categories: tuple[str, ...] | None = None
+    kind: str = "float"
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def position(self, timestamp: int) -> int:
+        """
+        The number of samples at or before timestamp.
+        """
+        block = int(np.searchsorted(self.index, timestamp, side="right")) - 1
+        if block < 0:
+            return 0
+        start = block * BLOCK
+        return start + int(np.searchsorted(self.timestamps[start : start + BLOCK], timestamp, side="right"))
+
+    def at(self, timestamp: int) -> Value | None:
+        """
+        The value of the signal at timestamp, i.e. of its last sample at or before it.
+        """
+        row = self.position(timestamp) - 1
+        if row < 0:
+            return None
+        if self.categories is not None:
+            return self.categories[int(self.values[row])]
+        value: bool | int | float = self.values[row].item()
+        return value
+
+    def between(self, start: int, end: int) -> tuple[npt.NDArray[np.int64], np.ndarray]:
+        """
+        The timestamps and values of the samples from start until (not including) end, with the dtype of the kind of the signal. Values of
+        text signals are decoded to strings.
+        """
+        rows = slice(self.position(start - 1), self.position(end - 1))
+        return self.timestamps[rows], self.decoded(self.values[rows])
+
+    def decoded(self, values: np.ndarray) -> np.ndarray:
+        return np.asarray(self.categories, dtype=object)[values] if self.categories is not None else values
+
+
+class Store:
+    """
+    A store opened for reading. Columns are mapped when first used.
+    """
+
+    def __init__(self, path: Path, manifest: dict[str, Any]) -> None:
+        self.path = path
+        self.manifest = manifest
+        self._signals = {(signal["namespace"], signal["name"]): signal for signal in manifest["signals"]}
+        self._columns: dict[SignalKey, Column] = {}
+
+    @classmethod
+    def open(cls, path: Path) -> Store:
+        """
+        Raises:
+            ValueError: If path is not a store of this version.
+        """
+        try:
+            manifest = json.loads((path / MANIFEST).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Invalid store {path}: {e}") from e
+        if manifest.get("version") != VERSION:
+            raise ValueError(f"Invalid store {path}: version {manifest.get('version')}")
+        return cls(path, manifest)
+
+    @property
+    def start(self) -> int:
+        return int(self.manifest["start"])
+
+    @property
+    def end(self) -> int:
+        return int(self.manifest["end"])
+
+    @property
+    def signals(self) -> list[SignalKey]:
+        return list(self._signals)
+
+    def column(self, namespace: str, name: str) -> Column:
+        key = (namespace, name)
+        if key not in self._columns:
+            signal = self._signals[key]
+            self._columns[key] = Column(
+                namespace=namespace,
+                name=name,
+                timestamps=np.load(self.path / f"{signal['file']}.t.npy", mmap_mode="r"),
+                values=np.load(self.path / f"{signal['file']}.v.npy", mmap_mode="r"),
+                index=np.load(self.path / f"{signal['file']}.i.npy"),
+                categories=tuple(signal["categories"]) if signal.get("categories") is not None else None,
+                kind=signal.get("kind", "text" if signal.get("categories") is not None else "float"),
+            )
+        return self._columns[key]
+
+    def snapshot(self, timestamp: int, signals: Iterable[SignalKey] | None = None) -> dict[SignalKey, Value]:
+        """
+        The values of all signals (or the given ones) at timestamp. Signals without samples before it are left out.
+        """
+        snapshot = {}
+        for key in self.signals if signals is None else signals:
+            if (value := self.column(*key).at(timestamp)) is not None:
+                snapshot[key] = value
+        return snapshot
+
+
+def _values(values: Sequence[Value] | np.ndarray) -> tuple[np.ndarray, str, list[str] | None]:
+    """
+    The values to store, their kind, and the categories of text values.
+    """
+    array = np.asarray(values)
+    if array.dtype.kind in KINDS:
+        kind = KINDS[array.dtype.kind]
+        return array.astype(_DTYPES[kind]), kind, None
+    categories, codes = np.unique(array.astype(str), return_inverse=True)
+    return codes.astype(np.int32), "text", categories.tolist()
+
+
+def write_store(
+    path: Path, columns: Iterable[tuple[str, str, npt.ArrayLike, Sequence[Value] | np.ndarray]], source: str = ""
+) -> dict[str, Any]:
+    """
+    Write the columns (namespace, name, timestamps, values) of a recording to a store, replacing an existing store at path. Samples are
+    sorted by timestamp. A signal with any text value is stored as text, one with only booleans as bool, and one with any float as float.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = Path(tempfile.mkdtemp(dir=path.parent, prefix=f".{path.name}."))
+    signals: list[dict[str, Any]] = []
+    start, end = None, None
+    try:
+        for number, (namespace, name, timestamps, values) in enumerate(columns):
+            file = f"{number:05d}"
+            times = np.asarray(timestamps, dtype=np.int64)
+            order = np.argsort(times, kind="stable")
+            stored, kind, categories = _values(values)
+            np.save(temporary / f"{file}.t.npy", times[order])
+            np.save(temporary / f"{file}.i.npy", times[order][::BLOCK])
+            np.save(temporary / f"{file}.v.npy", stored[order])
+            signals.append(
+                {"namespace": namespace, "name": name, "file": file, "count": len(times), "kind": kind, "categories": categories}
+            )
+            if len(times):
+                first, last = int(times[order[0]]), int(times[order[-1]])
+                start, end = (first, last) if start is None or end is None else (min(start, first), max(end, last))
+        manifest = {"version": VERSION, "source": source, "start": start or 0, "end": end or 0, "signals": signals}
+        (temporary / MANIFEST).write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+        if path.exists():
+            shutil.rmtree(path)
+        temporary.rename(path)
+    except BaseException:
+        shutil.rmtree(temporary, ignore_errors=True)
+        raise
+    return manifest
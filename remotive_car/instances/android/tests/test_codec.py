@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import random
+
+import cantools
+import numpy as np
+import pytest
+
+from playback.codec.batch import decode_batch, decode_log
+from playback.codec.dbc import parse_dbc
+from playback.codec.ldf import parse_ldf
+from playback.codec.plan import MessagePlan, compile_database
+
+DBC = """
+VERSION ""
+
+BU_: ECU
+
+BO_ 256 Intel: 8 ECU
+ SG_ Speed : 0|16@1+ (0.01,0) [0|655.35] "m/s" ECU
+ SG_ Torque : 16|12@1- (0.5,-10) [-1034|1013.5] "Nm" ECU
+ SG_ Flag : 28|1@1+ (1,0) [0|1] "" ECU
+ SG_ Wide : 29|35@1+ (1,0) [0|34359738367] "" ECU
+
+BO_ 257 Motorola: 8 ECU
+ SG_ Angle : 7|16@0- (0.1,0) [-3276.8|3276.7] "deg" ECU
+ SG_ Odd : 21|11@0+ (1,5) [5|2052] "" ECU
+ SG_ Temperature : 38|7@0- (1,-40) [-104|23] "degC" ECU
+
+BO_ 258 Muxed: 8 ECU
+ SG_ Selector M : 0|8@1+ (1,0) [0|255] "" ECU
+ SG_ Always : 8|8@1+ (1,0) [0|255] "" ECU
+ SG_ Low m0 : 16|16@1- (1,0) [-32768|32767] "" ECU
+ SG_ High m1 : 23|16@0+ (0.5,0) [0|32767.5] "" ECU
+
+BO_ 2147484160 Extended: 8 ECU
+ SG_ Ratio : 0|32@1- (1,0) [0|0] "" ECU
+
+SIG_VALTYPE_ 2147484160 Ratio : 1;
+"""
+
+LDF = """
+LIN_description_file;
+LIN_protocol_version = "2.1";
+LIN_language_version = "2.1";
+LIN_speed = 19.2 kbps;
+
+Nodes {
+  Master: BCM, 5 ms, 0.1 ms;
+  Slaves: RearLight;
+}
+
+Signals {
+  Brightness: 8, 0, BCM, RearLight;
+  Mode: 2, 0, BCM, RearLight;
+  Fault: 1, 0, RearLight, BCM; // a comment
+}
+
+Frames {
+  LightCommand: 0x10, BCM, 2 {
+    Brightness, 0;
+    Mode, 8;
+  }
+  LightStatus: 0x11, RearLight, 1 {
+    Fault, 3;
+  }
+}
+
+Signal_encoding_types {
+  BrightnessEncoding {
+    physical_value, 0, 254, 0.5, 0, "%";
+    logical_value, 255, "invalid";
+  }
+}
+
+Signal_representation {
+  BrightnessEncoding: Brightness;
+}
+"""
+
+
+@pytest.fixture(scope="module")
+def plans() -> dict[int, MessagePlan]:
+    return compile_database(parse_dbc(DBC))
+
+
+def load_reference(dbc: str) -> cantools.database.can.Database:
+    database = cantools.database.load_string(dbc, "dbc")
+    assert isinstance(database, cantools.database.can.Database)
+    return database
+
+
+@pytest.fixture(scope="module")
+def reference() -> cantools.database.can.Database:
+    return load_reference(DBC)
+
+
+def random_payloads(count: int, length: int = 8, seed: int = 1) -> list[bytes]:
+    rng = random.Random(seed)
+    return [rng.randbytes(length) for _ in range(count)]
+
+
+def test_dbc_is_parsed_with_byte_order_sign_multiplexing_and_floats() -> None:
+    # when
+    messages = parse_dbc(DBC).by_name()
+
+    # then
+    torque = {signal.name: signal for signal in messages["Intel"].signals}["Torque"]
+    assert (torque.little_endian, torque.signed, torque.scale, torque.offset) == (True, True, 0.5, -10.0)
+    assert not {signal.name: signal for signal in messages["Motorola"].signals}["Angle"].little_endian
+    selector, _, low, high = messages["Muxed"].signals
+    assert selector.is_multiplexer and (low.multiplexer_value, high.multiplexer_value) == (0, 1)
+    assert (messages["Extended"].frame_id, messages["Extended"].extended) == (512, True)
+    assert messages["Extended"].signals[0].float_bits == 32
+
+
+@pytest.mark.parametrize("name", ["Intel", "Motorola", "Muxed", "Extended"])
+def test_decode_matches_cantools(plans: dict[int, MessagePlan], reference: cantools.database.can.Database, name: str) -> None:
+    # given
+    message = reference.get_message_by_name(name)
+    plan = plans[message.frame_id]
+
+    for random_payload in random_payloads(500):
+        # cantools rejects selector values without signals
+        payload = bytes([random_payload[0] % 2]) + random_payload[1:] if message.is_multiplexed() else random_payload
+
+        # when
+        decoded = plan.decode(payload)
+
+        # then
+        expected = message.decode(payload, decode_choices=False, scaling=True)
+        assert decoded == pytest.approx(expected, nan_ok=True), payload.hex()
+
+
+@pytest.mark.parametrize("name", ["Intel", "Motorola", "Muxed"])
+def test_encoded_values_round_trip(plans: dict[int, MessagePlan], reference: cantools.database.can.Database, name: str) -> None:
+    # given values at the limits of each signal, encoded by cantools
+    message = reference.get_message_by_name(name)
+    plan = plans[message.frame_id]
+    selectors = [0, 1] if message.is_multiplexed() else [0]
+
+    for selector in selectors:
+        for limit in ("minimum", "maximum"):
+            values = {
+                signal.name: float(selector) if signal.is_multiplexer else float(getattr(signal, limit))
+                for signal in message.signals
+                if signal.multiplexer_ids is None or selector in signal.multiplexer_ids
+            }
+
+            # when
+            decoded = plan.decode(message.encode(values, strict=False))
+
+            # then
+            assert decoded == pytest.approx(values)
+
+
+def test_unknown_multiplexer_value_selects_no_multiplexed_signals(plans: dict[int, MessagePlan]) -> None:
+    # when
+    decoded = plans[258].decode(bytes([7, 42, 0xFF, 0xFF, 0, 0, 0, 0]))
+
+    # then
+    assert decoded == {"Selector": 7, "Always": 42}
+
+
+def test_short_payload_is_zero_padded(plans: dict[int, MessagePlan]) -> None:
+    # when
+    decoded = plans[256].decode(b"\x10\x27")
+
+    # then
+    assert decoded == {"Speed": pytest.approx(100.0), "Torque": -10.0, "Flag": 0, "Wide": 0}
+
+
+# random float32 payloads include signaling NaNs, which numpy warns about when they are widened
+@pytest.mark.filterwarnings("ignore:invalid value encountered in cast:RuntimeWarning")
+@pytest.mark.parametrize("frame_id", [256, 257, 258, 512])
+def test_batch_decode_matches_single_decode(plans: dict[int, MessagePlan], frame_id: int) -> None:
+    # given
+    plan = plans[frame_id]
+    payloads = random_payloads(200, seed=frame_id)
+
+    # when
+    decoded = decode_batch(plan, np.frombuffer(b"".join(payloads), dtype=np.uint8).reshape(len(payloads), 8))
+
+    # then
+    for row, payload in enumerate(payloads):
+        expected = plan.decode(payload)
+        # multiplexed signals that are not selected are NaN in a batch, and missing in a single decode
+        actual = {name: float(values[row]) for name, values in decoded.items() if name in expected}
+        assert actual == pytest.approx(expected, nan_ok=True), payload.hex()
+        assert all(np.isnan(values[row]) for name, values in decoded.items() if name not in expected)
+
+
+def test_batch_decode_of_long_frames_matches_single_decode() -> None:
+    # given a CAN FD frame, with signals that are not read as one 64 bit word
+    dbc = """
+BO_ 300 Long: 32 ECU
+ SG_ Head : 0|8@1+ (1,0) [0|0] "" ECU
+ SG_ Middle : 60|20@1- (1,0) [0|0] "" ECU
+ SG_ Tail : 103|24@0+ (2,1) [0|0] "" ECU
+ SG_ Unaligned : 134|62@1+ (1,0) [0|0] "" ECU
+"""
+    plan = compile_database(parse_dbc(dbc))[300]
+    payloads = random_payloads(100, length=32)
+
+    # when
+    decoded = decode_batch(plan, np.frombuffer(b"".join(payloads), dtype=np.uint8).reshape(len(payloads), 32))
+
+    # then
+    reference = load_reference(dbc).get_message_by_frame_id(300)
+    for row, payload in enumerate(payloads):
+        assert {name: float(values[row]) for name, values in decoded.items()} == pytest.approx(reference.decode(payload)), payload.hex()
+
+
+def test_log_is_decoded_per_message(plans: dict[int, MessagePlan]) -> None:
+    # given frames of two messages, interleaved, and one without a plan
+    frame_ids = np.array([256, 257, 999, 256])
+    payloads = np.array(
+        [[0x10, 0x27, 0, 0, 0, 0, 0, 0], [0, 10, 0, 0, 0, 0, 0, 0], [0] * 8, [0x20, 0x4E, 0, 0, 0, 0, 0, 0]], dtype=np.uint8
+    )
+
+    # when
+    decoded = decode_log(plans, frame_ids, payloads)
+
+    # then
+    assert set(decoded) == {"Intel", "Motorola"}
+    assert decoded["Intel"].rows.tolist() == [0, 3]
+    assert decoded["Intel"].signals["Speed"].tolist() == pytest.approx([100.0, 200.0])
+    assert decoded["Motorola"].signals["Angle"].tolist() == pytest.approx([1.0])
+
+
+def test_ldf_frames_are_decoded_with_physical_encoding() -> None:
+    # given
+    plans = compile_database(parse_ldf(LDF))
+
+    # when
+    command = plans[0x10].decode(bytes([200, 0b10]))
+    status = plans[0x11].decode(bytes([0b1000]))
+
+    # then
+    assert command == {"Brightness": 100.0, "Mode": 2}
+    assert status == {"Fault": 1}
+
+
+def test_ldf_frame_with_unknown_signal_is_rejected() -> None:
+    # given
+    ldf = LDF.replace("Fault, 3;", "Missing, 3;")
+
+    # when / then
+    with pytest.raises(ValueError, match="unknown signal Missing"):
+        parse_ldf(ldf)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from playback.duration import parse_duration
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("120s", 120_000_000), ("-2s", -2_000_000), ("1.5ms", 1_500), ("1753865213743274us", 1_753_865_213_743_274), (" 2 m ", 120_000_000)],
+)
+def test_duration_is_parsed_to_microseconds(value: str, expected: int) -> None:
+    assert parse_duration(value) == expected
+
+
+@pytest.mark.parametrize("value", ["120", 120, "1d", "s"])
+def test_duration_without_unit_is_rejected(value: str | int) -> None:
+    with pytest.raises(ValueError, match="Invalid duration"):
+        parse_duration(value)
+
+
+def test_local_playback_does_not_import_the_offline_tools() -> None:
+    # when
+    code = "import sys, playback.local.__main__; print(sorted({'numpy', 'yaml', 'playback.session'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parents[1], check=True, capture_output=True, text=True)
+
+    # then the container entry point starts without them
+    assert result.stdout.strip() == "[]"
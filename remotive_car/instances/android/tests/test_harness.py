@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import importlib
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+
+from playback.local import harness as harness_module
+from playback.local.harness import DEFAULT_PLATFORM, build_keyframes, compare, run
+from playback.local.keyframes import Keyframe, Keyframes
+from playback.local.sccm import SCCM
+from playback.local.tcu import TCU
+from playback.session.session import RecordingSession
+
+TICKS = 100
+TICK_S = 0.02
+START_S = 1_753_865_525.0
+MODELS = Path(__file__).resolve().parents[3] / "models"
+
+
+@pytest.fixture(scope="module")
+def cache_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    # the compiled databases of the platform, instead of in the cache of the user
+    return tmp_path_factory.mktemp("cache")
+
+
+@pytest.fixture(scope="module")
+def session(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """
+    A synthetic session of the VSS signals of the playback ECUs, one sample of each every tick, and the left indicator every 10th tick.
+    The longitude follows the latitude within the join window of the TCU.
+    """
+    directory = tmp_path_factory.mktemp("session")
+    rows = ["timestamp,signal,value"]
+    for tick in range(TICKS):
+        t = START_S + tick * TICK_S
+        rows += [
+            f"{t:.6f},{TCU.vss_latitude},{57.7 + tick * 1e-5:.6f}",
+            f"{t + 0.005:.6f},{TCU.vss_longitude},{11.9 + tick * 1e-5:.6f}",
+            f"{t:.6f},{TCU.vss_heading},{tick % 360}",
+            f"{t:.6f},Vehicle.Speed,{tick * 0.5}",
+            f"{t:.6f},{SCCM.vss_steering_wheel_angle},{tick - 50}",
+            f"{t:.6f},{SCCM.vss_accelerator_pedal_position},{tick % 100}",
+            f"{t:.6f},{SCCM.vss_brake_pedal_position},{(tick * 7) % 100}",
+        ]
+        if tick % 10 == 0:
+            rows.append(f"{t:.6f},{SCCM.vss_indicator_left},{'true' if tick % 20 == 0 else 'false'}")
+    (directory / "log.csv").write_text("\n".join(rows) + "\n", encoding="utf-8")
+    path = directory / "synthetic.recordingsession.yaml"
+    session = {
+        "schema": "remotive-recording-session:0.2",
+        "name": "synthetic",
+        "files": [{"location": "./log.csv", "type": "recording", "default_device": "VSS"}],
+    }
+    path.write_text(yaml.safe_dump(session), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("speed", [0.0, 50.0])
+async def test_synthetic_session_is_played_with_the_expected_joins(session: Path, cache_dir: Path, speed: float) -> None:
+    # when
+    harness, result = await run(session, DEFAULT_PLATFORM, speed=speed, cache_dir=cache_dir)
+
+    # then every sample is played, and joined without late or unmatched samples
+    assert result["errors"] == 0, result["first_errors"]
+    assert result["frames"] == TICKS * 7 + TICKS // 10
+    assert result["joiners"] == {
+        "TCU": {"groups": 2 * TICKS, "late": 0, "unmatched": 0},
+        "ABS": {"groups": TICKS, "late": 0, "unmatched": 0},
+        "SCCM": {"groups": 3 * TICKS + TICKS // 10, "late": 0, "unmatched": 0},
+    }
+    assert harness.summary()["ABS-ChassisCan0/UISpeedFrame.uispeed"]["updates"] == TICKS
+
+
+async def test_playback_at_speed_matches_playback_as_fast_as_possible(session: Path, cache_dir: Path) -> None:
+    # given
+    fastest, _ = await run(session, DEFAULT_PLATFORM, speed=0.0, cache_dir=cache_dir)
+
+    # when
+    timed, _ = await run(session, DEFAULT_PLATFORM, speed=50.0, cache_dir=cache_dir)
+
+    # then the summaries compare equal, also as written to and read back from an expected file
+    assert compare(timed.summary(), fastest.summary()) == []
+    expected = json.loads(json.dumps(fastest.summary(), default=str))
+    assert compare(json.loads(json.dumps(timed.summary(), default=str)), expected) == []
+    assert len(fastest.summary()) > 0
+
+
+@pytest.fixture
+def downstream(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    The BCM and GWM, which are separate projects, from the models of the repository.
+    """
+    for project in ("bcm", "gwm"):
+        monkeypatch.syspath_prepend(str(MODELS / project / "python"))
+    bcm = pytest.importorskip("bcm.__main__", reason="the BCM needs the dependencies of its project (transitions)")
+    monkeypatch.setattr(harness_module, "BCM", bcm.BCM)
+    monkeypatch.setattr(harness_module, "GWM", importlib.import_module("gwm.__main__").GWM)
+
+
+@pytest.mark.usefixtures("downstream")
+async def test_downstream_ecus_are_driven_by_the_playback_ecus(session: Path, cache_dir: Path) -> None:
+    # when
+    harness, result = await run(session, DEFAULT_PLATFORM, speed=0.0, cache_dir=cache_dir)
+
+    # then
+    summary = harness.summary()
+    assert result["downstream"] == ["BCM", "GWM"]
+    assert result["errors"] == 0
+    # the BCM forwards the inputs of the SCCM on the body bus, and the GWM the turn lights of the BCM as a SOME/IP event
+    assert (
+        summary["BCM-BodyCan0/SteeringWheelInfo.SteeringWheelPosition"]["digest"]
+        == summary["SCCM-DriverCan0/SteeringAngle.SteeringAngle"]["digest"]
+    )
+    assert summary["BCM-BodyCan0/TurnLightControl.LeftTurnLightRequest"]["changes"] == 10
+    for side in ("Left", "Right"):
+        assert (
+            summary[f"GWM-SOMEIP/TurnlightControlEvent.{side}Turnlight"] == summary[f"BCM-BodyCan0/TurnLightControl.{side}TurnLightRequest"]
+        )
+    assert summary["GWM-SOMEIP/SpeedEvent.Speed"]["last"] == summary["ABS-ChassisCan0/UISpeedFrame.uispeed"]["last"]
+
+
+async def test_keyframes_of_the_harness_round_trip(session: Path, cache_dir: Path, tmp_path: Path) -> None:
+    # given
+    keyframes = await build_keyframes(RecordingSession.load(session), DEFAULT_PLATFORM, interval=500_000, cache_dir=cache_dir)
+    path = tmp_path / "synthetic.keyframes.json"
+
+    # when
+    keyframes.save(path)
+    loaded = Keyframes.load(path)
+
+    # then
+    assert loaded == keyframes
+    assert len(loaded.keyframes) == 3
+    keyframe = loaded.at_offset(1_200_000)
+    assert keyframe.timestamp == loaded.start + 1_000_000
+    # the last indicator sample before the keyframe is at tick 40
+    assert keyframe.signals[SCCM.vss_indicator_left] is True
+    assert keyframe.restbus["ABS-ChassisCan0"]["UISpeedFrame.uispeed"] == pytest.approx(keyframe.signals["Vehicle.Speed"] / 3.6)
+
+
+@pytest.mark.parametrize("value", [b"\x01", (1, 2)])
+def test_keyframe_with_value_that_does_not_round_trip_is_rejected(tmp_path: Path, value: object) -> None:
+    # given
+    keyframes = Keyframes(start=0, interval=1, keyframes=[Keyframe(1, {"SCCM-DriverCan0": {"Frame.Signal": value}})])
+
+    # when / then
+    with pytest.raises(ValueError, match="SCCM-DriverCan0/Frame.Signal is a"):
+        keyframes.save(tmp_path / "keyframes.json")
+    assert not (tmp_path / "keyframes.json").exists()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Sequence, cast
+
+import pytest
+from remotivelabs.broker import Frame, RestbusSignalConfig
+from remotivelabs.topology.namespaces.generic import Restbus
+
+from playback.local.joiner import JoinGroup, SignalJoiner
+
+
+class FakeRestbus:
+    def __init__(self) -> None:
+        self.updates: list[dict[str, Any]] = []
+
+    async def update_signals(self, *configs: RestbusSignalConfig) -> None:
+        self.updates.append({config.name: config.loop[0] for config in configs})
+
+
+class ManualSleep:
+    """Replaces asyncio.sleep, so that the windows of the joiner only end when the test says so."""
+
+    def __init__(self) -> None:
+        self.waiting: list[asyncio.Future[None]] = []
+
+    async def __call__(self, delay: float) -> None:  # noqa: ARG002
+        future = asyncio.get_running_loop().create_future()
+        self.waiting.append(future)
+        await future
+
+    async def expire(self) -> None:
+        # let the expiry tasks start sleeping
+        await asyncio.sleep(0)
+        waiting, self.waiting = self.waiting, []
+        for future in waiting:
+            if not future.done():
+                future.set_result(None)
+        # let the expiry tasks run
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+
+def to_restbus(values: dict[str, Any]) -> Sequence[RestbusSignalConfig]:
+    return [RestbusSignalConfig.set(name=f"Restbus.{name}", value=value) for name, value in values.items()]
+
+
+def frame(name: str, timestamp: int, value: Any) -> Frame:
+    return Frame(timestamp=timestamp, name=name, namespace="VSS", signals={}, value=value)
+
+
+LOCATION = JoinGroup("location", ("Latitude", "Longitude"), to_restbus)
+INDICATORS = JoinGroup("indicators", ("Left", "Right"), to_restbus, fill_missing=True, defaults={"Left": 0, "Right": 0})
+SPEED = JoinGroup("speed", ("Speed",), to_restbus)
+
+
+@pytest.fixture
+def restbus() -> FakeRestbus:
+    return FakeRestbus()
+
+
+@pytest.fixture
+def sleep() -> ManualSleep:
+    return ManualSleep()
+
+
+@pytest.fixture
+def joiner(restbus: FakeRestbus, sleep: ManualSleep) -> SignalJoiner:
+    return SignalJoiner(cast(Restbus, restbus), [LOCATION, INDICATORS, SPEED], window_s=0.05, sleep=sleep)
+
+
+async def test_complete_group_is_sent_as_one_update(joiner: SignalJoiner, restbus: FakeRestbus, sleep: ManualSleep) -> None:
+    # when
+    await joiner.on_frame(frame("Latitude", 1_000_000, 57.7))
+    await joiner.on_frame(frame("Longitude", 1_010_000, 11.9))
+    await joiner.on_frame(frame("Speed", 1_020_000, 20.0))
+
+    # then
+    assert restbus.updates == [{"Restbus.Latitude": 57.7, "Restbus.Longitude": 11.9}, {"Restbus.Speed": 20.0}]
+    assert joiner.stats.as_dict() == {"groups": 2, "late": 0, "unmatched": 0}
+
+    # and the end of the window changes nothing
+    await sleep.expire()
+    assert len(restbus.updates) == 2
+
+
+async def test_expired_window_fills_missing_signals_with_defaults(joiner: SignalJoiner, restbus: FakeRestbus, sleep: ManualSleep) -> None:
+    # given
+    await joiner.on_frame(frame("Left", 1_000_000, 1))
+    assert restbus.updates == []
+
+    # when
+    await sleep.expire()
+
+    # then
+    assert restbus.updates == [{"Restbus.Left": 1, "Restbus.Right": 0}]
+    assert joiner.stats.as_dict() == {"groups": 1, "late": 0, "unmatched": 0}
+
+
+async def test_expired_window_without_fill_missing_is_unmatched(joiner: SignalJoiner, restbus: FakeRestbus, sleep: ManualSleep) -> None:
+    # given
+    await joiner.on_frame(frame("Latitude", 1_000_000, 57.7))
+
+    # when
+    await sleep.expire()
+
+    # then
+    assert restbus.updates == []
+    assert joiner.stats.as_dict() == {"groups": 0, "late": 0, "unmatched": 1}
+
+
+async def test_sample_outside_of_the_window_starts_a_new_group(joiner: SignalJoiner, restbus: FakeRestbus) -> None:
+    # when
+    await joiner.on_frame(frame("Latitude", 1_000_000, 57.7))
+    await joiner.on_frame(frame("Longitude", 1_100_000, 11.9))
+    await joiner.on_frame(frame("Latitude", 1_110_000, 57.8))
+
+    # then
+    assert restbus.updates == [{"Restbus.Latitude": 57.8, "Restbus.Longitude": 11.9}]
+    assert joiner.stats.as_dict() == {"groups": 1, "late": 0, "unmatched": 1}
+
+
+async def test_late_sample_is_dropped(joiner: SignalJoiner, restbus: FakeRestbus) -> None:
+    # given
+    await joiner.on_frame(frame("Latitude", 1_000_000, 57.7))
+    await joiner.on_frame(frame("Longitude", 1_010_000, 11.9))
+
+    # when
+    await joiner.on_frame(frame("Latitude", 1_005_000, 50.0))
+
+    # then
+    assert len(restbus.updates) == 1
+    assert joiner.stats.as_dict() == {"groups": 1, "late": 1, "unmatched": 0}
+
+
+async def test_unknown_signal_is_ignored(joiner: SignalJoiner, restbus: FakeRestbus, sleep: ManualSleep) -> None:
+    # when
+    await joiner.on_frame(frame("Altitude", 1_000_000, 12.0))
+    await sleep.expire()
+
+    # then
+    assert restbus.updates == []
+    assert sleep.waiting == []
+    assert joiner.stats.as_dict() == {"groups": 0, "late": 0, "unmatched": 0}
+
+
+async def test_restore_fills_missing_signals_and_accepts_earlier_samples(joiner: SignalJoiner, restbus: FakeRestbus) -> None:
+    # given a sent group, and a seek back in the recording
+    await joiner.on_frame(frame("Left", 2_000_000, 1))
+    await joiner.close()
+    joiner.restore({"Left": 0, "Right": 1})
+
+    # when
+    await joiner.on_frame(frame("Left", 1_000_000, 1))
+    await joiner.close()
+
+    # then
+    assert restbus.updates == [{"Restbus.Left": 1, "Restbus.Right": 0}, {"Restbus.Left": 1, "Restbus.Right": 1}]
+    assert joiner.stats.late == 0
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from remotivelabs.broker import Frame
+
+from playback.cloud.mapping import SCHEMA, Translation, compile_mapping, compile_spec, load_mappings
+
+
+@pytest.fixture(scope="module")
+def translations() -> dict[str, dict[str, Translation]]:
+    return load_mappings()
+
+
+def translate(translations: dict[str, dict[str, Translation]], namespace: str, frame: str, **signals: Any) -> list[tuple[str, str, Any]]:
+    translation = translations[namespace][frame]
+    values = {f"{frame}.{name}": value for name, value in signals.items()}
+    return [
+        (target, config.name, config.loop[0])
+        for target, config in translation(Frame(timestamp=0, name=frame, namespace=namespace, signals=values, value=None))
+    ]
+
+
+# the translations of the hand-coded handlers that mapping.yaml replaced, by frame and signal values
+HANDLERS = [
+    pytest.param(
+        "ChassisBus",
+        "ID04FGPSLatLong",
+        {"GPSLatitude04F": 57.7, "GPSLongitude04F": 11.9},
+        [("TCU-BodyCan0", "LocationFrame.Latitude", 57.7), ("TCU-BodyCan0", "LocationFrame.Longitude", 11.9)],
+        id="location",
+    ),
+    pytest.param(
+        "ChassisBus",
+        "ID2D3UI_solarData",
+        {"UI_solarAzimuthAngle": 30.0, "UI_solarAzimuthAngleCarRef": 90.0},
+        [("TCU-BodyCan0", "LocationFrame.Heading", 300.0)],
+        id="heading",
+    ),
+    pytest.param(
+        "VehicleBus", "ID257DIspeed", {"DI_uiSpeed": 90.0}, [("ABS-ChassisCan0", "UISpeedFrame.uispeed", 25.0)], id="speed km/h to m/s"
+    ),
+    pytest.param(
+        "VehicleBus",
+        "ID129SteeringAngle",
+        {"SteeringAngle129": -12.5},
+        [("SCCM-DriverCan0", "SteeringAngle.SteeringAngle", -12.5)],
+        id="steering angle",
+    ),
+    pytest.param("VehicleBus", "ID129SteeringAngle", {"SteeringAngle129": None}, [], id="steering angle missing"),
+    pytest.param(
+        "VehicleBus",
+        "ID3C2VCLEFT_switchStatus",
+        {"VCLEFT_switchStatusIndex": "VCLEFT_SWITCH_STATUS_INDEX_0", "VCLEFT_brakePressed": 1},
+        [("SCCM-DriverCan0", "BrakePedalPositionSensor.BrakePedalPosition", 100.0)],
+        id="brake x100",
+    ),
+    pytest.param(
+        "VehicleBus",
+        "ID3C2VCLEFT_switchStatus",
+        {"VCLEFT_switchStatusIndex": "VCLEFT_SWITCH_STATUS_INDEX_1", "VCLEFT_brakePressed": 1},
+        [],
+        id="brake other switch index",
+    ),
+    pytest.param(
+        "VehicleBus",
+        "ID3C2VCLEFT_switchStatus",
+        {"VCLEFT_switchStatusIndex": "VCLEFT_SWITCH_STATUS_INDEX_0", "VCLEFT_brakePressed": None},
+        [],
+        id="brake missing",
+    ),
+    pytest.param(
+        "VehicleBus",
+        "ID118DriveSystemStatus",
+        {"DI_accelPedalPos": 42},
+        [("SCCM-DriverCan0", "AcceleratorPedalPositionSensor.AcceleratorPedalPosition", 42)],
+        id="accelerator pedal",
+    ),
+    pytest.param("VehicleBus", "ID118DriveSystemStatus", {"DI_accelPedalPos": 127}, [], id="accelerator pedal unknown"),
+    pytest.param(
+        "VehicleBus",
+        "ID3F5VCFRONT_lighting",
+        {"VCFRONT_indicatorLeftRequest": "TURN_SIGNAL_ACTIVE_LOW", "VCFRONT_indicatorRightRequest": "TURN_SIGNAL_ACTIVE_LOW"},
+        [("SCCM-DriverCan0", "TurnStalk.TurnSignal", 1)],
+        id="turn signal left first",
+    ),
+    pytest.param(
+        "VehicleBus",
+        "ID3F5VCFRONT_lighting",
+        {"VCFRONT_indicatorLeftRequest": "TURN_SIGNAL_OFF", "VCFRONT_indicatorRightRequest": "TURN_SIGNAL_ACTIVE_HIGH"},
+        [("SCCM-DriverCan0", "TurnStalk.TurnSignal", 2)],
+        id="turn signal right",
+    ),
+    pytest.param(
+        "VehicleBus",
+        "ID3F5VCFRONT_lighting",
+        {"VCFRONT_indicatorLeftRequest": "TURN_SIGNAL_OFF", "VCFRONT_indicatorRightRequest": "TURN_SIGNAL_OFF"},
+        [("SCCM-DriverCan0", "TurnStalk.TurnSignal", 0)],
+        id="turn signal off",
+    ),
+    pytest.param("VehicleBus", "ID3F5VCFRONT_lighting", {"VCFRONT_indicatorLeftRequest": "TURN_SIGNAL_OFF"}, [], id="turn signal missing"),
+]
+
+
+@pytest.mark.parametrize(("namespace", "frame", "signals", "expected"), HANDLERS)
+def test_mapping_matches_replaced_handler(
+    translations: dict[str, dict[str, Translation]],
+    namespace: str,
+    frame: str,
+    signals: dict[str, Any],
+    expected: list[tuple[str, str, Any]],
+) -> None:
+    # when
+    translated = translate(translations, namespace, frame, **signals)
+
+    # then
+    assert translated == [(target, signal, pytest.approx(value)) for target, signal, value in expected]
+
+
+def test_mapping_covers_the_frames_of_the_replaced_handlers(translations: dict[str, dict[str, Translation]]) -> None:
+    assert {namespace: sorted(frames) for namespace, frames in translations.items()} == {
+        "ChassisBus": ["ID04FGPSLatLong", "ID2D3UI_solarData"],
+        "VehicleBus": [
+            "ID118DriveSystemStatus",
+            "ID129SteeringAngle",
+            "ID257DIspeed",
+            "ID3C2VCLEFT_switchStatus",
+            "ID3F5VCFRONT_lighting",
+        ],
+    }
+
+
+def mapping(expression: str, **extra: Any) -> dict[str, Any]:
+    return {
+        "source": {"type": "broker", "frame": "Frame", "channel": "Bus"},
+        "target": {"type": "restbus", "signal": "Target.Signal", "channel": "ECU-Can0"},
+        "expression": expression,
+        **extra,
+    }
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        pytest.param("Speed.real", id="attribute"),
+        pytest.param("Speed[0]", id="subscript"),
+        pytest.param("__import__('os').system('true')", id="import"),
+        pytest.param("open('/etc/passwd')", id="builtin"),
+        pytest.param("(lambda: 1)()", id="lambda"),
+        pytest.param("[x for x in Speed]", id="comprehension"),
+        pytest.param("Speed.__class__", id="dunder"),
+    ],
+)
+def test_unsafe_expression_is_rejected(expression: str) -> None:
+    with pytest.raises(ValueError, match="Unsupported"):
+        compile_mapping(mapping(expression))
+
+
+def test_unsafe_condition_is_rejected() -> None:
+    with pytest.raises(ValueError, match="Unsupported"):
+        compile_mapping(mapping("Speed", when="Speed.imag == 0"))
+
+
+def test_whitelisted_functions_may_be_called() -> None:
+    # given
+    _, _, compiled = compile_mapping(mapping("round(max(Speed, 0) * 2)"))
+
+    # when
+    config = compiled.apply({"Frame.Speed": 10.4})
+
+    # then
+    assert config is not None and config.loop == [21]
+
+
+@pytest.mark.parametrize(
+    ("spec", "message"),
+    [
+        pytest.param({"schema": "other", "mappings": []}, "Unsupported mapping schema", id="schema"),
+        pytest.param({"schema": SCHEMA, "mappings": [mapping("Speed +")]}, "Invalid mapping 0: Invalid expression", id="syntax"),
+        pytest.param(
+            {"schema": SCHEMA, "mappings": [mapping("Speed", unit={"from": "km/h", "to": "furlong"})]},
+            "Unsupported unit conversion",
+            id="unit",
+        ),
+        pytest.param({"schema": SCHEMA, "mappings": [{"source": {"channel": "Bus"}}]}, "A source needs", id="source"),
+    ],
+)
+def test_invalid_spec_is_rejected(spec: dict[str, Any], message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        compile_spec(spec)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from playback.store.ingest import ingest
+from playback.store.store import BLOCK, MANIFEST, Store, write_store
+
+CSV = """timestamp,device,signal,value
+1.0,VSS,Vehicle.Speed,10.5
+1.5,,Vehicle.Body.Lights.IsHazardOn,true
+2.0,VSS,Vehicle.Speed,12
+2.5,,Vehicle.Body.Lights.IsHazardOn,false
+3.0,VSS,Vehicle.Powertrain.Gear,DRIVE
+1.2,VSS,Vehicle.Powertrain.Gear,PARK
+"""
+
+DBC = """
+BO_ 256 Status: 2 ECU
+ SG_ Speed : 0|8@1+ (0.5,0) [0|127.5] "m/s" ECU
+ SG_ Mode M : 8|4@1+ (1,0) [0|15] "" ECU
+ SG_ Level m1 : 12|4@1+ (1,0) [0|15] "" ECU
+"""
+
+CANDUMP = """(100.000000) can0 100#1401
+(100.010000) can0 100#1E22
+(100.020000) can0 100#2832
+"""
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> Store:
+    log = tmp_path / "log.csv"
+    log.write_text(CSV, encoding="utf-8")
+    ingest(log, default_device="Default")
+    return Store.open(tmp_path / "log.csv.store")
+
+
+def test_csv_is_ingested_by_namespace_and_signal_with_the_kind_of_its_values(store: Store) -> None:
+    # then
+    assert sorted(store.signals) == [
+        ("Default", "Vehicle.Body.Lights.IsHazardOn"),
+        ("VSS", "Vehicle.Powertrain.Gear"),
+        ("VSS", "Vehicle.Speed"),
+    ]
+    assert (store.start, store.end) == (1_000_000, 3_000_000)
+    kinds = {(signal["namespace"], signal["name"]): signal["kind"] for signal in store.manifest["signals"]}
+    assert kinds == {
+        ("Default", "Vehicle.Body.Lights.IsHazardOn"): "bool",
+        ("VSS", "Vehicle.Powertrain.Gear"): "text",
+        ("VSS", "Vehicle.Speed"): "float",
+    }
+
+
+def test_value_at_is_the_last_sample_at_or_before_it(store: Store) -> None:
+    # given
+    speed = store.column("VSS", "Vehicle.Speed")
+
+    # then
+    assert speed.at(999_999) is None
+    assert speed.at(1_000_000) == 10.5
+    assert speed.at(1_999_999) == 10.5
+    assert speed.at(5_000_000) == 12.0
+    assert store.column("VSS", "Vehicle.Powertrain.Gear").at(2_000_000) == "PARK"
+
+
+def test_bool_values_are_read_back_as_bools(store: Store) -> None:
+    # given
+    hazard = store.column("Default", "Vehicle.Body.Lights.IsHazardOn")
+
+    # when
+    values = [hazard.at(timestamp) for timestamp in (1_500_000, 2_500_000)]
+    _, between = hazard.between(0, 3_000_000)
+
+    # then
+    assert values == [True, False]
+    assert all(type(value) is bool for value in values)
+    assert between.dtype == np.bool_ and between.tolist() == [True, False]
+    assert store.snapshot(2_000_000)[("Default", "Vehicle.Body.Lights.IsHazardOn")] is True
+
+
+def test_between_includes_start_and_excludes_end(store: Store) -> None:
+    # when
+    timestamps, values = store.column("VSS", "Vehicle.Powertrain.Gear").between(1_200_000, 3_000_000)
+
+    # then the samples are sorted by timestamp, and text values are decoded
+    assert timestamps.tolist() == [1_200_000]
+    assert values.tolist() == ["PARK"]
+
+
+def test_snapshot_leaves_out_signals_without_samples(store: Store) -> None:
+    # when
+    snapshot = store.snapshot(1_300_000)
+
+    # then
+    assert snapshot == {("VSS", "Vehicle.Speed"): 10.5, ("VSS", "Vehicle.Powertrain.Gear"): "PARK"}
+
+
+def test_seek_across_blocks_of_the_sparse_index(tmp_path: Path) -> None:
+    # given
+    count = 3 * BLOCK + 10
+    write_store(tmp_path / "store", [("VSS", "Counter", np.arange(count) * 10, np.arange(count))])
+    counter = Store.open(tmp_path / "store").column("VSS", "Counter")
+
+    # then
+    assert counter.kind == "int"
+    assert [counter.at(t) for t in (0, 10 * BLOCK - 1, 10 * BLOCK, 10 * (count - 1) + 5)] == [0, BLOCK - 1, BLOCK, count - 1]
+    timestamps, values = counter.between(10 * (2 * BLOCK - 2), 10 * (2 * BLOCK + 2))
+    assert values.tolist() == list(range(2 * BLOCK - 2, 2 * BLOCK + 2))
+    assert timestamps.tolist() == [10 * value for value in values.tolist()]
+
+
+def test_store_without_kinds_is_read_as_float_and_text(tmp_path: Path) -> None:
+    # given a store written before the kinds were recorded
+    write_store(tmp_path / "store", [("VSS", "Speed", [1], [1.5]), ("VSS", "Gear", [1], ["PARK"])])
+    manifest = json.loads((tmp_path / "store" / MANIFEST).read_text(encoding="utf-8"))
+    for signal in manifest["signals"]:
+        del signal["kind"]
+    (tmp_path / "store" / MANIFEST).write_text(json.dumps(manifest), encoding="utf-8")
+
+    # when
+    store = Store.open(tmp_path / "store")
+
+    # then
+    assert store.snapshot(1) == {("VSS", "Speed"): 1.5, ("VSS", "Gear"): "PARK"}
+    assert store.column("VSS", "Gear").kind == "text"
+
+
+def test_candump_is_ingested_as_decoded_signals(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # given
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    (tmp_path / "status.dbc").write_text(DBC, encoding="utf-8")
+    (tmp_path / "ChassisBus.log").write_text(CANDUMP, encoding="utf-8")
+
+    # when
+    ingest(tmp_path / "ChassisBus.log", database=tmp_path / "status.dbc")
+    store = Store.open(tmp_path / "ChassisBus.log.store")
+
+    # then the namespace is named by the log, and multiplexed signals only have samples in the frames that select them
+    assert store.column("ChassisBus", "Status.Speed").between(0, 200_000_000)[1].tolist() == [10.0, 15.0, 20.0]
+    assert store.column("ChassisBus", "Status.Level").between(0, 200_000_000)[0].tolist() == [100_000_000]
+    assert store.snapshot(100_020_000) == {
+        ("ChassisBus", "Status.Speed"): 20.0,
+        ("ChassisBus", "Status.Mode"): 2.0,
+        ("ChassisBus", "Status.Level"): 0.0,
+    }
+
+
+def test_invalid_store_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Invalid store"):
+        Store.open(tmp_path)
@@ -12,9 +12,8 @@ from remotivelabs.topology.cli.behavioral_model import BehavioralModelArgs
 from remotivelabs.topology.namespaces import filters
 from remotivelabs.topology.namespaces.some_ip import SomeIPEvent, SomeIPNamespace
 
-from .broker_to_cuttlefish import BrokerToCuttlefish
-from .broker_to_emulator import BrokerToEmulator
 from .log import configure_logging
+from .sinks import GEAR, LOCATION, SPEED, SinkRegistry, create_sink, read_sink_configs
 
 logger = structlog.get_logger(__name__)
 
@@ -27,20 +26,12 @@ class IHU:
     def __init__(self, avp: BehavioralModelArgs) -> None:
         # capture the running loop (must be created inside a running asyncio loop)
         self._loop = asyncio.get_running_loop()
-        self.br_emulator = None
-        self.br_cuttlefish = None
-        virtual_device_type = os.getenv("VIRTUAL_DEVICE_TYPE") or "none"
 
-        if virtual_device_type == "android_emulator":
-            emulator_name = os.getenv("ANDROID_EMULATOR_NAME") or "emulator-5554"
-            self.br_emulator = BrokerToEmulator(emulator_name=emulator_name, vhal_callback=self._vhal_callback)
-
-        if virtual_device_type == "cuttlefish":
-            cuttlefish_gnss_url = os.getenv("CUTTLEFISH_GNSS_URL") or "https://localhost:1443/devices/cvd-1"
-            cuttlefish_vhal_url = os.getenv("CUTTLEFISH_VHAL_URL") or "localhost:9300"
-            self.br_cuttlefish = BrokerToCuttlefish(
-                cuttlefish_gnss_url=cuttlefish_gnss_url, cuttlefish_vhal_url=cuttlefish_vhal_url, vhal_callback=self._vhal_callback
-            )
+        # one sink (with its own worker) per virtual device, so that a slow device does not hold back the others
+        self.sinks = SinkRegistry(
+            [create_sink(config, vhal_callback=self._vhal_callback) for config in read_sink_configs()],
+            report_interval_s=float(os.getenv("SINK_REPORT_INTERVAL") or 30.0),
+        )
 
         self._broker_client = BrokerClient(url=avp.url, auth=avp.auth)
         self._some_ip_eth = SomeIPNamespace(IHU.someip_ns, client_id=3, broker_client=self._broker_client)
@@ -71,11 +62,13 @@ class IHU:
 
     async def __aenter__(self):
         await self._broker_client.connect()
+        self.sinks.start()
         await self.bm.start()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.bm.stop()
+        await self.sinks.stop()
         await self._broker_client.disconnect()
 
     def __await__(self):
@@ -102,24 +95,15 @@ class IHU:
         lon = float(event.parameters.get("Longitude") or 0)
         lat = float(event.parameters.get("Latitude") or 0)
         heading = float(event.parameters.get("Heading") or 0)
-        if self.br_emulator is not None:
-            self.br_emulator.redirect_location_signals_to_emulator(lon, lat)
-        if self.br_cuttlefish:
-            self.br_cuttlefish.redirect_location_signals_to_cuttlefish(lon, lat, heading)
+        self.sinks.publish(LOCATION, lon, lat, heading)
 
     async def _handle_speed_event(self, event: SomeIPEvent):
         speed = float(event.parameters.get("Speed") or 0)
-        if self.br_emulator is not None:
-            self.br_emulator.update_speed_property(speed)
-        if self.br_cuttlefish:
-            self.br_cuttlefish.update_speed_property(speed)
+        self.sinks.publish(SPEED, speed)
 
     async def _handle_gear_event(self, event: SomeIPEvent):
         gear = int(event.parameters.get("Gear") or 0)
-        if self.br_emulator is not None:
-            self.br_emulator.update_gear_property(gear)
-        if self.br_cuttlefish:
-            self.br_cuttlefish.update_gear_property(gear)
+        self.sinks.publish(GEAR, gear)
 
     async def _send_someip_event(self, name, service_instance_name, parameters) -> None:
         await self._some_ip_eth.notify(SomeIPEvent(name=name, service_instance_name=service_instance_name, parameters=parameters))
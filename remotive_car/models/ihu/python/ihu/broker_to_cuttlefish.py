@@ -1,7 +1,12 @@
+from __future__ import annotations
+
+from typing import Any
+
 import structlog
 
 from .libs.cuttlefish.gnss.gnss_client import GnssClient
 from .libs.cuttlefish.vhal.vhal_client import VhalClient
+from .vhal_transport import ReconnectingVhal
 
 PERF_VEHICLE_SPEED = 0x11600207
 HVAC_TEMPERATURE_SET = 0x15600503
@@ -10,34 +15,63 @@ GEAR_SELECTION = 0x11400400
 logger = structlog.get_logger(__name__)
 
 
+class CuttlefishVhalConnection:
+    """
+    A connection to the VHAL server of a Cuttlefish instance. The connection is considered closed when the property stream ends.
+    """
+
+    def __init__(self, client: VhalClient) -> None:
+        self._client = client
+
+    async def set_property(self, prop: int, area_id: int, value: Any) -> None:
+        await self._client.set_property(area_id, prop, value)
+
+    async def wait_closed(self) -> None:
+        await self._client.wait_closed()
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
 class BrokerToCuttlefish:
     def __init__(self, cuttlefish_gnss_url: str, cuttlefish_vhal_url: str, vhal_callback=None):
         self.gnss = GnssClient(cuttlefish_gnss_url)
-        self.vhal = VhalClient(
-            cuttlefish_vhal_url=cuttlefish_vhal_url,
+        self.cuttlefish_vhal_url = cuttlefish_vhal_url
+        self.vhal = ReconnectingVhal(f"cuttlefish:{cuttlefish_vhal_url}", connect=self._connect)
+        self.vhal.start()
+        self.vhal_callback = vhal_callback
+        self.speed_mps = 0.0
+
+    async def _connect(self) -> CuttlefishVhalConnection:
+        client = VhalClient(
+            cuttlefish_vhal_url=self.cuttlefish_vhal_url,
             on_vhal_prop_change=self._on_vhal_prop_change,
             property_ids_to_subscribe=[HVAC_TEMPERATURE_SET],
         )
-        self.vhal_callback = vhal_callback
-        self.speed_mps = 0.0
+        try:
+            await client.wait_ready(timeout_s=5.0)
+        except ConnectionError:
+            await client.close()
+            raise
+        return CuttlefishVhalConnection(client)
 
     def redirect_location_signals_to_cuttlefish(self, lon: float, lat: float, heading: float):
         if lat != 0 and lon != 0:
             self.gnss.send_gps(longitude=lon, latitude=lat, bearing=heading, speed_mps=self.speed_mps)
 
-    def update_speed_property(self, speed: float):
+    async def update_speed_property(self, speed: float):
         self.speed_mps = speed
         try:
-            self.vhal.set_property(0, PERF_VEHICLE_SPEED, self.speed_mps)
+            await self.vhal.set_property(PERF_VEHICLE_SPEED, 0, self.speed_mps)
         except Exception as e:
             logger.info(f"Error setting property ID 0x{PERF_VEHICLE_SPEED:08x}: {e}")
 
-    def update_gear_property(self, gear: int):
+    async def update_gear_property(self, gear: int):
         # gear: 0 = Reverse, 1 = Drive (from bodycan.dbc)
         # VHAL GEAR_SELECTION: 1 = Park, 2 = Reverse, 4 = Neutral, 8 = Drive
         vhal_gear = 8 if gear == 1 else 2  # Map 1->Drive(8), 0->Reverse(2)
         try:
-            self.vhal.set_property(0, GEAR_SELECTION, vhal_gear)
+            await self.vhal.set_property(GEAR_SELECTION, 0, vhal_gear)
         except Exception as e:
             logger.info(f"Error setting property ID 0x{GEAR_SELECTION:08x}: {e}")
 
@@ -1,9 +1,16 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from threading import Thread
+from typing import Any, Callable
 
 import structlog
 
 from .libs.emulator.adb.adb_emulator import AndroidEmulator
 from .libs.emulator.vhal import vhal_emulator
+from .vhal_transport import ReconnectingVhal
 
 PERF_VEHICLE_SPEED = 0x11600207
 HVAC_TEMPERATURE_SET = 0x15600503
@@ -12,40 +19,78 @@ GEAR_SELECTION = 0x11400400
 logger = structlog.get_logger(__name__)
 
 
+class EmulatorVhalConnection:
+    """
+    A connection to the VHAL of an Android emulator. Socket I/O is blocking, so writes run on a dedicated thread and messages are received
+    on a separate RX thread.
+    """
+
+    def __init__(self, vhal: vhal_emulator.Vhal, on_message: Callable[[Any], None]) -> None:
+        self._vhal = vhal
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vhal-tx")
+        self._closed = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._vhal.set_callback(on_message)
+
+        def _rx_thread():
+            self._vhal.rxThread()
+            loop.call_soon_threadsafe(self._closed.set)
+
+        Thread(target=_rx_thread, daemon=True).start()
+
+    async def set_property(self, prop: int, area_id: int, value: Any) -> None:
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, partial(self._vhal.set_property, prop, area_id, value))
+        except OSError as e:
+            raise ConnectionError(str(e)) from e
+
+    async def wait_closed(self) -> None:
+        await self._closed.wait()
+
+    async def close(self) -> None:
+        self._vhal.close()
+        self._executor.shutdown(wait=False)
+
+
 # @req COMP_REQ_IHU_ANDROID: IHU Android Emulator Bridge
 class BrokerToEmulator:
     def __init__(self, emulator_name: str, vhal_callback=None):
-        self.emulator = AndroidEmulator(emulator_name=emulator_name)
-        self.vhal = vhal_emulator.Vhal(None)
+        self.emulator_name = emulator_name
+        self.emulator: AndroidEmulator | None = None
         self.vhal_callback = vhal_callback
-        self._start_rx_thread()
-        self.vhal.set_callback(self._on_vhal_message)
+        self.vhal = ReconnectingVhal(f"emulator:{emulator_name}", connect=self._connect)
+        self.vhal.start()
 
-    def _start_rx_thread(self):
+    async def _connect(self) -> EmulatorVhalConnection:
         """
-        Start the RX thread to listen for messages from the VHAL.
+        (Re)connect to the emulator. Root and port forwarding are redone, since they are lost when the emulator restarts.
         """
-        rx_thread = Thread(target=self.vhal.rxThread, daemon=True)
-        rx_thread.start()
+
+        def _open() -> vhal_emulator.Vhal:
+            self.emulator = AndroidEmulator(emulator_name=self.emulator_name)
+            return vhal_emulator.Vhal(None)
+
+        vhal = await asyncio.to_thread(_open)
+        return EmulatorVhalConnection(vhal, on_message=self._on_vhal_message)
 
     def redirect_location_signals_to_emulator(self, lon: float, lat: float):
-        if lat != 0 and lon != 0:
+        if lat != 0 and lon != 0 and self.emulator is not None:
             self.emulator.send_fix(str(lon), str(lat))
 
-    def update_speed_property(self, speed_mps: float):
+    async def update_speed_property(self, speed_mps: float):
         try:
-            self.vhal.set_property(PERF_VEHICLE_SPEED, 0, speed_mps)
+            await self.vhal.set_property(PERF_VEHICLE_SPEED, 0, speed_mps)
         except Exception as e:
-            print(f"Error setting property ID 0x{PERF_VEHICLE_SPEED:08x}: {e}")
+            logger.info(f"Error setting property ID 0x{PERF_VEHICLE_SPEED:08x}: {e}")
 
-    def update_gear_property(self, gear: int):
+    async def update_gear_property(self, gear: int):
         # gear: 0 = Reverse, 1 = Drive (from bodycan.dbc)
         # VHAL GEAR_SELECTION: 1 = Park, 2 = Reverse, 4 = Neutral, 8 = Drive
         vhal_gear = 8 if gear == 1 else 2  # Map 1->Drive(8), 0->Reverse(2)
         try:
-            self.vhal.set_property(GEAR_SELECTION, 0, vhal_gear)
+            await self.vhal.set_property(GEAR_SELECTION, 0, vhal_gear)
         except Exception as e:
-            print(f"Error setting property ID 0x{GEAR_SELECTION:08x}: {e}")
+            logger.info(f"Error setting property ID 0x{GEAR_SELECTION:08x}: {e}")
 
     def _on_vhal_message(self, msg):
         """
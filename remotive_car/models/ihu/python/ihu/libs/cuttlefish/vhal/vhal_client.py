@@ -5,7 +5,8 @@ from enum import IntEnum
 from typing import Union
 
 from google.protobuf import empty_pb2
-from grpc.aio import insecure_channel
+from grpc import StatusCode  # type: ignore[import-untyped]
+from grpc.aio import AioRpcError, insecure_channel  # type: ignore[import-untyped]
 
 from .VehicleServer_pb2 import (
     VehiclePropValue,
@@ -23,18 +24,48 @@ class VhalClient:
         property_ids_to_subscribe: list[int] = [],
     ):
         print("Connecting to vhal server on %s" % cuttlefish_vhal_url)
-        channel = insecure_channel(cuttlefish_vhal_url)
-        self.stub = VehicleServerStub(channel)
+        self.channel = insecure_channel(cuttlefish_vhal_url)
+        self.stub = VehicleServerStub(self.channel)
         print("Connected to vhal server")
         self.on_vhal_prop_change = on_vhal_prop_change
         self.property_ids_to_subscribe = property_ids_to_subscribe
+        self._consumer: asyncio.Task | None = None
         if self.on_vhal_prop_change is not None:
             try:
                 loop = asyncio.get_running_loop()
-                loop.create_task(self._consume_vhal_properties())
+                self._consumer = loop.create_task(self._consume_vhal_properties())
             except RuntimeError:
                 asyncio.run(self._consume_vhal_properties())
 
+    async def wait_ready(self, timeout_s: float) -> None:
+        """
+        Wait until the channel to the vhal server is connected.
+
+        Raises:
+            ConnectionError: If the server is not reachable within the timeout.
+        """
+        try:
+            await asyncio.wait_for(self.channel.channel_ready(), timeout=timeout_s)
+        except asyncio.TimeoutError as e:
+            raise ConnectionError("vhal server not reachable") from e
+
+    async def wait_closed(self) -> None:
+        """
+        Wait until the property stream from the vhal server ends, e.g. because the server was restarted.
+        """
+        if self._consumer is None:
+            await asyncio.Event().wait()
+            return
+        try:
+            await self._consumer
+        except AioRpcError:
+            pass
+
+    async def close(self) -> None:
+        if self._consumer is not None:
+            self._consumer.cancel()
+        await self.channel.close()
+
     async def _consume_vhal_properties(self):
         stream = self.stub.StartPropertyValuesStream(empty_pb2.Empty())
         async for message in stream:
@@ -42,9 +73,14 @@ class VhalClient:
                 if self.on_vhal_prop_change is not None and value.prop in self.property_ids_to_subscribe:
                     self.on_vhal_prop_change(value.area_id, value.prop, self._get_property_value(value))
 
-    def set_property(self, area_id: int, prop: int, value: Union[int, float, bytes, str]):
+    async def set_property(self, area_id: int, prop: int, value: Union[int, float, bytes, str]):
         requests = self._create_property_requests(area_id=area_id, prop=prop, value=value)
-        self.stub.SetValues(requests)
+        try:
+            await self.stub.SetValues(requests)
+        except AioRpcError as e:
+            if e.code() in (StatusCode.UNAVAILABLE, StatusCode.CANCELLED):
+                raise ConnectionError(e.details()) from e
+            raise
 
     def _get_property_value(self, prop_value: VehiclePropValue) -> Union[int, float, bytes, str]:
         """
@@ -146,6 +146,8 @@ class Vhal:
         """
         # Receive the message length (int32) first
         b = self.sock.recv(4)
+        if len(b) == 0:
+            raise ConnectionResetError("Connection to vhal emulator closed")
         if len(b) == 4:
             (msgLen,) = struct.unpack("!I", b)
             if msgLen > 0:
@@ -246,6 +248,17 @@ class Vhal:
 
         self._tx_cmd(cmd)
 
+    def close(self):
+        """
+        Closes the socket to the Vehicle HAL, which also ends a running rxThread.
+        """
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+
     def __init__(self, device=None):
         # Save the list of types constants
         self.sock = None
@@ -275,8 +288,12 @@ class Vhal:
     def rxThread(self):
         """
         Thread that receives messages from the VHAL and triggers the callback.
+          Returns when the connection to the VHAL is lost.
         """
         while True:
-            msg = self.rx_msg()  # Blocking call to receive a message
+            try:
+                msg = self.rx_msg()  # Blocking call to receive a message
+            except OSError:
+                return
             if msg and self.callback:
                 self.callback(msg)  # Trigger the callback with the received message
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import inspect
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable
+
+import structlog
+
+from .vhal_transport import ReconnectingVhal
+
+logger = structlog.get_logger(__name__)
+
+# Kinds of updates the IHU forwards to its virtual devices
+LOCATION = "location"
+SPEED = "speed"
+GEAR = "gear"
+
+
+@dataclass(frozen=True)
+class SinkConfig:
+    """
+    Configuration of a single virtual Android device (sink) driven by the IHU.
+    """
+
+    type: str
+    name: str
+    options: dict[str, str] = field(default_factory=dict)
+
+
+def read_sink_configs() -> list[SinkConfig]:
+    """
+    Read the virtual devices to drive from the environment.
+
+    VIRTUAL_DEVICES holds a JSON list of devices, where each entry has a "type" ("android_emulator" or "cuttlefish"), an optional "name"
+    and the type specific options, e.g.:
+
+        [
+            {"type": "cuttlefish", "name": "cvd-1", "gnss_url": "https://cuttlefish:1443/devices/cvd-1", "vhal_url": "cuttlefish:9300"},
+            {"type": "android_emulator", "name": "emulator-5554"}
+        ]
+
+    If VIRTUAL_DEVICES is not set, a single device is configured from VIRTUAL_DEVICE_TYPE and its related variables.
+
+    Raises:
+        ValueError: If VIRTUAL_DEVICES is not a valid list of devices.
+    """
+    devices = os.getenv("VIRTUAL_DEVICES")
+    if devices:
+        try:
+            entries = json.loads(devices)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid VIRTUAL_DEVICES: {e}") from e
+        if not isinstance(entries, list):
+            raise ValueError("Invalid VIRTUAL_DEVICES: expected a list of devices")
+        configs = []
+        for index, entry in enumerate(entries):
+            options = {k: str(v) for k, v in entry.items() if k not in ("type", "name")}
+            configs.append(SinkConfig(type=entry["type"], name=entry.get("name") or f"{entry['type']}-{index}", options=options))
+        return configs
+
+    virtual_device_type = os.getenv("VIRTUAL_DEVICE_TYPE") or "none"
+    if virtual_device_type == "android_emulator":
+        emulator_name = os.getenv("ANDROID_EMULATOR_NAME") or "emulator-5554"
+        return [SinkConfig(type="android_emulator", name=emulator_name)]
+    if virtual_device_type == "cuttlefish":
+        options = {
+            "gnss_url": os.getenv("CUTTLEFISH_GNSS_URL") or "https://localhost:1443/devices/cvd-1",
+            "vhal_url": os.getenv("CUTTLEFISH_VHAL_URL") or "localhost:9300",
+        }
+        return [SinkConfig(type="cuttlefish", name="cuttlefish", options=options)]
+    return []
+
+
+def create_sink(config: SinkConfig, vhal_callback: Callable[..., None]) -> DeviceSink:
+    """
+    Create a sink with a bridge to the virtual device described by the config.
+
+    The bridges are imported here, as only the configured ones are needed and the generated VHAL protobuf and gRPC modules are slow to
+    import.
+
+    Raises:
+        ValueError: If the device type is unknown.
+    """
+    if config.type == "android_emulator":
+        from .broker_to_emulator import BrokerToEmulator  # noqa: PLC0415
+
+        emulator = BrokerToEmulator(emulator_name=config.options.get("emulator_name", config.name), vhal_callback=vhal_callback)
+        return DeviceSink(
+            config.name,
+            {
+                LOCATION: lambda lon, lat, _heading: emulator.redirect_location_signals_to_emulator(lon, lat),
+                SPEED: emulator.update_speed_property,
+                GEAR: emulator.update_gear_property,
+            },
+            transport=emulator.vhal,
+        )
+
+    if config.type == "cuttlefish":
+        from .broker_to_cuttlefish import BrokerToCuttlefish  # noqa: PLC0415
+
+        cuttlefish = BrokerToCuttlefish(
+            cuttlefish_gnss_url=config.options.get("gnss_url", "https://localhost:1443/devices/cvd-1"),
+            cuttlefish_vhal_url=config.options.get("vhal_url", "localhost:9300"),
+            vhal_callback=vhal_callback,
+        )
+        return DeviceSink(
+            config.name,
+            {
+                LOCATION: cuttlefish.redirect_location_signals_to_cuttlefish,
+                SPEED: cuttlefish.update_speed_property,
+                GEAR: cuttlefish.update_gear_property,
+            },
+            transport=cuttlefish.vhal,
+        )
+
+    raise ValueError(f"Unknown virtual device type: {config.type}")
+
+
+class LatencyStats:
+    """
+    Rolling window of delivery latencies, from the moment an update is submitted until the device call completes.
+    """
+
+    def __init__(self, window: int = 1024) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, latency_s: float) -> None:
+        self._samples.append(latency_s)
+        self.count += 1
+
+    def summary(self) -> dict[str, float | int]:
+        if not self._samples:
+            return {"count": self.count}
+        samples = sorted(self._samples)
+        return {
+            "count": self.count,
+            "mean_ms": round(1000 * sum(samples) / len(samples), 3),
+            "p50_ms": round(1000 * samples[len(samples) // 2], 3),
+            "p95_ms": round(1000 * samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+            "max_ms": round(1000 * samples[-1], 3),
+        }
+
+
+class DeviceSink:
+    """
+    Delivers updates to one virtual device from a dedicated worker task.
+
+    Updates are coalesced per kind (latest value wins), so a slow device never builds a backlog. Blocking device calls (adb, sockets,
+    http) run on a thread owned by the sink, while coroutine handlers are awaited directly. A slow or hanging device therefore only delays
+    its own updates and never the other sinks or the broker input handlers.
+    """
+
+    def __init__(self, name: str, handlers: dict[str, Callable[..., Any]], transport: ReconnectingVhal | None = None) -> None:
+        self.name = name
+        self.transport = transport
+        self.latency = LatencyStats()
+        self.coalesced = 0
+        self.failed = 0
+        self._handlers = handlers
+        self._pending: dict[str, tuple[tuple[Any, ...], float]] = {}
+        self._wakeup = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sink-{name}")
+        self._task: asyncio.Task[None] | None = None
+
+    def submit(self, kind: str, *args: Any) -> None:
+        """
+        Queue an update without waiting for it to be delivered. Replaces any not yet delivered update of the same kind.
+        """
+        if kind not in self._handlers:
+            return
+        if kind in self._pending:
+            self.coalesced += 1
+        self._pending[kind] = (args, time.perf_counter())
+        self._wakeup.set()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name=f"sink-{self.name}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self.transport is not None:
+            await self.transport.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def summary(self) -> dict[str, Any]:
+        summary: dict[str, Any] = self.latency.summary()
+        summary.update(coalesced=self.coalesced, failed=self.failed, pending=len(self._pending))
+        if self.transport is not None:
+            summary["vhal"] = self.transport.metrics.as_dict()
+        return summary
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            pending, self._pending = self._pending, {}
+            for kind, (args, submitted_at) in pending.items():
+                await self._deliver(kind, args, submitted_at)
+
+    async def _deliver(self, kind: str, args: tuple[Any, ...], submitted_at: float) -> None:
+        handler = self._handlers[kind]
+        try:
+            if inspect.iscoroutinefunction(handler):
+                await handler(*args)
+            else:
+                await asyncio.get_running_loop().run_in_executor(self._executor, partial(handler, *args))
+        except Exception:
+            self.failed += 1
+            logger.exception("failed to deliver update", sink=self.name, kind=kind)
+            return
+        self.latency.add(time.perf_counter() - submitted_at)
+
+
+class SinkRegistry:
+    """
+    Fans out IHU updates to all configured sinks and periodically logs the delivery latency of each sink.
+    """
+
+    def __init__(self, sinks: list[DeviceSink], report_interval_s: float = 30.0) -> None:
+        self.sinks = sinks
+        self._report_interval_s = report_interval_s
+        self._report_task: asyncio.Task[None] | None = None
+
+    def publish(self, kind: str, *args: Any) -> None:
+        for sink in self.sinks:
+            sink.submit(kind, *args)
+
+    def start(self) -> None:
+        for sink in self.sinks:
+            sink.start()
+        if self.sinks and self._report_interval_s > 0:
+            self._report_task = asyncio.create_task(self._report_loop(), name="sink-report")
+
+    async def stop(self) -> None:
+        if self._report_task is not None:
+            self._report_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._report_task
+            self._report_task = None
+        for sink in self.sinks:
+            await sink.stop()
+
+    def report(self) -> dict[str, dict[str, Any]]:
+        return {sink.name: sink.summary() for sink in self.sinks}
+
+    async def _report_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._report_interval_s)
+            for name, summary in self.report().items():
+                logger.info("sink delivery latency", sink=name, **summary)
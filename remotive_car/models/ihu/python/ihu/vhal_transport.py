@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from enum import Enum
+from typing import Any, Awaitable, Callable, Protocol
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class ConnectionState(str, Enum):
+    CONNECTING = "connecting"
+    CONNECTED = "connected"
+    DISCONNECTED = "disconnected"
+    CLOSED = "closed"
+
+
+@dataclass
+class TransportMetrics:
+    state: ConnectionState = ConnectionState.CONNECTING
+    connects: int = 0
+    disconnects: int = 0
+    failed_attempts: int = 0
+    writes: int = 0
+    buffered: int = 0
+    dropped: int = 0
+    replayed: int = 0
+    connected_since: float | None = None
+    last_error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "state": self.state.value}
+
+
+class VhalConnection(Protocol):
+    """
+    A single connection to a Vehicle HAL. Transport failures must be raised as ConnectionError.
+    """
+
+    async def set_property(self, prop: int, area_id: int, value: Any) -> None: ...
+
+    async def wait_closed(self) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class ReconnectingVhal:
+    """
+    Keeps a VHAL connection alive across restarts of the Android device.
+
+    Lost connections are re-established with exponential backoff. While disconnected, writes are kept in a bounded latest-value buffer
+    (one entry per property and area) that is replayed in order once the connection is back, so the device always ends up with the latest
+    vehicle state without replaying every intermediate value.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], Awaitable[VhalConnection]],
+        max_buffered: int = 64,
+        initial_backoff_s: float = 0.5,
+        max_backoff_s: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.metrics = TransportMetrics()
+        self._connect = connect
+        self._max_buffered = max_buffered
+        self._initial_backoff_s = initial_backoff_s
+        self._max_backoff_s = max_backoff_s
+        self._connection: VhalConnection | None = None
+        self._buffer: OrderedDict[tuple[int, int], Any] = OrderedDict()
+        self._lost = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name=f"vhal-{self.name}")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+        self._set_state(ConnectionState.CLOSED)
+
+    async def set_property(self, prop: int, area_id: int, value: Any) -> None:
+        """
+        Write a property, or buffer it until the connection is re-established.
+        """
+        connection = self._connection
+        if connection is not None:
+            try:
+                await connection.set_property(prop, area_id, value)
+                self.metrics.writes += 1
+                return
+            except ConnectionError as e:
+                self._on_connection_lost(connection, e)
+        self._buffer_write(prop, area_id, value)
+
+    def _buffer_write(self, prop: int, area_id: int, value: Any) -> None:
+        key = (prop, area_id)
+        self._buffer.pop(key, None)
+        self._buffer[key] = value
+        if len(self._buffer) > self._max_buffered:
+            self._buffer.popitem(last=False)
+            self.metrics.dropped += 1
+        self.metrics.buffered = len(self._buffer)
+
+    def _on_connection_lost(self, connection: VhalConnection, error: BaseException | None) -> None:
+        if self._connection is not connection:
+            return
+        self._connection = None
+        self.metrics.disconnects += 1
+        self.metrics.connected_since = None
+        self.metrics.last_error = str(error) if error else "connection closed"
+        self._set_state(ConnectionState.DISCONNECTED)
+        self._lost.set()
+
+    def _set_state(self, state: ConnectionState) -> None:
+        if self.metrics.state != state:
+            self.metrics.state = state
+            logger.info("vhal connection state changed", vhal=self.name, **self.metrics.as_dict())
+
+    async def _run(self) -> None:
+        backoff_s = self._initial_backoff_s
+        while True:
+            self._set_state(ConnectionState.CONNECTING)
+            try:
+                connection = await self._connect()
+                await self._replay(connection)
+            except Exception as e:
+                self.metrics.failed_attempts += 1
+                self.metrics.last_error = str(e)
+                logger.warning("vhal connection failed", vhal=self.name, error=str(e), retry_in_s=backoff_s)
+                await asyncio.sleep(backoff_s)
+                backoff_s = min(backoff_s * 2, self._max_backoff_s)
+                continue
+
+            backoff_s = self._initial_backoff_s
+            self._lost.clear()
+            self._connection = connection
+            self.metrics.connects += 1
+            self.metrics.connected_since = time.time()
+            self._set_state(ConnectionState.CONNECTED)
+
+            closed = asyncio.create_task(connection.wait_closed())
+            lost = asyncio.create_task(self._lost.wait())
+            try:
+                await asyncio.wait([closed, lost], return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                closed.cancel()
+                lost.cancel()
+            self._on_connection_lost(connection, None)
+            await connection.close()
+
+    async def _replay(self, connection: VhalConnection) -> None:
+        """
+        Flush buffered writes to a new connection. Writes made while replaying are buffered and flushed in the same pass.
+
+        Raises:
+            ConnectionError: If the connection is lost while replaying. Writes not yet replayed stay buffered.
+        """
+        while self._buffer:
+            (prop, area_id), value = next(iter(self._buffer.items()))
+            try:
+                await connection.set_property(prop, area_id, value)
+                self.metrics.replayed += 1
+            except ConnectionError:
+                await connection.close()
+                raise
+            except Exception:
+                logger.exception("dropping buffered write", vhal=self.name, prop=prop, area_id=area_id)
+            if self._buffer.get((prop, area_id)) is value:
+                del self._buffer[(prop, area_id)]
+            self.metrics.buffered = len(self._buffer)
@@ -0,0 +1,128 @@
+"""
+Import time report for the entry points of the Python models.
+
+Runs `python -X importtime` for each module in the model's own environment (using `uv run`) and summarizes where the time goes. Only the
+imports of the module itself are measured, not the interpreter startup.
+
+    python remotive_car/models/importtime.py remotive_car/models/ihu/python ihu.__main__
+    python remotive_car/models/importtime.py remotive_car/instances/android playback.local.tcu playback.local.sccm playback.local.abs
+
+Each module is imported --runs times (in a new process each time) and the fastest run is reported, as the first run also includes warming
+up the file system cache and writing byte code.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+_MARKER = "-- importtime start --"
+
+
+@dataclass
+class ImportEntry:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class ImportReport:
+    module: str
+    total_us: int
+    entries: list[ImportEntry] = field(default_factory=list)
+
+    def top_cumulative(self, count: int) -> list[ImportEntry]:
+        return sorted(self.entries, key=lambda e: e.cumulative_us, reverse=True)[:count]
+
+    def top_self(self, count: int) -> list[ImportEntry]:
+        return sorted(self.entries, key=lambda e: e.self_us, reverse=True)[:count]
+
+    def by_package(self) -> dict[str, int]:
+        """
+        Self time summed per top level package, e.g. all of grpc.* as grpc.
+        """
+        packages: dict[str, int] = defaultdict(int)
+        for entry in self.entries:
+            packages[entry.name.split(".")[0]] += entry.self_us
+        return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+
+
+def parse_importtime(output: str, module: str) -> ImportReport:
+    """
+    Parse the -X importtime output (stderr) of a process. Only lines after the start marker are used, if there is one.
+    """
+    lines = output.splitlines()
+    if _MARKER in lines:
+        lines = lines[lines.index(_MARKER) + 1 :]
+
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        # the name is indented by two spaces per level of nesting, after the separating space
+        indent = len(name) - len(name.lstrip()) - 1
+        entries.append(ImportEntry(name=name.strip(), self_us=int(self_us), cumulative_us=int(cumulative_us), depth=indent // 2))
+    total_us = sum(entry.cumulative_us for entry in entries if entry.depth == 0)
+    return ImportReport(module=module, total_us=total_us, entries=entries)
+
+
+def measure(project_dir: Path, module: str, python: str | None = None) -> ImportReport:
+    code = f"import sys; sys.stderr.write({_MARKER!r} + '\\n'); sys.stderr.flush(); import {module}"
+    command = [python, "-X", "importtime", "-c", code] if python else ["uv", "run", "--quiet", "python", "-X", "importtime", "-c", code]
+    result = subprocess.run(command, cwd=project_dir, capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr, module)
+
+
+def format_report(report: ImportReport, top: int) -> str:
+    lines = [f"{report.module}: {report.total_us / 1000:.1f} ms", "  slowest imports (cumulative):"]
+    lines += [f"    {e.cumulative_us / 1000:8.1f} ms  {e.name}" for e in report.top_cumulative(top)]
+    lines.append("  slowest modules (self):")
+    lines += [f"    {e.self_us / 1000:8.1f} ms  {e.name}" for e in report.top_self(top)]
+    lines.append("  per package (self):")
+    lines += [f"    {us / 1000:8.1f} ms  {package}" for package, us in list(report.by_package().items())[:top]]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report the import time of Python modules, using python -X importtime.")
+    parser.add_argument("project_dir", type=Path, help="Directory of the uv project the modules belong to.")
+    parser.add_argument("modules", nargs="+", help="Modules to import, e.g. ihu.__main__.")
+    parser.add_argument("--python", help="Python interpreter to use instead of `uv run python` in the project directory.")
+    parser.add_argument("--runs", type=int, default=3, help="Number of runs per module, the fastest is reported. Defaults to 3.")
+    parser.add_argument("--top", type=int, default=10, help="Number of entries per list in the report. Defaults to 10.")
+    parser.add_argument("--json", action="store_true", help="Print the reports as JSON.")
+    args = parser.parse_args()
+
+    reports = []
+    for module in args.modules:
+        runs = [measure(args.project_dir, module, python=args.python) for _ in range(max(1, args.runs))]
+        reports.append(min(runs, key=lambda report: report.total_us))
+
+    if args.json:
+        summaries = [
+            {
+                "module": report.module,
+                "total_us": report.total_us,
+                "top_cumulative": [asdict(e) for e in report.top_cumulative(args.top)],
+                "by_package": report.by_package(),
+            }
+            for report in reports
+        ]
+        json.dump(summaries, sys.stdout, indent=2)
+        print()
+    else:
+        print("\n\n".join(format_report(report, args.top) for report in reports))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,24 @@ from .log import configure_logging
 logger = structlog.get_logger(__name__)
 
 
+class ResponsePublisher:
+    """
+    Publishes the response of a LIN frame. The simulator of the RLCM (rlcm/sim.py) replaces it with its SlotPublisher, which also
+    tracks whether each response is published before the next header of the frame.
+    """
+
+    def __init__(self, lin_bus: LinNamespace) -> None:
+        self.lin_bus = lin_bus
+
+    async def publish(self, *signals: WriteSignal) -> None:
+        await self.lin_bus.publish(*signals)
+
+    def on_header(self) -> None:
+        """
+        Called when the header of the response frame arrives, i.e. when the response is sent.
+        """
+
+
 class RL(BehavioralModel):
     ecu_name: str = "RL"
     lin_ns: str = "RL-RearLightLIN"
@@ -24,8 +42,12 @@ class RL(BehavioralModel):
     DEVS1LIN01Fr1: str = "DEVS1LIN01Fr1"
     RL_counter_times_2: str = "DEVS1LIN01Fr1.counter_times_2"
 
-    def __init__(self, broker_client: BrokerClient) -> None:
-        self.lin_bus = LinNamespace(RL.lin_ns, broker_client=broker_client, cache_config=self.ecu_name)
+    def __init__(self, broker_client: BrokerClient, lin_bus: LinNamespace | None = None) -> None:
+        # the LIN bus can be replaced, e.g. by a simulated one to run without a broker (see rlcm/sim.py)
+        self.lin_bus = lin_bus or LinNamespace(RL.lin_ns, broker_client=broker_client, cache_config=self.ecu_name)
+        self.counter_times_2_publisher = ResponsePublisher(self.lin_bus)
+        # the responses for each (2 bit) counter value of the RLCM, so no write has to be built when the frame arrives
+        self.counter_times_2_writes = tuple(WriteSignal(RL.RL_counter_times_2, counter * 2) for counter in range(4))
         super().__init__(
             RL.ecu_name,
             namespaces=[self.lin_bus],
@@ -50,12 +72,13 @@ class RL(BehavioralModel):
         # The value will be sent to the master when it is requested.
         # This means that we can do publish a lot of times, but only the last value will
         # be sent when the next request arrives
-        await self.lin_bus.publish(WriteSignal(RL.RL_counter_times_2, counter * 2))
+        await self.counter_times_2_publisher.publish(self.counter_times_2_writes[counter % 4])
 
     async def on_devs1lin01fr1_header(self, header: Header) -> None:  # noqa: ARG002
         # Listening to the header sent by the master can be a way for slaves to perform updates
         # that should happen "per frame". E.g. sending out a sequence of values, one per frame.
-        pass
+        # Here it is the deadline of the response, which is sent now.
+        self.counter_times_2_publisher.on_header()
 
 
 async def main(avp: BehavioralModelArgs):
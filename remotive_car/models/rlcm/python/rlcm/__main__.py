@@ -4,13 +4,14 @@ import asyncio
 from typing import Final
 
 import structlog
-from remotivelabs.broker import BrokerClient, Frame, WriteSignal
+from remotivelabs.broker import BrokerClient, Frame, Header, WriteSignal
 from remotivelabs.topology.behavioral_model import BehavioralModel
 from remotivelabs.topology.cli.behavioral_model import BehavioralModelArgs
 from remotivelabs.topology.namespaces import filters
 from remotivelabs.topology.namespaces.can import CanNamespace
 from remotivelabs.topology.namespaces.lin import LinNamespace
 
+from .lin_publisher import SlotPublisher
 from .log import configure_logging
 
 LOGGER = structlog.get_logger(__name__)
@@ -40,19 +41,31 @@ class RLCM(BehavioralModel):
     # 2 bit unsigned int counter
     counter: int = 0
 
-    def __init__(self, broker_client: BrokerClient) -> None:
-        self.lin_bus = LinNamespace(RLCM.lin_ns, broker_client=broker_client, cache_config=self.ecu_name)
+    def __init__(self, broker_client: BrokerClient, lin_bus: LinNamespace | None = None) -> None:
+        # the LIN bus can be replaced, e.g. by a SimulatedLinNamespace to run without a broker (see sim.py)
+        self.lin_bus = lin_bus or LinNamespace(RLCM.lin_ns, broker_client=broker_client, cache_config=self.ecu_name)
         self.body_can_0 = CanNamespace(RLCM.can_ns, broker_client=broker_client)
+        self.counter_publisher = SlotPublisher(self.lin_bus, RLCM.lin_master_frame)
+        # the writes of the counter sequence, so the next one is published without building it
+        self.counter_writes = tuple(WriteSignal(name=RLCM.lin_master_counter, value=value) for value in range(4))
         super().__init__(
             RLCM.ecu_name,
             namespaces=[self.lin_bus, self.body_can_0],
             broker_client=broker_client,
             input_handlers=[
                 self.body_can_0.create_input_handler([filters.FrameFilter(RLCM.can_turn_light_frame)], self.on_turn_req_frame),
-                self.lin_bus.create_input_handler([filters.FrameFilter(RLCM.lin_master_frame)], self.on_devmlin01fr01_frame),
             ],
         )
 
+    async def start_lin(self):
+        stream = await self.lin_bus.subscribe_headers(RLCM.lin_master_frame)
+
+        async def on_header():
+            async for header in stream:
+                await self.on_devmlin01fr01_header(header)
+
+        self.lin_task = asyncio.create_task(on_header())
+
     async def on_turn_req_frame(self, frame: Frame) -> None:
         await self.lin_bus.publish(
             WriteSignal(
@@ -65,19 +78,19 @@ class RLCM(BehavioralModel):
             ),
         )
 
-    # A master can send updates "per frame" by listening to the frame
-    # sent by itself. For slaves, the same thing can be accomplished by
-    # listening to the header messages.
-    async def on_devmlin01fr01_frame(self, _frame: Frame) -> None:
+    # A node can send updates "per frame" by listening to the headers of the frame.
+    # The counter of this slot is sent with the header, so the next counter is
+    # published now, a whole slot ahead of the header it is sent on.
+    async def on_devmlin01fr01_header(self, _header: Header) -> None:
+        self.counter_publisher.on_header()
         self.counter = (self.counter + 1) % 4
-        await self.lin_bus.publish(
-            WriteSignal(name=RLCM.lin_master_counter, value=self.counter),
-        )
+        await self.counter_publisher.publish(self.counter_writes[self.counter])
 
 
 async def main(avp: BehavioralModelArgs):
     LOGGER.info("Starting RLCM ECU", args=avp)
     async with BrokerClient(avp.url, auth=avp.auth) as broker, RLCM(broker) as rlcm:
+        await rlcm.start_lin()
         await rlcm.run_forever()
 
 
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import dataclasses
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+_COMMENTS = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_SECTION = re.compile(r"(\w+)\s*(?::\s*([^{;]*?))?\s*\{")
+
+
+@dataclass(frozen=True)
+class LdfSignal:
+    """
+    A signal, with the scale, offset and unit of its physical value if it has a physical_value encoding (the first one, if there are
+    several ranges).
+    """
+
+    name: str
+    size: int
+    init_value: int
+    publisher: str
+    subscribers: tuple[str, ...]
+    scale: float = 1.0
+    offset: float = 0.0
+    unit: str = ""
+
+
+@dataclass(frozen=True)
+class LdfFrameSignal:
+    name: str
+    offset: int
+    size: int
+
+
+@dataclass(frozen=True)
+class LdfFrame:
+    name: str
+    frame_id: int
+    publisher: str
+    length: int
+    signals: tuple[LdfFrameSignal, ...]
+
+    def encode(self, values: dict[str, int]) -> bytes:
+        """
+        Pack signal values (by signal name) into the frame payload. LIN signals are little endian, with the offset in bits from the least
+        significant bit of the first byte.
+        """
+        payload = 0
+        for signal in self.signals:
+            value = int(values.get(signal.name, 0)) & ((1 << signal.size) - 1)
+            payload |= value << signal.offset
+        return payload.to_bytes(self.length, "little")
+
+    def decode(self, payload: bytes) -> dict[str, int]:
+        raw = int.from_bytes(payload, "little")
+        return {signal.name: (raw >> signal.offset) & ((1 << signal.size) - 1) for signal in self.signals}
+
+
+@dataclass(frozen=True)
+class ScheduleEntry:
+    frame_name: str
+    delay_ms: float
+
+
+@dataclass(frozen=True)
+class Ldf:
+    """
+    The parts of a LIN description file (LDF) needed to run its schedule tables: nodes, signals, unconditional frames and schedule tables.
+    It is also the LDF parser of the frame codec of the android playback (playback/codec/ldf.py).
+    """
+
+    speed_bps: float
+    master: str
+    time_base_ms: float
+    jitter_ms: float
+    slaves: tuple[str, ...]
+    signals: dict[str, LdfSignal] = field(default_factory=dict)
+    frames: dict[str, LdfFrame] = field(default_factory=dict)
+    schedule_tables: dict[str, tuple[ScheduleEntry, ...]] = field(default_factory=dict)
+
+    @property
+    def bit_time_s(self) -> float:
+        return 1.0 / self.speed_bps
+
+    def header_time_s(self) -> float:
+        """
+        Maximum time of a frame header (break, sync and protected identifier), 34 nominal bit times plus the 40% tolerance of LIN 2.1.
+        """
+        return 1.4 * 34 * self.bit_time_s
+
+    def response_time_s(self, frame: LdfFrame) -> float:
+        """
+        Maximum time of a frame response (data bytes and checksum), 10 bit times per byte plus the 40% tolerance of LIN 2.1.
+        """
+        return 1.4 * 10 * (frame.length + 1) * self.bit_time_s
+
+
+def _sections(text: str) -> dict[str, tuple[str | None, str]]:
+    """
+    Split a block of LDF text into its top level sections, as name -> (header, body), e.g. "DEVMLIN01Fr01" -> ("0x03, RLCM, 2", "...").
+    """
+    sections: dict[str, tuple[str | None, str]] = {}
+    position = 0
+    while match := _SECTION.search(text, position):
+        depth, end = 1, match.end()
+        while depth and end < len(text):
+            depth += {"{": 1, "}": -1}.get(text[end], 0)
+            end += 1
+        sections[match.group(1)] = (match.group(2), text[match.end() : end - 1])
+        position = end
+    return sections
+
+
+def _statements(body: str) -> list[str]:
+    return [statement.strip() for statement in body.split(";") if statement.strip()]
+
+
+def _number(value: str) -> float:
+    value = value.strip()
+    return float(int(value, 16)) if value.lower().startswith("0x") else float(value)
+
+
+def _ms(value: str) -> float:
+    return _number(value.replace("ms", ""))
+
+
+def _parse_nodes(body: str) -> tuple[str, float, float, tuple[str, ...]]:
+    master, time_base_ms, jitter_ms = "", 0.0, 0.0
+    slaves: tuple[str, ...] = ()
+    for statement in _statements(body):
+        kind, _, values = statement.partition(":")
+        parts = [part.strip() for part in values.split(",")]
+        if kind.strip() == "Master":
+            master, time_base_ms, jitter_ms = parts[0], _ms(parts[1]), _ms(parts[2])
+        elif kind.strip() == "Slaves":
+            slaves = tuple(parts)
+    return master, time_base_ms, jitter_ms, slaves
+
+
+def _parse_signals(body: str) -> dict[str, LdfSignal]:
+    signals = {}
+    for statement in _statements(body):
+        name, _, values = statement.partition(":")
+        parts = [part.strip() for part in values.split(",")]
+        # array init values ({0, 0}) are not supported by the schedule simulator, and start at 0
+        init_value = 0 if parts[1].startswith("{") else int(_number(parts[1]))
+        signals[name.strip()] = LdfSignal(name.strip(), int(parts[0]), init_value, parts[2], tuple(parts[3:]))
+    return signals
+
+
+def _parse_encodings(encoding_types: str, representation: str) -> dict[str, tuple[float, float, str]]:
+    """
+    The scale, offset and unit of the signals with a physical_value encoding, by signal name.
+    """
+    encodings: dict[str, tuple[float, float, str]] = {}
+    for name, (_, body) in _sections(encoding_types).items():
+        for statement in _statements(body):
+            parts = [part.strip() for part in statement.split(",")]
+            if parts[0] == "physical_value" and len(parts) >= 5:
+                encodings[name] = (float(parts[3]), float(parts[4]), parts[5].strip('"') if len(parts) > 5 else "")
+                break
+
+    physical: dict[str, tuple[float, float, str]] = {}
+    for statement in _statements(representation):
+        encoding, _, signals = statement.partition(":")
+        if encoding.strip() in encodings:
+            physical.update((signal.strip(), encodings[encoding.strip()]) for signal in signals.split(","))
+    return physical
+
+
+def _parse_frames(body: str, signals: dict[str, LdfSignal]) -> dict[str, LdfFrame]:
+    frames = {}
+    for name, (header, frame_body) in _sections(body).items():
+        frame_id, publisher, length = (part.strip() for part in (header or "").split(","))
+        frame_signals = []
+        for statement in _statements(frame_body):
+            signal_name, _, offset = (part.strip() for part in statement.partition(","))
+            if signal_name not in signals:
+                raise ValueError(f"Invalid LDF: frame {name} refers to unknown signal {signal_name}")
+            frame_signals.append(LdfFrameSignal(signal_name, int(offset), signals[signal_name].size))
+        frames[name] = LdfFrame(name, int(_number(frame_id)), publisher, int(length), tuple(frame_signals))
+    return frames
+
+
+def _parse_schedule_tables(body: str, frames: dict[str, LdfFrame]) -> dict[str, tuple[ScheduleEntry, ...]]:
+    schedule_tables = {}
+    for name, (_, table_body) in _sections(body).items():
+        entries = []
+        for statement in _statements(table_body):
+            match = re.fullmatch(r"(\w+)\s+delay\s+([\d.]+)\s*ms", statement)
+            if match is None:
+                raise ValueError(f"Invalid LDF: unsupported schedule entry '{statement}' in {name}")
+            if match.group(1) not in frames:
+                raise ValueError(f"Invalid LDF: schedule table {name} refers to unknown frame {match.group(1)}")
+            entries.append(ScheduleEntry(match.group(1), float(match.group(2))))
+        schedule_tables[name] = tuple(entries)
+    return schedule_tables
+
+
+def parse_ldf(text: str) -> Ldf:
+    """
+    Parse the text of an LDF.
+
+    Raises:
+        ValueError: If a required section (Nodes) is missing, or a frame or schedule table refers to something that is not defined.
+    """
+    text = _COMMENTS.sub("", text)
+    speed = re.search(r"LIN_speed\s*=\s*([\d.]+)\s*kbps", text)
+    sections = _sections(text)
+    if "Nodes" not in sections:
+        raise ValueError("Invalid LDF: no Nodes section")
+
+    master, time_base_ms, jitter_ms, slaves = _parse_nodes(sections["Nodes"][1])
+    signals = _parse_signals(sections.get("Signals", (None, ""))[1])
+    encodings = _parse_encodings(sections.get("Signal_encoding_types", (None, ""))[1], sections.get("Signal_representation", (None, ""))[1])
+    for name, (scale, offset, unit) in encodings.items():
+        if name in signals:
+            signals[name] = dataclasses.replace(signals[name], scale=scale, offset=offset, unit=unit)
+    frames = _parse_frames(sections.get("Frames", (None, ""))[1], signals)
+    return Ldf(
+        speed_bps=float(speed.group(1)) * 1000 if speed else 19200.0,
+        master=master,
+        time_base_ms=time_base_ms,
+        jitter_ms=jitter_ms,
+        slaves=slaves,
+        signals=signals,
+        frames=frames,
+        schedule_tables=_parse_schedule_tables(sections.get("Schedule_tables", (None, ""))[1], frames),
+    )
+
+
+def read_ldf(path: Path) -> Ldf:
+    """
+    Read an LDF from a file.
+
+    Raises:
+        ValueError: If the LDF is invalid.
+    """
+    return parse_ldf(path.read_text(encoding="utf-8"))
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import structlog
+from remotivelabs.broker import WriteSignal
+from remotivelabs.topology.namespaces.lin import LinNamespace
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class DeadlineStats:
+    hits: int = 0
+    misses: int = 0
+    max_publish_s: float = 0.0
+    min_slack_s: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "max_publish_ms": round(1000 * self.max_publish_s, 3),
+            "min_slack_ms": None if self.min_slack_s is None else round(1000 * self.min_slack_s, 3),
+        }
+
+
+class SlotPublisher:
+    """
+    Publishes the response of one LIN frame and tracks whether each value is set before the next header of the frame. Publishing on a LIN
+    namespace only sets the value that is sent on the next header, so a publish that is still in flight when the header arrives is a
+    deadline miss: the stale value goes out. A value that is set in time is a hit, with the time left until the header as its slack.
+
+    The headers of the frame are fed to on_header. The value for the next slot can be published as soon as the header of the previous
+    slot has arrived, e.g. the next value of a counter, so that it is ready a whole slot ahead.
+
+    The RL (a separate project) publishes with the same interface, and is given a SlotPublisher by the simulator (see sim.py).
+    """
+
+    def __init__(self, lin_bus: LinNamespace, frame_name: str, clock: Callable[[], float] = time.monotonic) -> None:
+        self.lin_bus = lin_bus
+        self.frame_name = frame_name
+        self.stats = DeadlineStats()
+        self._clock = clock
+        self._in_flight = 0
+        self._published_at: float | None = None
+        self._slot = 0
+
+    async def publish(self, *signals: WriteSignal) -> None:
+        started_at, slot = self._clock(), self._slot
+        self._in_flight += 1
+        try:
+            await self.lin_bus.publish(*signals)
+        finally:
+            self._in_flight -= 1
+        published_at = self._clock()
+        self.stats.max_publish_s = max(self.stats.max_publish_s, published_at - started_at)
+        # a value that lands after the header of its slot is counted as a miss only
+        if slot == self._slot:
+            self._published_at = published_at
+
+    def on_header(self) -> None:
+        """
+        Called when the header of the frame arrives, i.e. when the response is sent. Slots without a new value are not counted.
+        """
+        if self._in_flight:
+            self._record(None)
+        elif self._published_at is not None:
+            self._record(self._clock() - self._published_at)
+        self._published_at = None
+        self._slot += 1
+
+    def _record(self, slack_s: float | None) -> None:
+        if slack_s is None:
+            self.stats.misses += 1
+            logger.debug("LIN response missed its slot", frame=self.frame_name, misses=self.stats.misses)
+            return
+        self.stats.hits += 1
+        self.stats.min_slack_s = slack_s if self.stats.min_slack_s is None else min(self.stats.min_slack_s, slack_s)
+
+    def report(self) -> dict[str, Any]:
+        return self.stats.as_dict()
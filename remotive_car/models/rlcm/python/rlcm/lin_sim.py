@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Protocol, Sequence
+
+import structlog
+from remotivelabs.broker import BrokerClient, Frame, Header, WriteSignal
+from remotivelabs.topology.namespaces.filters import FrameFilter
+from remotivelabs.topology.namespaces.lin import LinNamespace
+
+from .ldf import Ldf, LdfFrame
+
+logger = structlog.get_logger(__name__)
+
+
+class Clock(Protocol):
+    def now(self) -> float: ...
+
+    async def sleep_until(self, deadline: float) -> None: ...
+
+
+class RealClock:
+    """
+    Runs the schedule in real time.
+    """
+
+    def now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    async def sleep_until(self, deadline: float) -> None:
+        await asyncio.sleep(max(0.0, deadline - self.now()))
+
+
+class VirtualClock:
+    """
+    Runs the schedule as fast as possible. Time only advances when the scheduler sleeps, so the nodes see the timing of the schedule table.
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._now = start
+
+    def now(self) -> float:
+        return self._now
+
+    async def sleep_until(self, deadline: float) -> None:
+        self._now = max(self._now, deadline)
+        await asyncio.sleep(0)
+
+
+@dataclass
+class SlotStats:
+    """
+    Processing time of the nodes in the slots of one frame, measured in real (CPU) time, also with a virtual clock.
+
+    The header latency is the time from the header until all header subscribers have handled it, which must be within the header time
+    for a slave to have its response ready. The frame latency is the time the frame input handlers took.
+    """
+
+    count: int = 0
+    header_misses: int = 0
+    max_header_latency_s: float = 0.0
+    max_frame_latency_s: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "header_misses": self.header_misses,
+            "max_header_latency_ms": round(1000 * self.max_header_latency_s, 3),
+            "max_frame_latency_ms": round(1000 * self.max_frame_latency_s, 3),
+        }
+
+
+class _HeaderStream:
+    """
+    Async iterator of the headers of some frames. Knows when its consumer has handled a header, i.e. asks for the next one.
+    """
+
+    def __init__(self, frames: set[str]) -> None:
+        self.frames = frames
+        self.queue: asyncio.Queue[Header] = asyncio.Queue()
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    def put(self, header: Header) -> None:
+        self.idle.clear()
+        self.queue.put_nowait(header)
+
+    def __aiter__(self) -> AsyncIterator[Header]:
+        return self
+
+    async def __anext__(self) -> Header:
+        if self.queue.empty():
+            self.idle.set()
+        return await self.queue.get()
+
+
+@dataclass
+class _FrameHandler:
+    frames: set[str]
+    callback: Callable[[Frame], Awaitable[None]]
+    last_signals: dict[str, dict[str, Any]]
+
+
+class SimulatedLinBus:
+    """
+    Offline stand-in for the broker running a LIN schedule table, for the nodes of one LIN cluster described by an LDF.
+
+    The nodes get a SimulatedLinNamespace each. The bus emits the headers of the schedule table to the header subscribers, then builds
+    the response from the latest published values of the frame's publisher and delivers it to the frame input handlers. Just like the
+    broker's LIN cache, publishing only sets the value that is sent when the frame is next scheduled. The response of a frame of the
+    master is taken when its header is emitted, as the master sends both.
+    """
+
+    def __init__(self, ldf: Ldf, namespace: str, clock: Clock | None = None, on_change: bool = True) -> None:
+        self.ldf = ldf
+        self.namespace = namespace
+        self.clock = clock or RealClock()
+        self.on_change = on_change
+        self.stats: dict[str, SlotStats] = defaultdict(SlotStats)
+        self.slots = 0
+        self._values: dict[str, Any] = {
+            f"{frame.name}.{s.name}": ldf.signals[s.name].init_value for frame in ldf.frames.values() for s in frame.signals
+        }
+        self._header_streams: list[_HeaderStream] = []
+        self._frame_handlers: list[_FrameHandler] = []
+
+    def set(self, node: str, signal_name: str, value: Any) -> None:
+        """
+        Raises:
+            ValueError: If the signal is not a signal of this bus, or is published by another node.
+        """
+        frame_name, _, name = signal_name.partition(".")
+        frame = self.ldf.frames.get(frame_name)
+        if frame is None or signal_name not in self._values:
+            raise ValueError(f"Unknown LIN signal {signal_name}")
+        if frame.publisher != node:
+            raise ValueError(f"Signal {signal_name} is published by {frame.publisher}, not {node}")
+        self._values[signal_name] = value
+
+    def subscribe_headers(self, frames: Sequence[str]) -> _HeaderStream:
+        stream = _HeaderStream(set(frames))
+        self._header_streams.append(stream)
+        return stream
+
+    def add_frame_handler(self, frames: Sequence[str], callback: Callable[[Frame], Awaitable[None]]) -> None:
+        self._frame_handlers.append(_FrameHandler(set(frames), callback, {}))
+
+    async def run(self, schedule_table: str, duration_s: float | None = None, cycles: int | None = None, speedup: float = 1.0) -> None:
+        """
+        Run a schedule table until the duration or number of cycles has passed, or forever if neither is given. With a speedup, the
+        delays of the schedule table are divided by it, to see if the nodes keep up with a faster schedule.
+
+        Raises:
+            ValueError: If there is no schedule table with the given name.
+        """
+        entries = self.ldf.schedule_tables.get(schedule_table)
+        if not entries:
+            raise ValueError(f"Unknown schedule table {schedule_table}")
+
+        started_at = slot_at = self.clock.now()
+        cycle = 0
+        while cycles is None or cycle < cycles:
+            for entry in entries:
+                if duration_s is not None and slot_at - started_at >= duration_s:
+                    return
+                await self._run_slot(self.ldf.frames[entry.frame_name], slot_at)
+                slot_at += entry.delay_ms / 1000 / speedup
+                await self.clock.sleep_until(slot_at)
+            cycle += 1
+
+    async def _run_slot(self, frame: LdfFrame, slot_at: float) -> None:
+        stats = self.stats[frame.name]
+        stats.count += 1
+        self.slots += 1
+
+        # the master sends the response of its own frames with the header, so it has the values published before the header
+        signals = self._response(frame) if frame.publisher == self.ldf.master else None
+
+        # the header: give the subscribers (slaves updating their response) the header time to handle it
+        header_started = time.perf_counter()
+        streams = [stream for stream in self._header_streams if frame.name in stream.frames]
+        for stream in streams:
+            stream.put(Header(frame_name=frame.name, namespace=self.namespace))
+        if streams:
+            waiters = [asyncio.create_task(stream.idle.wait()) for stream in streams]
+            budget_s = self.ldf.header_time_s()
+            # with a virtual clock the schedule waits (a while) for the subscribers, as it may run much faster than real time
+            timeout = 1.0 if isinstance(self.clock, VirtualClock) else budget_s
+            done, pending = await asyncio.wait(waiters, timeout=timeout)
+            for waiter in pending:
+                waiter.cancel()
+            latency = time.perf_counter() - header_started
+            stats.max_header_latency_s = max(stats.max_header_latency_s, latency)
+            if pending or latency > budget_s:
+                stats.header_misses += 1
+
+        # the response: the latest values published by the frame's publisher
+        if signals is None:
+            signals = self._response(frame)
+        payload = frame.encode({name.partition(".")[2]: int(value) for name, value in signals.items()})
+        response = Frame(timestamp=int(slot_at * 1_000_000), name=frame.name, namespace=self.namespace, signals=signals, value=payload)
+        frame_started = time.perf_counter()
+        for handler in self._frame_handlers:
+            if frame.name not in handler.frames:
+                continue
+            if self.on_change and handler.last_signals.get(frame.name) == signals:
+                continue
+            handler.last_signals[frame.name] = signals
+            await handler.callback(response)
+        stats.max_frame_latency_s = max(stats.max_frame_latency_s, time.perf_counter() - frame_started)
+
+    def _response(self, frame: LdfFrame) -> dict[str, Any]:
+        return {name: self._values[name] for name in (f"{frame.name}.{signal.name}" for signal in frame.signals)}
+
+    def report(self) -> dict[str, dict[str, Any]]:
+        return {frame: stats.as_dict() for frame, stats in self.stats.items()}
+
+
+class SimulatedLinNamespace(LinNamespace):
+    """
+    A LinNamespace for one node on a SimulatedLinBus, to run models without a broker. Publishing, header subscriptions and input handlers
+    (with frame filters) are routed to the simulated bus. The broker client is never connected.
+    """
+
+    def __init__(self, bus: SimulatedLinBus, node: str, broker_client: BrokerClient | None = None) -> None:
+        super().__init__(bus.namespace, broker_client=broker_client or BrokerClient("http://localhost:50051"))
+        self.bus = bus
+        self.node = node
+
+    async def publish(self, *signals: WriteSignal | tuple[str, Any]) -> None:
+        for signal in signals:
+            name, value = (signal.name, signal.value) if isinstance(signal, WriteSignal) else signal
+            self.bus.set(self.node, name, value)
+
+    async def subscribe_headers(self, *frames: str, initial_empty: bool = True) -> AsyncIterator[Header]:  # noqa: ARG002
+        return self.bus.subscribe_headers(frames)
+
+    def create_input_handler(self, filters: Sequence[Any], callback: Callable[[Frame], Awaitable[None]]) -> tuple[str, Any]:
+        """
+        Registers the callback on the simulated bus. Only frame filters are supported.
+
+        Raises:
+            ValueError: If a filter is not a FrameFilter.
+        """
+        if not all(isinstance(f, FrameFilter) and not f.exclude for f in filters):
+            raise ValueError(f"Only (non excluding) frame filters are supported by the LIN simulator, got {list(filters)}")
+        self.bus.add_frame_handler([f.frame_name for f in filters], callback)
+        return super().create_input_handler(filters, callback)
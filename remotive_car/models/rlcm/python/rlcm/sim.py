@@ -0,0 +1,96 @@
+"""
+Runs the RLCM (and the RL, if it is installed in the same environment) on a simulated RearLightLIN bus, without a broker.
+
+    python -m rlcm.sim --duration 10 --virtual
+
+The schedule table of the LDF is run on a virtual clock (as fast as possible) or in real time, and the processing time of the nodes per
+slot is reported at the end. Turn light requests from the body CAN can be injected with --left/--right.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+from pathlib import Path
+
+import structlog
+from remotivelabs.broker import BrokerClient, Frame
+
+from .__main__ import RLCM
+from .ldf import read_ldf
+from .lin_publisher import SlotPublisher
+from .lin_sim import RealClock, SimulatedLinBus, SimulatedLinNamespace, VirtualClock
+from .log import configure_logging
+
+# the RL is a separate project, so it is only simulated if it is installed (or on the path)
+try:
+    RL = importlib.import_module("rl.__main__").RL
+except ImportError:
+    RL = None
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_LDF = Path(__file__).resolve().parents[4] / "platform" / "databases" / "rearlight.ldf"
+
+
+async def simulate(  # noqa: PLR0913, PLR0917
+    ldf_path: Path, schedule_table: str, duration_s: float, virtual: bool, turn_request: tuple[int, int], speedup: float = 1.0
+) -> dict:
+    ldf = read_ldf(ldf_path)
+    bus = SimulatedLinBus(ldf, namespace="RearLightLIN", clock=VirtualClock() if virtual else RealClock())
+
+    # the broker client is needed to create the models, but never connected
+    broker_client = BrokerClient("http://localhost:50051")
+    rlcm = RLCM(broker_client, lin_bus=SimulatedLinNamespace(bus, node=ldf.master, broker_client=broker_client))
+    # the slot deadlines of the responses follow the clock of the bus
+    rlcm.counter_publisher = SlotPublisher(rlcm.lin_bus, RLCM.lin_master_frame, clock=bus.clock.now)
+    publishers = {"RLCM": rlcm.counter_publisher}
+    await rlcm.start_lin()
+    if RL is not None:
+        rl = RL(broker_client, lin_bus=SimulatedLinNamespace(bus, node="RL", broker_client=broker_client))
+        rl.counter_times_2_publisher = SlotPublisher(rl.lin_bus, RL.DEVS1LIN01Fr1, clock=bus.clock.now)
+        publishers["RL"] = rl.counter_times_2_publisher
+        await rl.start_lin()
+    else:
+        logger.info("RL is not installed, running the RLCM only")
+
+    left, right = turn_request
+    await rlcm.on_turn_req_frame(
+        Frame(
+            timestamp=0,
+            name=RLCM.can_turn_light_frame,
+            namespace=RLCM.can_ns,
+            signals={RLCM.can_left_turn_light_request: left, RLCM.can_right_turn_light_request: right},
+            value=b"",
+        )
+    )
+
+    await bus.run(schedule_table, duration_s=duration_s, speedup=speedup)
+    return {
+        "slots": bus.slots,
+        "frames": bus.report(),
+        "publishers": {node: publisher.report() for node, publisher in publishers.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the RearLightLIN schedule with the RLCM (and RL) without a broker.")
+    parser.add_argument("--ldf", type=Path, default=DEFAULT_LDF, help="The LDF to use. Defaults to the rearlight LDF of the platform.")
+    parser.add_argument("--schedule", type=str, default="DEVMLIN01Schedule01", help="The schedule table to run.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Simulated time to run, in seconds. Defaults to 10.")
+    parser.add_argument("--virtual", action="store_true", help="Use a virtual clock, i.e. run as fast as possible.")
+    parser.add_argument("--speedup", type=float, default=1.0, help="Run the schedule table this many times faster. Defaults to 1.")
+    parser.add_argument("--left", type=int, default=0, help="Left turn light request to inject.")
+    parser.add_argument("--right", type=int, default=0, help="Right turn light request to inject.")
+    parser.add_argument("--loglevel", type=str, default="WARNING")
+    args = parser.parse_args()
+
+    configure_logging(args.loglevel)
+    result = asyncio.run(simulate(args.ldf, args.schedule, args.duration, args.virtual, (args.left, args.right), args.speedup))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
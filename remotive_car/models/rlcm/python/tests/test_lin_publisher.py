@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, cast
+
+import pytest
+from remotivelabs.broker import BrokerClient, Frame, WriteSignal
+from remotivelabs.topology.namespaces.lin import LinNamespace
+
+from rlcm.__main__ import RLCM
+from rlcm.ldf import read_ldf
+from rlcm.lin_publisher import SlotPublisher
+from rlcm.lin_sim import SimulatedLinBus, SimulatedLinNamespace, VirtualClock
+from rlcm.sim import DEFAULT_LDF
+
+FRAME = "DEVMLIN01Fr01"
+
+
+class SlowLinBus:
+    """Publishes after a delay on the virtual clock, or when released."""
+
+    def __init__(self, clock: VirtualClock, delay_s: float = 0.0) -> None:
+        self.clock = clock
+        self.delay_s = delay_s
+        self.released = asyncio.Event()
+        self.released.set()
+        self.values: list[Any] = []
+
+    async def publish(self, *signals: WriteSignal) -> None:
+        await self.clock.sleep_until(self.clock.now() + self.delay_s)
+        await self.released.wait()
+        self.values += [signal.value for signal in signals]
+
+
+@pytest.fixture
+def clock() -> VirtualClock:
+    return VirtualClock()
+
+
+def publisher_on(lin_bus: SlowLinBus) -> SlotPublisher:
+    return SlotPublisher(cast(LinNamespace, lin_bus), FRAME, clock=lin_bus.clock.now)
+
+
+async def test_value_published_before_the_header_is_a_hit(clock: VirtualClock) -> None:
+    # given
+    publisher = publisher_on(SlowLinBus(clock, delay_s=0.002))
+
+    # when the value lands 2 ms after the previous header, and the next header is at 10 ms
+    await publisher.publish(WriteSignal(f"{FRAME}.counter", 1))
+    await clock.sleep_until(0.010)
+    publisher.on_header()
+
+    # then
+    assert publisher.report() == {"hits": 1, "misses": 0, "max_publish_ms": 2.0, "min_slack_ms": 8.0}
+
+
+async def test_value_in_flight_at_the_header_is_a_miss_once(clock: VirtualClock) -> None:
+    # given a publish that is still in flight
+    lin_bus = SlowLinBus(clock)
+    lin_bus.released.clear()
+    publisher = publisher_on(lin_bus)
+    publishing = asyncio.create_task(publisher.publish(WriteSignal(f"{FRAME}.counter", 1)))
+    await asyncio.sleep(0)
+
+    # when
+    publisher.on_header()
+    lin_bus.released.set()
+    await publishing
+    publisher.on_header()
+
+    # then the late value is not counted again on the header it is sent on
+    assert lin_bus.values == [1]
+    assert (publisher.stats.hits, publisher.stats.misses) == (0, 1)
+
+
+async def test_slot_without_a_new_value_is_not_counted(clock: VirtualClock) -> None:
+    # given
+    publisher = publisher_on(SlowLinBus(clock))
+    await publisher.publish(WriteSignal(f"{FRAME}.counter", 1))
+
+    # when
+    publisher.on_header()
+    publisher.on_header()
+
+    # then
+    assert (publisher.stats.hits, publisher.stats.misses) == (1, 0)
+
+
+async def test_rlcm_publishes_the_next_counter_a_slot_ahead() -> None:
+    # given the RLCM on the simulated rear light bus
+    ldf = read_ldf(DEFAULT_LDF)
+    bus = SimulatedLinBus(ldf, namespace="RearLightLIN", clock=VirtualClock())
+    broker_client = BrokerClient("http://localhost:50051")
+    rlcm = RLCM(broker_client, lin_bus=SimulatedLinNamespace(bus, node=ldf.master, broker_client=broker_client))
+    rlcm.counter_publisher = SlotPublisher(rlcm.lin_bus, RLCM.lin_master_frame, clock=bus.clock.now)
+    counters: list[Any] = []
+
+    async def on_frame(frame: Frame) -> None:
+        counters.append(frame.signals[RLCM.lin_master_counter])
+
+    bus.add_frame_handler([RLCM.lin_master_frame], on_frame)
+    await rlcm.start_lin()
+
+    # when the schedule is run twice, with the frame in 3 of its 7 slots of 10 ms
+    await bus.run("DEVMLIN01Schedule01", cycles=2)
+
+    # then every counter is sent, each published on the previous header of the frame
+    assert counters == [0, 1, 2, 3, 0, 1]
+    assert rlcm.counter_publisher.report() == {"hits": 5, "misses": 0, "max_publish_ms": 0.0, "min_slack_ms": 20.0}
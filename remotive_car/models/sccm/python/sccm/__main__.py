@@ -1,9 +1,11 @@
+from __future__ import annotations
+
 import asyncio
+from typing import TYPE_CHECKING
 
 import structlog
 
-from sccm.adapters.ecu import SCCM
-from sccm.adapters.evdev_to_topology_mapper import EvdevToTopologyMapper
+from sccm.adapters.compiled_mapper import CompiledEvdevToTopologyMapper
 from sccm.adapters.log import configure_logging
 from sccm.adapters.printer import Printer
 from sccm.args import SteeringWheelArgs
@@ -12,10 +14,17 @@ from sccm.device import Device
 from sccm.device_control import DeviceControl
 from sccm.event_loop import EventLoop
 from sccm.mapper import Mapper
+from sccm.stats import PipelineStats
 from sccm.target import Target
 
+if TYPE_CHECKING:
+    from sccm.adapters.capture import CaptureWriter
+
 logger = structlog.get_logger(__name__)
 
+# Optional subsystems (broker targets, capture and replay, fan-out) are imported when used, to keep the startup time down. The broker client
+# in particular is slow to import and not needed with --print-only.
+
 
 async def main(args: SteeringWheelArgs):
     logger.info("starting steering wheel", args=args)
@@ -25,27 +34,59 @@ async def main(args: SteeringWheelArgs):
     config: Config = read_config(args.config_file)
 
     device_control = DeviceControl(config=config, timeout_in_sec=timeout_in_sec)
+    capture_writer = None
+    if args.record:
+        from sccm.adapters.capture import CaptureWriter  # noqa: PLC0415
+
+        capture_writer = CaptureWriter(args.record, device_names=list(config.devices))
+    stats = PipelineStats(report_interval_s=args.stats_interval, port=args.stats_port)
+    await stats.start()
+    try:
+        await _run(args, config, device_control, capture_writer, stats)
+    finally:
+        await stats.stop()
+        if capture_writer:
+            capture_writer.close()
+
+
+async def _run(
+    args: SteeringWheelArgs,
+    config: Config,
+    device_control: DeviceControl,
+    capture_writer: CaptureWriter | None,
+    stats: PipelineStats,
+) -> None:
 
     # loop to allow devices and targets to reconnect if connection is lost
     while True:
         try:
-            wait_for_device_task = device_control.create_task()
-            device: Device = await wait_for_device_task
+            device: Device
+            if args.replay:
+                from sccm.adapters.capture import ReplayDevice  # noqa: PLC0415
+
+                logger.info("replaying capture", capture=args.replay, speed=args.replay_speed)
+                device = ReplayDevice(args.replay, config=config, speed=args.replay_speed)
+            else:
+                wait_for_device_task = device_control.create_task()
+                device = await wait_for_device_task
+            if capture_writer:
+                from sccm.adapters.capture import RecordingDevice  # noqa: PLC0415
+
+                logger.info("recording device events", capture=args.record)
+                device = RecordingDevice(device, capture_writer)
 
             logger.info("creating mapper", config=device.config)
-            mapper: Mapper = EvdevToTopologyMapper(config=device.config)
+            mapper: Mapper = CompiledEvdevToTopologyMapper(config=device.config)
 
-            if args.print_only:
-                logger.info("using printer target")
-                target: Target = Printer()
-            else:
-                broker_url = args.broker_url or device.config.broker.url
-                target = SCCM(broker_url=broker_url)
+            target = _create_target(args, device.config, mapper)
 
             logger.debug("running event loop")
-            loop = EventLoop(device=device, mapper=mapper, target=target)
+            loop = EventLoop(device=device, mapper=mapper, target=target, stats=stats)
             loop_task = loop.create_task()
             await loop_task
+            if args.replay:
+                logger.info("replay finished, exiting...")
+                return
 
         except TimeoutError:
             logger.error("no device found within timeout, exiting...", timeout_in_min=args.timeout)
@@ -57,6 +98,29 @@ async def main(args: SteeringWheelArgs):
             return
 
 
+def _create_target(args: SteeringWheelArgs, config: Config, mapper: Mapper) -> Target:
+    targets: list[Target] = []
+    if args.print_only:
+        logger.info("using printer target")
+        targets.append(Printer())
+    else:
+        from sccm.adapters.ecu import SCCM  # noqa: PLC0415
+
+        broker_url = args.broker_url or config.broker.url
+        targets.extend(SCCM(broker_url=url) for url in [broker_url, *args.extra_broker_urls])
+    if args.signal_log:
+        from sccm.adapters.signal_log import SignalLog  # noqa: PLC0415
+
+        targets.append(SignalLog(args.signal_log))
+
+    if len(targets) == 1:
+        return targets[0]
+    from sccm.adapters.fanout import FanoutTarget  # noqa: PLC0415
+
+    logger.info("sending to several targets", targets=len(targets), drop_policy=args.fanout_drop_policy)
+    return FanoutTarget(targets, mapper=mapper, max_queued=args.fanout_queue_size, drop_policy=args.fanout_drop_policy)
+
+
 def entrypoint():
     args = SteeringWheelArgs.parse()
     configure_logging(level=args.loglevel)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from sccm.adapters.evdev_to_topology_mapper import Signal
+from sccm.config import ButtonMapping
+
+# time without new values after which a smoothed axis is considered idle, and its raw value is written
+SETTLE_AFTER_S = 0.05
+
+
+class AxisFilter:
+    """
+    Reduces the number of writes of a mapped axis signal, configured by max_rate_hz, deadband and smoothing of the axis mapping.
+
+    Values are smoothed first, then changes within the deadband of the last written value are dropped. A value that arrives before the
+    rate limit allows a new write is held back, and replaced by any newer value, until it is due (see next_due/flush). The latest value is
+    therefore always written eventually, at most 1/max_rate_hz later than it arrived. As the smoothed value lags behind the input, the raw
+    value of a smoothed axis is written once no new value has arrived for SETTLE_AFTER_S (or the rate limit period, if longer).
+
+    Values at the min/max limits of the mapping bypass smoothing and deadband, so that e.g. a released pedal always reads exactly zero.
+    """
+
+    def __init__(self, mapping: ButtonMapping) -> None:
+        self._period_s = 1.0 / mapping.max_rate_hz if mapping.max_rate_hz else 0.0
+        self._deadband = mapping.deadband or 0.0
+        self._smoothing = mapping.smoothing or 0.0
+        self._limits = {limit for limit in (mapping.min, mapping.max) if limit is not None}
+        self._smoothed: float | None = None
+        self._last_value: float | None = None
+        self._last_write_at = float("-inf")
+        self._pending: Signal | None = None
+        self._settle: Signal | None = None
+        self._last_event_at = float("-inf")
+
+    def apply(self, signal: Signal, now: float) -> Signal | None:
+        """
+        Filter a new value of the signal. Returns the signal to write now, or None if it is dropped or held back.
+        """
+        value = signal.value
+        at_limit = value in self._limits
+        self._last_event_at = now
+        self._settle = None
+        if self._smoothing and self._smoothed is not None and not at_limit:
+            raw = signal
+            value = self._smoothing * self._smoothed + (1 - self._smoothing) * value
+            signal = signal._replace(value=value)
+            if value != raw.value:
+                self._settle = raw
+        self._smoothed = value
+
+        if not at_limit and self._last_value is not None and self._within_deadband(value, self._last_value):
+            # nothing worth writing, which also makes any held back value obsolete
+            self._pending = None
+            return None
+
+        if now - self._last_write_at < self._period_s:
+            self._pending = signal
+            return None
+        return self._write(signal, now)
+
+    def next_due(self) -> float | None:
+        """
+        Returns the time at which the held back value, or the raw value of an idle smoothed axis, is due, or None if there is neither.
+        """
+        if self._pending is not None:
+            return self._last_write_at + self._period_s
+        if self._settle is not None:
+            return self._settle_due()
+        return None
+
+    def flush(self, now: float) -> Signal | None:
+        """
+        Returns the held back value, or the raw value of an idle smoothed axis, if it is due.
+        """
+        if self._settle is not None and now >= self._settle_due():
+            settle, self._settle = self._settle, None
+            self._smoothed = settle.value
+            if self._last_value is not None and self._within_deadband(settle.value, self._last_value):
+                self._pending = None
+                return None
+            return self._write(settle, now)
+        if self._pending is None or now < self._last_write_at + self._period_s:
+            return None
+        return self._write(self._pending, now)
+
+    def _settle_due(self) -> float:
+        return max(self._last_event_at + SETTLE_AFTER_S, self._last_write_at + self._period_s)
+
+    def _within_deadband(self, value: float, last_value: float) -> bool:
+        change = abs(value - last_value)
+        return change == 0 or change < self._deadband
+
+    def _write(self, signal: Signal, now: float) -> Signal:
+        self._pending = None
+        self._last_value = signal.value
+        self._last_write_at = now
+        return signal
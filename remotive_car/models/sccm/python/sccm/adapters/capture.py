@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import struct
+import time
+from pathlib import Path
+from typing import AsyncGenerator, BinaryIO, Iterator, NamedTuple
+
+from evdev import InputEvent, ecodes
+
+from sccm.adapters.evdev_device import DeviceEvent, group_sync_packets, packet_timestamp
+from sccm.config import Config
+from sccm.device import Device
+
+# File layout (little endian):
+#   magic                     8 bytes, "SCCMCAP1"
+#   number of devices         u16
+#   per device: name length   u16, followed by the UTF-8 encoded name
+#   records until end of file, each a timestamp (f64, seconds), device index (u16), event type (u16), event code (u16) and value (i32)
+MAGIC = b"SCCMCAP1"
+_COUNT = struct.Struct("<H")
+RECORD = struct.Struct("<dHHHi")
+
+
+class CaptureRecord(NamedTuple):
+    timestamp: float
+    device_name: str
+    type: int
+    code: int
+    value: int
+
+
+class CaptureWriter:
+    """
+    Writes evdev events to a compact binary capture file, see read_capture.
+    """
+
+    def __init__(self, path: Path, device_names: list[str]) -> None:
+        self._device_index = {name: index for index, name in enumerate(device_names)}
+        self._file: BinaryIO = path.open("wb")
+        self._file.write(MAGIC)
+        self._file.write(_COUNT.pack(len(device_names)))
+        for name in device_names:
+            encoded = name.encode("utf-8")
+            self._file.write(_COUNT.pack(len(encoded)))
+            self._file.write(encoded)
+
+    def write(self, device_event: DeviceEvent) -> None:
+        """
+        Raises:
+            KeyError: If the event is from a device that was not declared when the writer was created.
+        """
+        event = device_event.event
+        self._file.write(RECORD.pack(event.timestamp(), self._device_index[device_event.device_name], event.type, event.code, event.value))
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _read_exactly(file: BinaryIO, size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("Invalid capture file header: truncated")
+    return data
+
+
+def read_capture(path: Path, chunk_records: int = 4096) -> tuple[list[str], Iterator[CaptureRecord]]:
+    """
+    Read a capture file. Returns the device names and an iterator over the records.
+
+    Only the header is read up front. The records are read from the file as they are iterated, chunk_records at a time, so the memory
+    used does not depend on the length of the capture.
+
+    Raises:
+        ValueError: If the file is not a valid capture file.
+    """
+    with path.open("rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Invalid capture file: {path}")
+        try:
+            (count,) = _COUNT.unpack(_read_exactly(file, _COUNT.size))
+            device_names = []
+            for _ in range(count):
+                (length,) = _COUNT.unpack(_read_exactly(file, _COUNT.size))
+                device_names.append(_read_exactly(file, length).decode("utf-8"))
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Invalid capture file header: {e}") from e
+        offset = file.tell()
+
+    def records() -> Iterator[CaptureRecord]:
+        with path.open("rb") as file:
+            file.seek(offset)
+            while chunk := file.read(chunk_records * RECORD.size):
+                # a record cut short (e.g. by a crash while recording) is ignored
+                complete = len(chunk) // RECORD.size * RECORD.size
+                for timestamp, index, event_type, code, value in RECORD.iter_unpack(memoryview(chunk)[:complete]):
+                    yield CaptureRecord(timestamp, device_names[index], event_type, code, value)
+                if complete < len(chunk):
+                    return
+
+    return device_names, records()
+
+
+class RecordingDevice(Device):
+    """
+    Wraps a device and writes all of its events (including the EV_SYN events) to a capture file.
+
+    The writer is owned by the caller, so that one capture can span several (re)connections of the device.
+    """
+
+    def __init__(self, device: Device, writer: CaptureWriter) -> None:
+        self.device = device
+        self.name = device.name
+        self.config = device.config
+        self._writer = writer
+
+    async def events_stream(self) -> AsyncGenerator[DeviceEvent, None]:
+        async for device_event in self.device.events_stream():
+            self._writer.write(device_event)
+            yield device_event
+
+    async def packets_stream(self) -> AsyncGenerator[list[DeviceEvent], None]:
+        async for packet in group_sync_packets(self.events_stream()):
+            yield packet
+
+    def packet_timestamp(self, packet: list[DeviceEvent]) -> float | None:
+        return self.device.packet_timestamp(packet)
+
+    async def close(self) -> None:
+        self._writer.flush()
+        await self.device.close()
+
+
+class ReplayDevice(Device):
+    """
+    A device that replays a capture file, to run the pipeline without physical hardware.
+
+    The events are replayed with their recorded timing divided by speed, e.g. speed 2.0 replays twice as fast. A speed of 0 replays as fast
+    as possible. Event timestamps are rebased to the time of the replay, so that latencies can be measured as for a real device.
+    """
+
+    def __init__(self, path: Path, config: Config, speed: float = 1.0) -> None:
+        self.name = f"replay:{path.name}"
+        self.path = path
+        self.config = config
+        self.speed = speed
+
+    async def events_stream(self) -> AsyncGenerator[DeviceEvent, None]:
+        _, records = read_capture(self.path)
+        first_timestamp: float | None = None
+        started_at = time.time()
+        for record in records:
+            if first_timestamp is None:
+                first_timestamp = record.timestamp
+            offset = record.timestamp - first_timestamp
+            if self.speed > 0:
+                offset /= self.speed
+                delay = started_at + offset - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif record.type == ecodes.EV_SYN:
+                # let other tasks run once per packet (EV_SYN) when replaying as fast as possible
+                await asyncio.sleep(0)
+            timestamp = started_at + offset if self.speed > 0 else time.time()
+            sec = int(timestamp)
+            event = InputEvent(sec, int((timestamp - sec) * 1_000_000), record.type, record.code, record.value)
+            yield DeviceEvent(device_name=record.device_name, event=event)
+
+    async def packets_stream(self) -> AsyncGenerator[list[DeviceEvent], None]:
+        async for packet in group_sync_packets(self.events_stream()):
+            yield packet
+
+    def packet_timestamp(self, packet: list[DeviceEvent]) -> float:
+        return packet_timestamp(packet)
+
+    async def close(self) -> None:
+        pass
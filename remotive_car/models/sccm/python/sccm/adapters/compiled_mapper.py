@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Sequence
+
+from sccm.adapters.axis_filter import AxisFilter
+from sccm.adapters.evdev_device import DeviceEvent
+from sccm.adapters.evdev_to_topology_mapper import Signal, axis_signals, latest_per_signal
+from sccm.config import EV_MAX, ButtonMapping, Config
+from sccm.mapper import Mapper
+
+# maps the raw event value to a signal, or None if the value should be ignored
+MapFn = Callable[[int], Signal | None]
+
+# per device: event type -> event code -> compiled mapping
+DeviceTable = list[list[MapFn | None] | None]
+
+# button values up to this size are looked up in a list instead of a dict
+_DENSE_BUTTON_VALUES = 256
+
+
+def _compile_axis(mapping: ButtonMapping) -> MapFn:
+    assert mapping.gradient is not None and mapping.intercept is not None  # guaranteed by the config validation
+    target, signal_id = mapping.target_name, mapping.target_signal
+    gradient, intercept = mapping.gradient, mapping.intercept
+    lo = mapping.min if mapping.min is not None else float("-inf")
+    hi = mapping.max if mapping.max is not None else float("inf")
+
+    if mapping.min is None and mapping.max is None:
+
+        def map_affine(value: int) -> Signal:
+            return Signal(target, signal_id, gradient * value + intercept)
+
+        return map_affine
+
+    def map_affine_clamped(value: int) -> Signal:
+        result = gradient * value + intercept
+        if result < lo:
+            result = lo
+        elif result > hi:
+            result = hi
+        return Signal(target, signal_id, result)
+
+    return map_affine_clamped
+
+
+def _compile_button(mapping: ButtonMapping) -> MapFn:
+    target, signal_id = mapping.target_name, mapping.target_signal
+
+    if mapping.mapping is None:
+
+        def map_raw(value: int) -> Signal:
+            return Signal(target, signal_id, value)
+
+        return map_raw
+
+    # the signals are immutable, so they can be created up front
+    signals = {raw: Signal(target, signal_id, value) for raw, value in mapping.mapping.items()}
+
+    if all(0 <= raw < _DENSE_BUTTON_VALUES for raw in signals):
+        table: list[Signal | None] = [signals.get(raw) for raw in range(max(signals) + 1)]
+        size = len(table)
+
+        def map_dense(value: int) -> Signal | None:
+            return table[value] if 0 <= value < size else None
+
+        return map_dense
+
+    return signals.get
+
+
+def compile_mapping(mapping: ButtonMapping) -> MapFn:
+    return _compile_axis(mapping) if mapping.type == "axis" else _compile_button(mapping)
+
+
+def compile_device(mappings: Sequence[ButtonMapping]) -> DeviceTable:
+    """
+    Compile the mappings of one device into a table indexed by event type and code. Only the types and codes in use are allocated.
+    """
+    table: DeviceTable = [None] * (EV_MAX + 1)
+    for mapping in mappings:
+        codes = table[mapping.source_type]
+        if codes is None:
+            codes = table[mapping.source_type] = []
+        if len(codes) <= mapping.source_code:
+            codes.extend([None] * (mapping.source_code + 1 - len(codes)))
+        codes[mapping.source_code] = compile_mapping(mapping)
+    return table
+
+
+class CompiledEvdevToTopologyMapper(Mapper):
+    """
+    Same mapping as EvdevToTopologyMapper, but with the config compiled up front into per-device tables of specialized functions.
+
+    Looking up an event is two list indexing operations and a call, without re-checking the config for every event. The config is validated
+    when it is loaded, so the compiled functions make no checks of their own.
+
+    Axis mappings with max_rate_hz, deadband or smoothing are filtered per packet (see map_events), after only the latest value of each
+    signal in the packet has been kept. Values held back by the rate limit are released by flush.
+    """
+
+    def __init__(self, config: Config, clock: Callable[[], float] = time.monotonic):
+        self.config = config
+        self._clock = clock
+        self._tables: dict[str, DeviceTable] = {name: compile_device(device.button_mappings) for name, device in config.devices.items()}
+        self._filters: dict[str, AxisFilter] = {
+            mapping.target_signal: AxisFilter(mapping)
+            for device in config.devices.values()
+            for mapping in device.button_mappings
+            if mapping.max_rate_hz is not None or mapping.deadband is not None or mapping.smoothing is not None
+        }
+        self._axis_signals = axis_signals(config)
+
+    def map_events(self, input_events: Sequence[DeviceEvent]) -> list[Signal]:
+        signals = latest_per_signal(super().map_events(input_events))
+        if not self._filters:
+            return signals
+
+        now = self._clock()
+        output_events = []
+        for signal in signals:
+            axis_filter = self._filters.get(signal.signal_id)
+            filtered = axis_filter.apply(signal, now) if axis_filter is not None else signal
+            if filtered is not None:
+                output_events.append(filtered)
+        return output_events
+
+    def next_flush_at(self) -> float | None:
+        return min((due for due in (f.next_due() for f in self._filters.values()) if due is not None), default=None)
+
+    def flush(self, now: float) -> list[Signal]:
+        return [signal for signal in (f.flush(now) for f in self._filters.values()) if signal is not None]
+
+    def output_key(self, output_event: Signal) -> str:
+        return output_event.signal_id
+
+    def coalesces(self, output_event: Signal) -> bool:
+        return output_event.signal_id in self._axis_signals
+
+    def map_event(self, input_event: DeviceEvent) -> Signal | None:
+        table = self._tables.get(input_event.device_name)
+        if table is None:
+            return None
+        event = input_event.event
+        codes = table[event.type] if event.type <= EV_MAX else None
+        if codes is None or event.code >= len(codes):
+            return None
+        map_fn = codes[event.code]
+        return map_fn(event.value) if map_fn is not None else None
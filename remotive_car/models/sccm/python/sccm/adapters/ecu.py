@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Sequence
+
 import structlog
 from remotivelabs.broker import BrokerClient
 from remotivelabs.topology.namespaces import filters
@@ -42,3 +44,8 @@ class SCCM(Target):
     async def send(self, output_event: Signal) -> None:
         assert self._bus is not None
         await self._bus.restbus.update_signals((output_event.signal_id, output_event.value))
+
+    async def send_batch(self, output_events: Sequence[Signal]) -> None:
+        assert self._bus is not None
+        if output_events:
+            await self._bus.restbus.update_signals(*[(output_event.signal_id, output_event.value) for output_event in output_events])
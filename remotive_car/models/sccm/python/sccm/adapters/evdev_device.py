@@ -1,8 +1,9 @@
 from dataclasses import dataclass
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, AsyncIterator
 
 import evdev
 from aiostream import Stream, stream
+from evdev import ecodes
 
 from sccm.config import Config
 from sccm.device import Device
@@ -14,6 +15,40 @@ class DeviceEvent:
     event: Any
 
 
+async def group_sync_packets(events: AsyncIterator[DeviceEvent]) -> AsyncGenerator[list[DeviceEvent], None]:
+    """
+    Group a (merged) stream of evdev events into packets, one per EV_SYN/SYN_REPORT of each device.
+
+    The kernel reports all changes of one device state (e.g. wheel and pedals moved at the same time) as a packet of events terminated by
+    SYN_REPORT. The SYN events themselves are not part of the packets. After a SYN_DROPPED, events are discarded until the next SYN_REPORT,
+    as the packet is incomplete.
+    """
+    pending: dict[str, list[DeviceEvent]] = {}
+    dropping: set[str] = set()
+    async for device_event in events:
+        event = device_event.event
+        name = device_event.device_name
+        if event.type != ecodes.EV_SYN:
+            if name not in dropping:
+                pending.setdefault(name, []).append(device_event)
+        elif event.code == ecodes.SYN_REPORT:
+            packet = pending.pop(name, None)
+            if name in dropping:
+                dropping.discard(name)
+            elif packet:
+                yield packet
+        elif event.code == ecodes.SYN_DROPPED:
+            pending.pop(name, None)
+            dropping.add(name)
+
+
+def packet_timestamp(packet: list[DeviceEvent]) -> float:
+    """
+    The kernel timestamp of a packet of evdev events. All events of a packet share the same timestamp, taken from the realtime clock.
+    """
+    return float(packet[0].event.timestamp())
+
+
 class EvdevDevice(Device):
     """
     EvdevDevice is a Device that combines the event streams one or more evdev.InputDevice objects into a single stream.
@@ -38,6 +73,13 @@ class EvdevDevice(Device):
             async for event in streamer:
                 yield event
 
+    async def packets_stream(self) -> AsyncGenerator[list[DeviceEvent], None]:
+        async for packet in group_sync_packets(self.events_stream()):
+            yield packet
+
+    def packet_timestamp(self, packet: list[DeviceEvent]) -> float:
+        return packet_timestamp(packet)
+
     async def close(self) -> None:
         for device in self.input_devices:
             device.close()
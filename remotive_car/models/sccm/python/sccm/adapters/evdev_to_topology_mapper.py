@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import NamedTuple
+from typing import NamedTuple, Sequence
 
 import structlog
 
@@ -17,6 +17,18 @@ class Signal(NamedTuple):
     value: float
 
 
+def latest_per_signal(signals: Sequence[Signal]) -> list[Signal]:
+    """Keep only the last value of each signal, as a packet may contain several events for the same signal."""
+    return list({signal.signal_id: signal for signal in signals}.values())
+
+
+def axis_signals(config: Config) -> frozenset[str]:
+    """The signals of axis mappings, whose latest value replaces older ones that are not yet sent (see Mapper.coalesces)."""
+    return frozenset(
+        mapping.target_signal for device in config.devices.values() for mapping in device.button_mappings if mapping.type == "axis"
+    )
+
+
 class EvdevToTopologyMapper(Mapper):
     def __init__(self, config: Config):
         self.config = config
@@ -27,6 +39,16 @@ class EvdevToTopologyMapper(Mapper):
             for name, device in config.devices.items()
             for mapping in device.button_mappings
         }
+        self._axis_signals = axis_signals(config)
+
+    def map_events(self, input_events: Sequence[DeviceEvent]) -> list[Signal]:
+        return latest_per_signal(super().map_events(input_events))
+
+    def output_key(self, output_event: Signal) -> str:
+        return output_event.signal_id
+
+    def coalesces(self, output_event: Signal) -> bool:
+        return output_event.signal_id in self._axis_signals
 
     def map_event(self, input_event: DeviceEvent) -> Signal | None:
         event_key = (input_event.device_name, input_event.event.type, input_event.event.code)
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Literal, Sequence
+
+import structlog
+from typing_extensions import Self
+
+from sccm.mapper import Mapper
+from sccm.pending import PendingEvents
+from sccm.target import Target
+
+logger = structlog.get_logger(__name__)
+
+DropPolicy = Literal["drop_oldest", "drop_newest"]
+
+
+class _TargetQueue:
+    """
+    Bounded pending events for one target, with a worker task that sends them, and that reconnects the target when it fails.
+    """
+
+    def __init__(self, target: Target, mapper: Mapper | None, max_queued: int, drop_policy: DropPolicy, reconnect_delay_s: float) -> None:
+        self.target = target
+        self.name = type(target).__name__
+        self.sent = 0
+        self.dropped = 0
+        self.failures = 0
+        self.connected = False
+        self._pending = PendingEvents(output_key=mapper.output_key, coalesces=mapper.coalesces) if mapper else PendingEvents()
+        self._max_queued = max_queued
+        self._drop_policy = drop_policy
+        self._reconnect_delay_s = reconnect_delay_s
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def coalesced(self) -> int:
+        return self._pending.coalesced
+
+    def put(self, batch: Sequence[Any]) -> None:
+        for output_event in batch:
+            if len(self._pending) < self._max_queued or self._pending.replaces(output_event):
+                self._pending.add([output_event])
+            elif self._drop_policy == "drop_newest":
+                self.dropped += 1
+            else:
+                self._pending.pop_oldest()
+                self._pending.add([output_event])
+                self.dropped += 1
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def connect(self) -> None:
+        await self.target.__aenter__()
+        self.connected = True
+
+    async def disconnect(self) -> None:
+        if not self.connected:
+            return
+        self.connected = False
+        try:
+            await self.target.__aexit__(None, None, None)
+        except Exception:
+            logger.exception("failed to close target", target=self.name)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name=f"fanout-{self.name}")
+
+    async def stop(self, drain_timeout_s: float) -> None:
+        if self._task is None:
+            return
+        if self.connected:
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=drain_timeout_s)
+            except asyncio.TimeoutError:
+                logger.warning("target did not drain in time", target=self.name, queued=len(self._pending))
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                if not self.connected:
+                    await self._reconnect()
+                batch = self._pending.take_batch()
+                try:
+                    await self.target.send_batch(batch)
+                except Exception:
+                    self.failures += 1
+                    self.dropped += len(batch)
+                    logger.exception("failed to send to target, reconnecting", target=self.name, failures=self.failures)
+                    await self.disconnect()
+                    continue
+                self.sent += 1
+            self._idle.set()
+
+    async def _reconnect(self) -> None:
+        """
+        Reconnect the target, retrying every reconnect delay. Meanwhile the events for the target are still queued, and coalesced.
+        """
+        while True:
+            await asyncio.sleep(self._reconnect_delay_s)
+            try:
+                await self.connect()
+            except Exception:
+                self.failures += 1
+                logger.warning("failed to reconnect target", target=self.name, failures=self.failures, exc_info=True)
+                continue
+            logger.info("reconnected target", target=self.name, failures=self.failures)
+            return
+
+
+class FanoutTarget(Target):
+    """
+    Sends all output events to several targets (e.g. a local and a remote broker) concurrently.
+
+    Each target has its own bounded pending events (see PendingEvents) and worker, so a slow target only delays itself. Values that
+    coalesce (e.g. axes, see Mapper.coalesces) replace the pending value of their signal, so a slow target gets the latest values, and
+    the edges of buttons in order. When max_queued events are pending, either the oldest pending event or the new one is dropped,
+    depending on the drop policy.
+
+    If a target fails, the failure is logged and counted, the batch is dropped, and the target is reconnected, while the other targets
+    carry on.
+    """
+
+    def __init__(
+        self,
+        targets: list[Target],
+        mapper: Mapper | None = None,
+        max_queued: int = 64,
+        drop_policy: DropPolicy = "drop_oldest",
+        reconnect_delay_s: float = 1.0,
+    ) -> None:
+        self._queues = [
+            _TargetQueue(target, mapper, max_queued=max_queued, drop_policy=drop_policy, reconnect_delay_s=reconnect_delay_s)
+            for target in targets
+        ]
+
+    @property
+    def failures(self) -> list[int]:
+        """The number of failures of each target, in the order of the targets."""
+        return [queue.failures for queue in self._queues]
+
+    async def __aenter__(self) -> Self:
+        try:
+            for queue in self._queues:
+                await queue.connect()
+        except BaseException:
+            for queue in self._queues:
+                await queue.disconnect()
+            raise
+        for queue in self._queues:
+            queue.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        for queue in self._queues:
+            await queue.stop(drain_timeout_s=1.0)
+        for queue in self._queues:
+            if queue.dropped or queue.failures:
+                logger.info(
+                    "slow or failing target",
+                    target=queue.name,
+                    dropped=queue.dropped,
+                    coalesced=queue.coalesced,
+                    failures=queue.failures,
+                    sent=queue.sent,
+                )
+        for queue in reversed(self._queues):
+            await queue.disconnect()
+
+    async def send(self, output_event: Any) -> None:
+        await self.send_batch([output_event])
+
+    async def send_batch(self, output_events: Sequence[Any]) -> None:
+        for queue in self._queues:
+            queue.put(output_events)
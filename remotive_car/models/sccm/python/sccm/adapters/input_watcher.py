@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# see linux/inotify.h
+IN_ATTRIB = 0x00000004
+IN_CREATE = 0x00000100
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len (followed by a NUL padded name)
+
+
+class InputWatcher:
+    """
+    Watches a device directory (/dev/input) with inotify, to find out when evdev nodes are created or get their permissions set by udev.
+
+    Only available on Linux. Use InputWatcher.open, which returns None if inotify can not be used, in which case the caller falls back to
+    polling.
+    """
+
+    def __init__(self, fd: int, prefix: str) -> None:
+        self._fd = fd
+        self._prefix = os.fsencode(prefix)
+        self._changed = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(fd, self._on_readable)
+
+    @classmethod
+    def open(cls, path: str = "/dev/input", prefix: str = "event") -> InputWatcher | None:
+        """
+        Start watching the directory for nodes whose name starts with prefix. Must be called from a running event loop.
+        """
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            if libc.inotify_add_watch(fd, os.fsencode(path), IN_CREATE | IN_ATTRIB) < 0:
+                errno = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(errno, f"inotify_add_watch failed for {path}")
+        except (OSError, AttributeError) as e:
+            logger.info("inotify not available, polling for devices", path=path, error=str(e))
+            return None
+        return cls(fd, prefix)
+
+    def _on_readable(self) -> None:
+        try:
+            while True:
+                data = os.read(self._fd, 4096)
+                if not data:
+                    break
+                if self._matches(data):
+                    self._changed.set()
+        except BlockingIOError:
+            pass
+
+    def _matches(self, data: bytes) -> bool:
+        offset = 0
+        while offset < len(data):
+            _, _, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            if data[offset : offset + name_len].startswith(self._prefix):
+                return True
+            offset += name_len
+        return False
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait for a matching node to be created or changed since the last call. Returns False if nothing changed within the timeout.
+        """
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._changed.clear()
+        return True
+
+    def close(self) -> None:
+        self._loop.remove_reader(self._fd)
+        os.close(self._fd)
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import IO, Sequence
+
+from typing_extensions import Self
+
+from sccm.adapters.evdev_to_topology_mapper import Signal
+from sccm.target import Target
+
+
+class SignalLog(Target):
+    """
+    Writes all sent signals to a file, one JSON object per line with the wall clock time, e.g.
+
+        {"time": 1760890000.123, "target": "SCCM", "signal": "SteeringAngle.SteeringAngle", "value": 12.5}
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._file: IO[str] | None = None
+
+    async def __aenter__(self) -> Self:
+        self._file = self._path.open("a", encoding="utf-8")
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    async def send(self, output_event: Signal) -> None:
+        await self.send_batch([output_event])
+
+    async def send_batch(self, output_events: Sequence[Signal]) -> None:
+        assert self._file is not None
+        now = time.time()
+        self._file.writelines(
+            json.dumps({"time": now, "target": signal.target, "signal": signal.signal_id, "value": signal.value}) + "\n"
+            for signal in output_events
+        )
@@ -3,8 +3,9 @@ from __future__ import annotations
 import logging
 import os
 from argparse import ArgumentParser
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Literal
 
 
 @dataclass
@@ -18,6 +19,15 @@ class SteeringWheelArgs:
     timeout: float
     loglevel: str
     print_only: bool
+    record: Path | None = None
+    replay: Path | None = None
+    replay_speed: float = 1.0
+    stats_interval: float = 30.0
+    stats_port: int | None = None
+    extra_broker_urls: list[str] = field(default_factory=list)
+    signal_log: Path | None = None
+    fanout_queue_size: int = 64
+    fanout_drop_policy: Literal["drop_oldest", "drop_newest"] = "drop_oldest"
 
     @staticmethod
     def parse() -> SteeringWheelArgs:
@@ -64,7 +74,76 @@ class SteeringWheelArgs:
             action="store_true",
             help="Print events to the console instead of sending them to a target.",
         )
+        parser.add_argument(
+            "--record",
+            type=Path,
+            default=None,
+            help="Record all device events to the given capture file.",
+        )
+        parser.add_argument(
+            "--replay",
+            type=Path,
+            default=None,
+            help="Replay a capture file (see --record) instead of reading from a connected device, and exit when it ends.",
+        )
+        parser.add_argument(
+            "--replay-speed",
+            type=float,
+            default=1.0,
+            help="Speed factor for --replay, e.g. 2.0 for twice as fast. 0 replays as fast as possible. Defaults to 1.0 (real-time).",
+        )
+        parser.add_argument(
+            "--stats-interval",
+            type=float,
+            default=float(os.environ.get("REMOTIVE_WHEELS_STATS_INTERVAL", "30.0")),
+            help="Interval, in seconds, at which input latency stats are logged. 0 disables logging. Defaults to 30.",
+        )
+        parser.add_argument(
+            "--stats-port",
+            type=int,
+            default=int(os.environ["REMOTIVE_WHEELS_STATS_PORT"]) if os.environ.get("REMOTIVE_WHEELS_STATS_PORT") else None,
+            help="Serve input latency stats as JSON over HTTP on the given port. Disabled by default.",
+        )
+        parser.add_argument(
+            "--extra-broker-url",
+            type=str,
+            action="append",
+            default=[],
+            help="Also send the signals to this broker. May be given several times.",
+        )
+        parser.add_argument(
+            "--signal-log",
+            type=Path,
+            default=None,
+            help="Also write all sent signals to this file, one JSON object per line.",
+        )
+        parser.add_argument(
+            "--fanout-queue-size",
+            type=int,
+            default=64,
+            help="Max number of events queued per target when sending to several targets. Defaults to 64.",
+        )
+        parser.add_argument(
+            "--fanout-drop-policy",
+            type=str,
+            default="drop_oldest",
+            choices=["drop_oldest", "drop_newest"],
+            help="What to drop when the queue of a slow target is full. Defaults to drop_oldest.",
+        )
         p = parser.parse_args()
         return SteeringWheelArgs(
-            broker_url=p.broker_url, config_file=p.config, timeout=p.timeout, loglevel=p.loglevel, print_only=p.print_only
+            broker_url=p.broker_url,
+            config_file=p.config,
+            timeout=p.timeout,
+            loglevel=p.loglevel,
+            print_only=p.print_only,
+            record=p.record,
+            replay=p.replay,
+            replay_speed=p.replay_speed,
+            stats_interval=p.stats_interval,
+            stats_port=p.stats_port,
+            extra_broker_urls=p.extra_broker_url,
+            signal_log=p.signal_log,
+            fanout_queue_size=p.fanout_queue_size,
+            fanout_drop_policy=p.fanout_drop_policy,
         )
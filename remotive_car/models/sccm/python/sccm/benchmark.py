@@ -0,0 +1,115 @@
+"""
+Benchmark of the SCCM pipeline (device -> mapper -> target) without physical hardware, by replaying a capture file.
+
+    python -m sccm.benchmark --config config/moza.json --capture wheel.cap
+    python -m sccm.benchmark --config config/moza.json --synthetic 10
+
+Without --capture, a synthetic capture of a wheel and pedals moving at the given number of seconds is generated. The capture is replayed
+as fast as possible (unless --speed is given) into a target that only counts what it receives. Note that rate limits in the config
+(max_rate_hz) still apply in real time, so fewer signals are sent when replaying faster than real time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any, Sequence
+
+from evdev import InputEvent, ecodes
+
+from sccm.adapters.capture import CaptureWriter, ReplayDevice, read_capture
+from sccm.adapters.compiled_mapper import CompiledEvdevToTopologyMapper
+from sccm.adapters.evdev_device import DeviceEvent
+from sccm.adapters.evdev_to_topology_mapper import EvdevToTopologyMapper
+from sccm.adapters.log import configure_logging
+from sccm.config import Config, read_config
+from sccm.event_loop import EventLoop
+from sccm.mapper import Mapper
+from sccm.target import Target
+
+
+class CountingTarget(Target):
+    def __init__(self) -> None:
+        self.batches = 0
+        self.signals = 0
+
+    async def send(self, output_event: Any) -> None:
+        await self.send_batch([output_event])
+
+    async def send_batch(self, output_events: Sequence[Any]) -> None:
+        self.batches += 1
+        self.signals += len(output_events)
+
+
+def write_synthetic_capture(path: Path, config: Config, seconds: float, rate_hz: float = 1000.0) -> None:
+    """
+    Write a capture where all axes of the config move along sine waves, reported in one packet per sample.
+    """
+    axes = [
+        (name, mapping.source_type, mapping.source_code)
+        for name, device in config.devices.items()
+        for mapping in device.button_mappings
+        if mapping.type == "axis"
+    ]
+    writer = CaptureWriter(path, device_names=list(config.devices))
+    try:
+        for sample in range(int(seconds * rate_hz)):
+            timestamp = sample / rate_hz
+            sec, usec = int(timestamp), int((timestamp % 1) * 1_000_000)
+            for index, (name, event_type, code) in enumerate(axes):
+                value = int(32767 * math.sin(2 * math.pi * timestamp * (index + 1) / 4))
+                writer.write(DeviceEvent(device_name=name, event=InputEvent(sec, usec, event_type, code, value)))
+            for name in {name for name, _, _ in axes}:
+                writer.write(DeviceEvent(device_name=name, event=InputEvent(sec, usec, ecodes.EV_SYN, ecodes.SYN_REPORT, 0)))
+    finally:
+        writer.close()
+
+
+async def run_benchmark(capture: Path, config: Config, mapper: Mapper, speed: float = 0.0) -> dict[str, Any]:
+    _, records = read_capture(capture)
+    events = sum(1 for _ in records)
+    device = ReplayDevice(capture, config=config, speed=speed)
+    target = CountingTarget()
+    started_at = time.perf_counter()
+    await EventLoop(device=device, mapper=mapper, target=target).create_task()
+    elapsed_s = time.perf_counter() - started_at
+    return {
+        "mapper": type(mapper).__name__,
+        "elapsed_s": round(elapsed_s, 3),
+        "events_per_s": round(events / elapsed_s),
+        "batches": target.batches,
+        "signals": target.signals,
+    }
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Benchmark the SCCM pipeline by replaying a capture file.")
+    parser.add_argument("-c", "--config", type=Path, default=Path(__file__).parent.parent / "config" / "moza.json")
+    parser.add_argument("--capture", type=Path, help="Capture file to replay, see --record of the SCCM.")
+    parser.add_argument("--synthetic", type=float, default=10.0, help="Seconds of synthetic input to generate if no capture is given.")
+    parser.add_argument("--speed", type=float, default=0.0, help="Replay speed, 0 replays as fast as possible.")
+    parser.add_argument("--reference-mapper", action="store_true", help="Also run the (uncompiled) EvdevToTopologyMapper.")
+    args = parser.parse_args()
+    configure_logging(level="WARNING")
+
+    config = read_config(args.config)
+    with tempfile.TemporaryDirectory() as tmp:
+        capture = args.capture
+        if capture is None:
+            capture = Path(tmp) / "synthetic.cap"
+            write_synthetic_capture(capture, config, seconds=args.synthetic)
+
+        mappers: list[Mapper] = [CompiledEvdevToTopologyMapper(config=config)]
+        if args.reference_mapper:
+            mappers.append(EvdevToTopologyMapper(config=config))
+        for mapper in mappers:
+            print(json.dumps(asyncio.run(run_benchmark(capture, config, mapper, speed=args.speed))))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,11 @@ import json
 from pathlib import Path
 from typing import Literal
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+# upper bounds of evdev event types and codes, see linux/input-event-codes.h
+EV_MAX = 0x1F
+CODE_MAX = 0x2FF
 
 
 class Config(BaseModel):
@@ -34,6 +38,16 @@ class VirtualDeviceSection(BaseModel):
 
     button_mappings: list[ButtonMapping]
 
+    @model_validator(mode="after")
+    def check_unique_sources(self) -> VirtualDeviceSection:
+        seen: set[tuple[int, int]] = set()
+        for mapping in self.button_mappings:
+            source = (mapping.source_type, mapping.source_code)
+            if source in seen:
+                raise ValueError(f"duplicate mapping for source type {mapping.source_type} and code {mapping.source_code}")
+            seen.add(source)
+        return self
+
 
 class ButtonMapping(BaseModel):
     """
@@ -45,8 +59,8 @@ class ButtonMapping(BaseModel):
 
     type: Literal["axis", "button"]
     source_name: str
-    source_type: int
-    source_code: int
+    source_type: int = Field(ge=0, le=EV_MAX)
+    source_code: int = Field(ge=0, le=CODE_MAX)
 
     target_name: str
     target_signal: str
@@ -57,6 +71,13 @@ class ButtonMapping(BaseModel):
     min: float | None = None
     max: float | None = None
 
+    # for axis type. Optional filtering of the mapped value, to reduce the number of writes for noisy, high rate axes.
+    # max_rate_hz limits how often the signal is written, deadband ignores changes smaller than the given value and smoothing is the
+    # weight (0 <= smoothing < 1) of the previous value in an exponential moving average.
+    max_rate_hz: float | None = Field(default=None, gt=0)
+    deadband: float | None = Field(default=None, ge=0)
+    smoothing: float | None = Field(default=None, ge=0, lt=1)
+
     # for button type. Used when a button produces more than one event, e.g. the turn stalk "button".
     mapping: dict[int, int] | None = None
 
@@ -68,6 +89,17 @@ class ButtonMapping(BaseModel):
             return None
         return {int(k): v[k] for k in v}
 
+    @model_validator(mode="after")
+    def check_axis_fields(self) -> ButtonMapping:
+        if self.type == "axis":
+            if self.gradient is None or self.intercept is None:
+                raise ValueError(f"axis mapping '{self.description}' requires gradient and intercept")
+            if self.min is not None and self.max is not None and self.min > self.max:
+                raise ValueError(f"axis mapping '{self.description}' has min {self.min} greater than max {self.max}")
+        elif self.max_rate_hz is not None or self.deadband is not None or self.smoothing is not None:
+            raise ValueError(f"button mapping '{self.description}' does not support max_rate_hz, deadband or smoothing")
+        return self
+
 
 def read_config(path: Path) -> Config:
     """
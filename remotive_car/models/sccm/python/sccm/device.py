@@ -27,5 +27,21 @@ class Device(ABC):
     @abstractmethod
     def events_stream(self) -> AsyncGenerator[Any, None]: ...
 
+    async def packets_stream(self) -> AsyncGenerator[list[Any], None]:
+        """
+        Stream of event packets, i.e. events that describe one change of the device state and should be handled together.
+
+        Defaults to one packet per event. Devices that know how their events are grouped should override this.
+        """
+        async for event in self.events_stream():
+            yield [event]
+
+    def packet_timestamp(self, packet: list[Any]) -> float | None:  # noqa: ARG002
+        """
+        Wall clock time (as time.time()) at which the events of the packet happened, or None if the device does not know. Used to measure
+        the input latency.
+        """
+        return None
+
     @abstractmethod
     def close(self) -> Awaitable[None]: ...
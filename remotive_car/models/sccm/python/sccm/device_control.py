@@ -6,6 +6,7 @@ import evdev
 import structlog
 
 from sccm.adapters.evdev_device import EvdevDevice
+from sccm.adapters.input_watcher import InputWatcher
 from sccm.config import Config
 from sccm.device import Device
 
@@ -17,47 +18,76 @@ class DeviceControl:
     DeviceControl is responsible for configuring a Device using the given config.
 
     It may happen that the device is not connected when the app is started. If so, the DeviceControl will wait for the device to connect.
+    New devices are detected as soon as they appear in /dev/input (using inotify). Polling is used as a fallback, frequently if inotify is
+    not available and otherwise only occasionally, in case an event was missed.
     """
 
-    def __init__(self, config: Config, timeout_in_sec: float = 60.0):
+    def __init__(self, config: Config, timeout_in_sec: float = 60.0, input_dir: str = "/dev/input"):
         self.config = config
         self.timeout_in_sec = timeout_in_sec
+        self.input_dir = input_dir
 
     def _poll_for_connected_devices(self) -> EvdevDevice | None:
         """
         Polls for evdev.InputDevices and return a Device object if a matching device is found, else None.
+
+        Each device node is opened once, and all devices that are not returned are closed again.
         """
         # We need a map of evdev device names to evdev devices, because the evdev device name is the only persistent identifier.
         # evdev usually identifies the device by its path (e.g. /dev/input/event0).
-        connected_evdev_devices = {evdev.InputDevice(path).name: evdev.InputDevice(path) for path in evdev.list_devices()}
-        logger.debug("polling for connected devices", devices=connected_evdev_devices)
-        if not connected_evdev_devices:
-            return None
-
-        # now try to find all (virtual) devices in each config so that we can create a complete EvdevDevice
         wanted_devices = self.config.devices.keys()
-        matches: list[evdev.InputDevice] = [connected_evdev_devices[name] for name in wanted_devices if name in connected_evdev_devices]
+        matches: dict[str, evdev.InputDevice] = {}
+        for path in evdev.list_devices(self.input_dir):
+            try:
+                input_device = evdev.InputDevice(path)
+            except OSError as e:
+                # the node may be gone already, or not yet accessible until udev has set its permissions
+                logger.debug("failed to open device", path=path, error=str(e))
+                continue
+            if input_device.name in wanted_devices and input_device.name not in matches:
+                matches[input_device.name] = input_device
+            else:
+                input_device.close()
+        logger.debug("polling for connected devices", devices=list(matches))
+
+        # all (virtual) devices in the config must be connected to create a complete EvdevDevice
         if len(matches) == len(self.config.devices):
-            return EvdevDevice(input_devices=matches, config=self.config)
+            return EvdevDevice(input_devices=[matches[name] for name in wanted_devices], config=self.config)
+        for input_device in matches.values():
+            input_device.close()
         return None
 
-    async def _wait_for_device_ready(self, polling_interval_in_sec: float = 1.0, timeout_in_sec: float = 60.0) -> Device:
+    async def _wait_for_device_ready(
+        self,
+        polling_interval_in_sec: float = 1.0,
+        fallback_polling_interval_in_sec: float = 10.0,
+        timeout_in_sec: float = 60.0,
+    ) -> Device:
         """
         Waits for a device to connect, and then returns the device.
 
         Raises TimeoutError if no device is found within the timeout.
         """
-        time_left = timeout_in_sec
-        while time_left > 0:
-            device = self._poll_for_connected_devices()
-            if device:
-                logger.info("device found", device=device)
-                return device
-
-            await asyncio.sleep(polling_interval_in_sec)
-            time_left -= polling_interval_in_sec
-
-        raise TimeoutError("No device found")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_in_sec
+        watcher = InputWatcher.open(self.input_dir)
+        try:
+            while True:
+                device = self._poll_for_connected_devices()
+                if device:
+                    logger.info("device found", device=device)
+                    return device
+
+                time_left = deadline - loop.time()
+                if time_left <= 0:
+                    raise TimeoutError("No device found")
+                if watcher is None:
+                    await asyncio.sleep(min(polling_interval_in_sec, time_left))
+                else:
+                    await watcher.wait(timeout=min(fallback_polling_interval_in_sec, time_left))
+        finally:
+            if watcher is not None:
+                watcher.close()
 
     def create_task(self) -> asyncio.Task[Device]:
         """
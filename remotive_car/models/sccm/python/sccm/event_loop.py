@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from typing import Any
 
 import structlog
 
 from sccm.device import Device
 from sccm.mapper import Mapper
+from sccm.pending import PendingEvents
+from sccm.stats import PipelineStats
 from sccm.target import Target
 
 logger = structlog.get_logger(__name__)
@@ -20,10 +24,24 @@ class EventLoop:
     mapper: Mapper
     target: Target
 
-    def __init__(self, device: Device, mapper: Mapper, target: Target):
+    def __init__(self, device: Device, mapper: Mapper, target: Target, stats: PipelineStats | None = None):
         self.device = device
         self.mapper = mapper
         self.target = target
+        self.stats = stats
+        self._flush_wakeup = asyncio.Event()
+        self._flush_due: float | None = None
+
+        # output events that are not yet sent, see _update and _write_loop
+        self._pending = PendingEvents(output_key=mapper.output_key, coalesces=mapper.coalesces)
+        self._pending_since: tuple[float | None, float, float] | None = None
+        self._dirty = asyncio.Event()
+        self._closing = False
+
+    @property
+    def coalesced(self) -> int:
+        """The number of output events that were replaced by a newer value before they were sent."""
+        return self._pending.coalesced
 
     def create_task(self, event_loop: asyncio.BaseEventLoop | None = None) -> asyncio.Task[None]:
         """
@@ -35,12 +53,109 @@ class EventLoop:
 
     async def _loop(self) -> None:
         """
-        Main event loop that pulls events from the input device, maps them, and sends them to the target.
+        Main event loop that pulls packets of events from the input device, maps them, and sends them to the target.
+
+        Reading and sending run in separate tasks, decoupled by the pending output events (see PendingEvents). The reader only adds to them,
+        so the input device is always read without delay, however slow the target is. The writer sends the pending events in batches as
+        soon as the target has completed the previous one, skipping the values of axes that were replaced meanwhile, but not the edges of
+        buttons, which are sent in order.
+
+        If stats are given, the latency of each stage (read, map, send) is recorded.
         """
         async with self.target as output:
             async with self.device as d:
-                async for input_event in d.events_stream():
-                    output_event = self.mapper.map_event(input_event=input_event)
-                    if output_event:
-                        logger.debug("sending event", output_event=output_event)
-                        await output.send(output_event=output_event)
+                reader = asyncio.create_task(self._read_loop(d), name="event-loop-reader")
+                writer = asyncio.create_task(self._write_loop(output), name="event-loop-writer")
+                flusher = asyncio.create_task(self._flush_loop(), name="event-loop-flusher")
+                tasks = [reader, writer, flusher]
+                try:
+                    await asyncio.wait([reader, writer], return_when=asyncio.FIRST_COMPLETED)
+                    if writer.done():
+                        # the writer only stops by failing
+                        writer.result()
+                    reader.result()
+
+                    # the input has ended, so send whatever is still held back by the mapper, and what is not yet sent
+                    flusher.cancel()
+                    self._update(self.mapper.flush(float("inf")))
+                    self._closing = True
+                    self._dirty.set()
+                    await writer
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _read_loop(self, device: Device) -> None:
+        async for input_events in device.packets_stream():
+            read_at = time.time()
+            output_events = self.mapper.map_events(input_events)
+            mapped_at = time.time()
+            if output_events:
+                self._update(output_events, since=(device.packet_timestamp(input_events), read_at, mapped_at))
+            elif self.stats:
+                self.stats.record(device.packet_timestamp(input_events), read_at, mapped_at, None)
+
+            due = self.mapper.next_flush_at()
+            if due is not None and (self._flush_due is None or due < self._flush_due):
+                self._flush_wakeup.set()
+
+    def _update(self, output_events: list[Any], since: tuple[float | None, float, float] | None = None) -> None:
+        """
+        Add to the pending output events, and wake up the writer.
+
+        The timings of the oldest pending packet are kept, so that the latency of each sent batch covers its longest waiting value.
+        """
+        if not output_events:
+            return
+        self._pending.add(output_events)
+        if self._pending_since is None:
+            self._pending_since = since
+        self._dirty.set()
+
+    async def _write_loop(self, output: Target) -> None:
+        """
+        Sends the pending output events, one batch at a time.
+        """
+        while True:
+            if not self._pending:
+                if self._closing:
+                    return
+                self._dirty.clear()
+                await self._dirty.wait()
+                continue
+
+            output_events = self._pending.take_batch()
+            since = self._pending_since
+            if not self._pending:
+                # otherwise the oldest packet may still be pending, so its timings are kept for the next batch
+                self._pending_since = None
+            logger.debug("sending events", output_events=output_events)
+            await output.send_batch(output_events)
+            if self.stats and since is not None:
+                self.stats.record(*since, sent_at=time.time())
+
+    async def _flush_loop(self) -> None:
+        """
+        Releases output events held back by the mapper (e.g. rate limited values) to the writer when they are due.
+        """
+        while True:
+            self._flush_wakeup.clear()
+            self._flush_due = due = self.mapper.next_flush_at()
+            if due is None:
+                await self._flush_wakeup.wait()
+                continue
+
+            delay = due - time.monotonic()
+            if delay > 0:
+                # wake up early if an event that is due sooner is held back meanwhile
+                try:
+                    await asyncio.wait_for(self._flush_wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            output_events = self.mapper.flush(time.monotonic())
+            if output_events:
+                logger.debug("releasing held back events", output_events=output_events)
+                self._update(output_events)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Hashable, Sequence
 
 
 class Mapper(ABC):
@@ -16,3 +16,30 @@ class Mapper(ABC):
     @abstractmethod
     def map_event(self, input_event: Any) -> Any:
         """Convert an input event to an output event."""
+
+    def map_events(self, input_events: Sequence[Any]) -> list[Any]:
+        """Convert a packet of input events to output events, dropping events that do not map to anything."""
+        output_events = (self.map_event(input_event=input_event) for input_event in input_events)
+        return [output_event for output_event in output_events if output_event]
+
+    def output_key(self, output_event: Any) -> Hashable:
+        """
+        Key that identifies what an output event sets (e.g. a signal), so that a newer output event with the same key replaces an older
+        one that is not yet sent. Defaults to a unique key per event, i.e. no events are replaced.
+        """
+        return id(output_event)
+
+    def coalesces(self, output_event: Any) -> bool:  # noqa: ARG002
+        """
+        Whether an output event replaces an older one with the same key that is not yet sent (e.g. the value of an axis), or must be sent
+        after it, in order (e.g. the press and release of a button). Defaults to True, which with the default keys replaces nothing.
+        """
+        return True
+
+    def next_flush_at(self) -> float | None:
+        """Monotonic time at which held back output events are due (see flush), or None if no events are held back."""
+        return None
+
+    def flush(self, now: float) -> list[Any]:  # noqa: ARG002
+        """Release held back output events that are due at the given monotonic time, e.g. rate limited values."""
+        return []
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import itertools
+from typing import Any, Callable, Hashable, Iterable
+
+
+def _unique_key(output_event: Any) -> Hashable:
+    return id(output_event)
+
+
+def _always(output_event: Any) -> bool:  # noqa: ARG001
+    return True
+
+
+class PendingEvents:
+    """
+    Output events that are not yet sent, in the order in which they changed.
+
+    An event that coalesces (see Mapper.coalesces) replaces the pending event with the same key (see Mapper.output_key), e.g. an axis,
+    where only the latest value matters. Other events, e.g. the edges of a button, are all kept in order.
+
+    Batches are taken from the front, and a batch ends before a key that is already in it, so that a press and a release of a button
+    are sent in separate batches, in order, and a target that only keeps the last value of each signal in a batch sees both.
+    """
+
+    def __init__(self, output_key: Callable[[Any], Hashable] = _unique_key, coalesces: Callable[[Any], bool] = _always) -> None:
+        self.coalesced = 0
+        self._output_key = output_key
+        self._coalesces = coalesces
+        # slot -> (key, event), where the slot is the key of an event that coalesces, and unique otherwise
+        self._events: dict[Hashable, tuple[Hashable, Any]] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def replaces(self, output_event: Any) -> bool:
+        """True if adding the output event replaces a pending event, i.e. does not add to the pending events."""
+        return self._coalesces(output_event) and ("latest", self._output_key(output_event)) in self._events
+
+    def add(self, output_events: Iterable[Any]) -> None:
+        for output_event in output_events:
+            key = self._output_key(output_event)
+            if not self._coalesces(output_event):
+                self._events[("event", next(self._sequence))] = (key, output_event)
+                continue
+            slot = ("latest", key)
+            if slot in self._events:
+                self.coalesced += 1
+                # keep the order in which values changed
+                del self._events[slot]
+            self._events[slot] = (key, output_event)
+
+    def pop_oldest(self) -> None:
+        del self._events[next(iter(self._events))]
+
+    def take_batch(self) -> list[Any]:
+        """
+        Remove and return the pending events from the front, up to the first key that is already in the batch.
+        """
+        keys: set[Hashable] = set()
+        slots = []
+        for slot, (key, _) in self._events.items():
+            if key in keys:
+                break
+            keys.add(key)
+            slots.append(slot)
+        return [self._events.pop(slot)[1] for slot in slots]
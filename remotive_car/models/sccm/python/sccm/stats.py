@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import deque
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# upper bounds (in ms) of the histogram buckets, the last bucket holds everything above
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100)
+
+# stages of the pipeline, from the kernel timestamp of an input event until the target has sent the resulting output events
+READ = "read"  # kernel timestamp -> packet read by the event loop
+MAP = "map"  # packet read -> packet mapped
+SEND = "send"  # packet mapped -> output events sent
+TOTAL = "total"  # kernel timestamp -> output events sent
+STAGES = (READ, MAP, SEND, TOTAL)
+
+
+class LatencyHistogram:
+    """
+    Rolling window of latencies of one pipeline stage.
+    """
+
+    def __init__(self, window: int = 4096) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, latency_s: float) -> None:
+        self._samples.append(latency_s)
+        self.count += 1
+
+    def summary(self) -> dict[str, Any]:
+        if not self._samples:
+            return {"count": self.count}
+        samples = sorted(self._samples)
+
+        def percentile(p: float) -> float:
+            return round(1000 * samples[min(len(samples) - 1, int(len(samples) * p))], 3)
+
+        buckets = dict.fromkeys([*(f"le_{bound}ms" for bound in BUCKETS_MS), "inf"], 0)
+        for sample in samples:
+            ms = 1000 * sample
+            key = next((f"le_{bound}ms" for bound in BUCKETS_MS if ms <= bound), "inf")
+            buckets[key] += 1
+
+        return {
+            "count": self.count,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(1000 * samples[-1], 3),
+            "histogram": buckets,
+        }
+
+
+class PipelineStats:
+    """
+    Latency of each stage of the SCCM pipeline, reported periodically to the log and optionally served as JSON over HTTP.
+
+    All times are wall clock times (time.time()), as the kernel timestamps evdev events with the realtime clock.
+    """
+
+    def __init__(self, report_interval_s: float = 30.0, port: int | None = None) -> None:
+        self.stages = {stage: LatencyHistogram() for stage in STAGES}
+        self._report_interval_s = report_interval_s
+        self._port = port
+        self._report_task: asyncio.Task[None] | None = None
+        self._server: asyncio.Server | None = None
+
+    def record(self, event_at: float | None, read_at: float, mapped_at: float, sent_at: float | None) -> None:
+        """
+        Record the timings of one packet. event_at is None if the device does not timestamp its events, and sent_at is None if the packet
+        did not result in any output events.
+        """
+        self.stages[MAP].add(mapped_at - read_at)
+        if event_at is not None:
+            self.stages[READ].add(read_at - event_at)
+        if sent_at is not None:
+            self.stages[SEND].add(sent_at - mapped_at)
+            if event_at is not None:
+                self.stages[TOTAL].add(sent_at - event_at)
+
+    def report(self) -> dict[str, dict[str, Any]]:
+        return {stage: histogram.summary() for stage, histogram in self.stages.items()}
+
+    async def start(self) -> None:
+        if self._report_interval_s > 0:
+            self._report_task = asyncio.create_task(self._report_loop(), name="pipeline-stats-report")
+        if self._port is not None:
+            self._server = await asyncio.start_server(self._handle_request, port=self._port)
+            logger.info("serving pipeline stats", port=self._port)
+
+    async def stop(self) -> None:
+        if self._report_task is not None:
+            self._report_task.cancel()
+            self._report_task = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _report_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._report_interval_s)
+            for stage, summary in self.report().items():
+                logger.info("pipeline latency", stage=stage, **summary)
+
+    async def _handle_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Minimal HTTP/1.0 handler that answers any request with the current report as JSON.
+        """
+        try:
+            # read (and ignore) the request line and headers
+            while (await reader.readline()).strip():
+                pass
+            body = json.dumps(self.report()).encode("utf-8")
+            writer.write(b"HTTP/1.0 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
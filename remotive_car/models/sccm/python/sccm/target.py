@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Sequence
 
 
 class Target(ABC):
@@ -20,3 +20,8 @@ class Target(ABC):
     @abstractmethod
     async def send(self, output_event: Any) -> None:
         """Send an output event to the target"""
+
+    async def send_batch(self, output_events: Sequence[Any]) -> None:
+        """Send output events that belong together. Targets that can send several events at once should override this."""
+        for output_event in output_events:
+            await self.send(output_event=output_event)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+from evdev import InputEvent, ecodes
+
+from sccm.adapters.capture import CaptureRecord, CaptureWriter, ReplayDevice, read_capture
+from sccm.adapters.compiled_mapper import CompiledEvdevToTopologyMapper
+from sccm.adapters.evdev_device import DeviceEvent
+from sccm.benchmark import run_benchmark, write_synthetic_capture
+from sccm.config import read_config
+
+WHEEL = "Gudsen R3 Racing Wheel and Pedals"
+STALK = "Gudsen MOZA Multi-function Stalk"
+
+
+def event(name: str, timestamp: float, event_type: int, code: int, value: int) -> DeviceEvent:
+    sec = int(timestamp)
+    return DeviceEvent(device_name=name, event=InputEvent(sec, round((timestamp - sec) * 1_000_000), event_type, code, value))
+
+
+@pytest.fixture
+def capture(tmp_path: Path) -> Path:
+    path = tmp_path / "test.cap"
+    writer = CaptureWriter(path, device_names=[WHEEL, STALK])
+    writer.write(event(WHEEL, 100.0, ecodes.EV_ABS, ecodes.ABS_X, -1200))
+    writer.write(event(WHEEL, 100.0, ecodes.EV_SYN, ecodes.SYN_REPORT, 0))
+    writer.write(event(STALK, 100.05, ecodes.EV_KEY, 288, 1))
+    writer.write(event(STALK, 100.05, ecodes.EV_SYN, ecodes.SYN_REPORT, 0))
+    writer.close()
+    return path
+
+
+def test_capture_round_trip(capture: Path) -> None:
+    # when
+    device_names, records = read_capture(capture)
+
+    # then
+    assert device_names == [WHEEL, STALK]
+    assert list(records) == [
+        CaptureRecord(100.0, WHEEL, ecodes.EV_ABS, ecodes.ABS_X, -1200),
+        CaptureRecord(100.0, WHEEL, ecodes.EV_SYN, ecodes.SYN_REPORT, 0),
+        CaptureRecord(pytest.approx(100.05), STALK, ecodes.EV_KEY, 288, 1),
+        CaptureRecord(pytest.approx(100.05), STALK, ecodes.EV_SYN, ecodes.SYN_REPORT, 0),
+    ]
+
+
+def test_capture_is_read_in_chunks_and_ignores_truncated_record(capture: Path) -> None:
+    # given a record cut short at the end of the file
+    with capture.open("ab") as file:
+        file.write(b"\x00" * 5)
+
+    # when
+    _, records = read_capture(capture, chunk_records=3)
+
+    # then
+    assert [record.type for record in records] == [ecodes.EV_ABS, ecodes.EV_SYN, ecodes.EV_KEY, ecodes.EV_SYN]
+
+
+@pytest.mark.parametrize("data", [b"not a capture", b"SCCMCAP1\x01", b"SCCMCAP1\x01\x00\x05\x00ab"])
+def test_invalid_capture_is_rejected(tmp_path: Path, data: bytes) -> None:
+    path = tmp_path / "invalid.cap"
+    path.write_bytes(data)
+
+    with pytest.raises(ValueError):
+        read_capture(path)
+
+
+@pytest.mark.asyncio
+async def test_replay_keeps_packets_and_scaled_timing(capture: Path) -> None:
+    # given
+    device = ReplayDevice(capture, config=read_config(Path("config/moza.json")), speed=0.5)
+    started_at = time.time()
+
+    # when
+    packets = [packet async for packet in device.packets_stream()]
+
+    # then
+    assert [[(e.device_name, e.event.value) for e in packet] for packet in packets] == [[(WHEEL, -1200)], [(STALK, 1)]]
+    assert packets[0][0].event.timestamp() == pytest.approx(started_at, abs=0.05)
+    assert packets[1][0].event.timestamp() - packets[0][0].event.timestamp() == pytest.approx(0.1, abs=0.01)
+    assert time.time() - started_at >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_benchmark_replays_synthetic_capture(tmp_path: Path) -> None:
+    # given
+    config = read_config(Path("config/moza.json"))
+    capture = tmp_path / "synthetic.cap"
+    write_synthetic_capture(capture, config, seconds=0.1)
+
+    # when
+    result = await run_benchmark(capture, config, CompiledEvdevToTopologyMapper(config=config))
+
+    # then at least the first packet, with the three axes, is sent (the rest is subject to the rate limits of the config)
+    assert result["signals"] >= 3
+    assert result["batches"] >= 1
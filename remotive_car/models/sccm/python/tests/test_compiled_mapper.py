@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import itertools
+from pathlib import Path
+
+import pytest
+from evdev import InputEvent, ecodes
+
+from sccm.adapters.compiled_mapper import CompiledEvdevToTopologyMapper
+from sccm.adapters.evdev_device import DeviceEvent
+from sccm.adapters.evdev_to_topology_mapper import EvdevToTopologyMapper
+from sccm.config import Config, read_config
+
+RAW_VALUES = [-100000, -32768, -1, 0, 1, 2, 3, 127, 255, 256, 1000, 32767, 589832, 589833, 589834]
+
+
+@pytest.mark.parametrize("config_file", sorted(Path("config").glob("*.json")), ids=lambda p: p.name)
+def test_compiled_mapper_matches_reference_mapper(config_file: Path) -> None:
+    # given
+    config = read_config(config_file)
+    reference = EvdevToTopologyMapper(config=config)
+    # advance the clock far enough that rate limits never hold back values
+    compiled = CompiledEvdevToTopologyMapper(config=config, clock=itertools.count(step=60).__next__)
+    sources = {(m.source_type, m.source_code) for device in config.devices.values() for m in device.button_mappings}
+    sources |= {(ecodes.EV_SYN, ecodes.SYN_REPORT), (ecodes.EV_ABS, ecodes.ABS_RZ), (ecodes.EV_KEY, 0x2FF)}
+
+    for name in [*config.devices, "unknown device"]:
+        for event_type, code in sources:
+            for value in RAW_VALUES:
+                event = DeviceEvent(device_name=name, event=InputEvent(0, 0, event_type, code, value))
+
+                # when
+                expected = reference.map_event(event)
+
+                # then
+                assert compiled.map_event(event) == expected
+                assert compiled.map_events([event]) == ([expected] if expected else [])
+
+
+def config_with_mappings(*mappings: dict) -> dict:
+    return {"name": "test", "broker": {"url": "http://localhost:50051"}, "devices": {"wheel": {"button_mappings": list(mappings)}}}
+
+
+def axis(**overrides) -> dict:
+    mapping = {
+        "description": "steering",
+        "type": "axis",
+        "source_name": "ABS_X",
+        "source_type": 3,
+        "source_code": 0,
+        "target_name": "SCCM",
+        "target_signal": "SteeringAngle.SteeringAngle",
+        "gradient": 0.5,
+        "intercept": 0,
+    }
+    return mapping | overrides
+
+
+@pytest.mark.parametrize(
+    "mappings",
+    [
+        [axis(gradient=None)],
+        [axis(intercept=None)],
+        [axis(min=10, max=-10)],
+        [axis(source_type=-1)],
+        [axis(source_code=0x300)],
+        [axis(), axis(target_signal="Other.Signal")],
+        [axis(max_rate_hz=0)],
+        [axis(deadband=-1)],
+        [axis(smoothing=1)],
+        [axis(type="button", max_rate_hz=10)],
+    ],
+    ids=[
+        "no gradient",
+        "no intercept",
+        "min above max",
+        "negative type",
+        "code out of range",
+        "duplicate source",
+        "zero rate",
+        "negative deadband",
+        "smoothing of one",
+        "filtered button",
+    ],
+)
+def test_invalid_config_is_rejected_at_load_time(mappings: list[dict]) -> None:
+    with pytest.raises(ValueError):
+        Config.model_validate(config_with_mappings(*mappings))
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def steering(value: int) -> DeviceEvent:
+    return DeviceEvent(device_name="wheel", event=InputEvent(0, 0, ecodes.EV_ABS, ecodes.ABS_X, value))
+
+
+def filtered_mapper(**overrides) -> tuple[CompiledEvdevToTopologyMapper, FakeClock]:
+    clock = FakeClock()
+    config = Config.model_validate(config_with_mappings(axis(gradient=1, min=-100, max=100, **overrides)))
+    return CompiledEvdevToTopologyMapper(config=config, clock=clock), clock
+
+
+def values(signals: list) -> list[float]:
+    return [signal.value for signal in signals]
+
+
+def test_rate_limit_holds_back_latest_value_until_due() -> None:
+    # given
+    mapper, clock = filtered_mapper(max_rate_hz=10)
+
+    # when / then
+    assert values(mapper.map_events([steering(1)])) == [1]
+
+    clock.now = 0.05
+    assert mapper.map_events([steering(2)]) == []
+    assert mapper.map_events([steering(3)]) == []
+    assert mapper.next_flush_at() == pytest.approx(0.1)
+    assert mapper.flush(0.09) == []
+    assert values(mapper.flush(0.1)) == [3]
+    assert mapper.next_flush_at() is None
+
+    clock.now = 0.25
+    assert values(mapper.map_events([steering(4)])) == [4]
+
+
+def test_deadband_drops_small_changes_but_not_limits() -> None:
+    # given
+    mapper, _ = filtered_mapper(deadband=5)
+
+    # when / then
+    assert values(mapper.map_events([steering(96)])) == [96]
+    assert mapper.map_events([steering(99)]) == []
+    assert values(mapper.map_events([steering(100)])) == [100]
+    assert values(mapper.map_events([steering(90)])) == [90]
+    assert mapper.map_events([steering(90)]) == []
+
+
+def test_smoothing_averages_values_but_passes_limits_through() -> None:
+    # given
+    mapper, _ = filtered_mapper(smoothing=0.5)
+
+    # when / then
+    assert values(mapper.map_events([steering(0)])) == [0]
+    assert values(mapper.map_events([steering(40)])) == [20]
+    assert values(mapper.map_events([steering(40)])) == [30]
+    assert values(mapper.map_events([steering(-100)])) == [-100]
+
+
+def test_smoothed_axis_settles_on_the_raw_value_when_idle() -> None:
+    # given
+    mapper, clock = filtered_mapper(smoothing=0.5)
+    assert values(mapper.map_events([steering(0)])) == [0]
+
+    # when the wheel stops mid-range
+    assert values(mapper.map_events([steering(40)])) == [20]
+
+    # then the lagging smoothed value is replaced by the raw value once no new value arrives
+    assert mapper.next_flush_at() == pytest.approx(0.05)
+    assert mapper.flush(0.01) == []
+    assert values(mapper.flush(0.05)) == [40]
+    assert mapper.next_flush_at() is None
+
+    # and smoothing continues from the raw value
+    clock.now = 0.1
+    assert values(mapper.map_events([steering(60)])) == [50]
+
+
+def test_smoothed_axis_settles_after_rate_limit_period() -> None:
+    # given
+    mapper, clock = filtered_mapper(smoothing=0.5, max_rate_hz=5)
+    assert values(mapper.map_events([steering(0)])) == [0]
+
+    # when
+    clock.now = 0.18
+    assert mapper.map_events([steering(40)]) == []
+
+    # then the held back smoothed value is due first, and the raw value after it
+    assert mapper.next_flush_at() == pytest.approx(0.2)
+    assert values(mapper.flush(0.2)) == [20]
+    assert mapper.next_flush_at() == pytest.approx(0.4)
+    assert values(mapper.flush(0.4)) == [40]
+    assert mapper.next_flush_at() is None
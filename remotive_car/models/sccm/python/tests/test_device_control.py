@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from sccm import device_control
+from sccm.adapters.input_watcher import InputWatcher
+from sccm.config import read_config
+from sccm.device_control import DeviceControl
+
+WHEEL = "Gudsen R3 Racing Wheel and Pedals"
+STALK = "Gudsen MOZA Multi-function Stalk"
+
+
+class FakeInputDevice:
+    opened: list[FakeInputDevice] = []
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.name = {"/dev/input/event0": "keyboard", "/dev/input/event1": WHEEL, "/dev/input/event2": STALK}[path]
+        self.closed = False
+        FakeInputDevice.opened.append(self)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def fake_evdev(monkeypatch: pytest.MonkeyPatch):
+    FakeInputDevice.opened = []
+    paths = ["/dev/input/event0", "/dev/input/event1", "/dev/input/event2"]
+    monkeypatch.setattr(device_control.evdev, "list_devices", lambda _dir: paths)
+    monkeypatch.setattr(device_control.evdev, "InputDevice", FakeInputDevice)
+    return paths
+
+
+def test_each_device_is_opened_once_and_non_matches_are_closed(fake_evdev) -> None:
+    # given
+    control = DeviceControl(config=read_config(Path("config/moza.json")))
+
+    # when
+    device = control._poll_for_connected_devices()
+
+    # then
+    assert device is not None
+    assert [d.path for d in FakeInputDevice.opened] == fake_evdev
+    assert [d.name for d in device.input_devices] == [WHEEL, STALK]
+    assert [d.closed for d in FakeInputDevice.opened] == [True, False, False]
+
+
+def test_partial_matches_are_closed(fake_evdev) -> None:
+    # given
+    fake_evdev.remove("/dev/input/event2")
+    control = DeviceControl(config=read_config(Path("config/moza.json")))
+
+    # when
+    device = control._poll_for_connected_devices()
+
+    # then
+    assert device is None
+    assert all(d.closed for d in FakeInputDevice.opened)
+
+
+@pytest.mark.asyncio
+async def test_watcher_wakes_up_on_new_event_nodes_only(tmp_path: Path) -> None:
+    # given
+    watcher = InputWatcher.open(str(tmp_path))
+    assert watcher is not None
+
+    try:
+        # when / then
+        (tmp_path / "js0").touch()
+        assert not await watcher.wait(timeout=0.1)
+
+        asyncio.get_running_loop().call_later(0.05, (tmp_path / "event7").touch)
+        assert await watcher.wait(timeout=1.0)
+    finally:
+        watcher.close()
+
+
+@pytest.mark.asyncio
+async def test_wait_for_device_times_out(tmp_path: Path) -> None:
+    # given
+    control = DeviceControl(config=read_config(Path("config/moza.json")), input_dir=str(tmp_path))
+
+    # when / then
+    with pytest.raises(TimeoutError):
+        await control._wait_for_device_ready(timeout_in_sec=0.1)
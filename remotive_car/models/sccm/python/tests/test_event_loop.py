@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any, AsyncGenerator, Sequence
+
+import pytest
+from evdev import InputEvent, ecodes
+
+from sccm.adapters.compiled_mapper import CompiledEvdevToTopologyMapper
+from sccm.adapters.evdev_device import DeviceEvent, group_sync_packets, packet_timestamp
+from sccm.adapters.evdev_to_topology_mapper import EvdevToTopologyMapper, Signal
+from sccm.config import Config, read_config
+from sccm.device import Device
+from sccm.event_loop import EventLoop
+from sccm.stats import PipelineStats
+from sccm.target import Target
+
+WHEEL = "Gudsen R3 Racing Wheel and Pedals"
+
+
+def abs_event(code: int, value: int) -> DeviceEvent:
+    return DeviceEvent(device_name=WHEEL, event=InputEvent(0, 0, ecodes.EV_ABS, code, value))
+
+
+def syn_event(code: int = ecodes.SYN_REPORT) -> DeviceEvent:
+    return DeviceEvent(device_name=WHEEL, event=InputEvent(0, 0, ecodes.EV_SYN, code, 0))
+
+
+class ListDevice(Device):
+    name: str = "test"
+
+    def __init__(self, events: list[DeviceEvent]) -> None:
+        self.events = events
+        self.config = read_config(Path("config/moza.json"))
+
+    async def events_stream(self) -> AsyncGenerator[DeviceEvent, None]:
+        for event in self.events:
+            yield event
+
+    async def packets_stream(self) -> AsyncGenerator[list[DeviceEvent], None]:
+        async for packet in group_sync_packets(self.events_stream()):
+            yield packet
+
+    async def close(self) -> None:
+        pass
+
+
+class TimestampedListDevice(ListDevice):
+    def packet_timestamp(self, packet: list[DeviceEvent]) -> float:
+        return packet_timestamp(packet)
+
+
+class SlowDevice(ListDevice):
+    """Yields the packets a few milliseconds apart and then stays open for a while, like a wheel that is no longer moved."""
+
+    def __init__(self, packets: list[list[DeviceEvent]], config: Config) -> None:
+        self.packets = packets
+        self.config = config
+
+    async def packets_stream(self) -> AsyncGenerator[list[DeviceEvent], None]:
+        for packet in self.packets:
+            yield packet
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.1)
+
+
+class RecordingTarget(Target):
+    def __init__(self) -> None:
+        self.batches: list[list[Any]] = []
+        self.sent_at: list[float] = []
+
+    async def send(self, output_event: Any) -> None:
+        await self.send_batch([output_event])
+
+    async def send_batch(self, output_events: Sequence[Any]) -> None:
+        self.batches.append(list(output_events))
+        self.sent_at.append(time.monotonic())
+
+
+@pytest.mark.asyncio
+async def test_events_are_grouped_by_sync_report() -> None:
+    # given
+    events = [abs_event(ecodes.ABS_X, 1), abs_event(ecodes.ABS_Z, 2), syn_event(), abs_event(ecodes.ABS_X, 3), syn_event()]
+
+    # when
+    packets = [packet async for packet in group_sync_packets(ListDevice(events).events_stream())]
+
+    # then
+    assert [[e.event.value for e in packet] for packet in packets] == [[1, 2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_events_are_discarded_until_sync_report_after_sync_dropped() -> None:
+    # given
+    events = [abs_event(ecodes.ABS_X, 1), syn_event(ecodes.SYN_DROPPED), abs_event(ecodes.ABS_X, 2), syn_event()]
+    events += [abs_event(ecodes.ABS_X, 3), syn_event()]
+
+    # when
+    packets = [packet async for packet in group_sync_packets(ListDevice(events).events_stream())]
+
+    # then
+    assert [[e.event.value for e in packet] for packet in packets] == [[3]]
+
+
+@pytest.mark.asyncio
+async def test_packet_is_sent_as_one_batch_with_latest_value_per_signal() -> None:
+    # given
+    events = [abs_event(ecodes.ABS_X, 100), abs_event(ecodes.ABS_Z, 0), abs_event(ecodes.ABS_X, 200), syn_event()]
+    device = ListDevice(events)
+    target = RecordingTarget()
+
+    # when
+    await EventLoop(device=device, mapper=EvdevToTopologyMapper(config=device.config), target=target).create_task()
+
+    # then
+    assert target.batches == [
+        [
+            Signal(target="SCCM", signal_id="SteeringAngle.SteeringAngle", value=pytest.approx(200 * 0.01345)),
+            Signal(target="SCCM", signal_id="AcceleratorPedalPositionSensor.AcceleratorPedalPosition", value=pytest.approx(120)),
+        ]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_values_are_sent_when_due() -> None:
+    # given
+    config = Config.model_validate(
+        {
+            "name": "test",
+            "broker": {"url": "http://localhost:50051"},
+            "devices": {
+                WHEEL: {
+                    "button_mappings": [
+                        {
+                            "description": "Steering wheel",
+                            "type": "axis",
+                            "source_name": "ABS_X",
+                            "source_type": 3,
+                            "source_code": 0,
+                            "target_name": "SCCM",
+                            "target_signal": "SteeringAngle.SteeringAngle",
+                            "gradient": 1,
+                            "intercept": 0,
+                            "max_rate_hz": 20,
+                        }
+                    ]
+                }
+            },
+        }
+    )
+    target = RecordingTarget()
+    device = SlowDevice([[abs_event(ecodes.ABS_X, 1)], [abs_event(ecodes.ABS_X, 2)], [abs_event(ecodes.ABS_X, 3)]], config=config)
+
+    # when
+    await EventLoop(device=device, mapper=CompiledEvdevToTopologyMapper(config=config), target=target).create_task()
+
+    # then the first value is sent at once, the second is replaced by the third, which is sent when the rate limit allows it
+    assert [[signal.value for signal in batch] for batch in target.batches] == [[1], [3]]
+    assert target.sent_at[1] - target.sent_at[0] == pytest.approx(0.05, abs=0.02)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_latency_is_recorded_per_stage() -> None:
+    # given
+    sec, usec = divmod(int(1_000_000 * (time.time() - 0.002)), 1_000_000)
+    events = [DeviceEvent(device_name=WHEEL, event=InputEvent(sec, usec, ecodes.EV_ABS, ecodes.ABS_X, 100))]
+    device = TimestampedListDevice(events + [syn_event()])
+    stats = PipelineStats(report_interval_s=0)
+
+    # when
+    await EventLoop(device=device, mapper=EvdevToTopologyMapper(config=device.config), target=RecordingTarget(), stats=stats).create_task()
+
+    # then
+    report = stats.report()
+    assert {stage: summary["count"] for stage, summary in report.items()} == {"read": 1, "map": 1, "send": 1, "total": 1}
+    assert report["total"]["max_ms"] >= report["read"]["max_ms"] >= 2
+    assert sum(report["total"]["histogram"].values()) == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_are_served_as_json() -> None:
+    # given
+    stats = PipelineStats(report_interval_s=0, port=0)
+    stats.record(event_at=1.0, read_at=1.001, mapped_at=1.0015, sent_at=1.003)
+    await stats.start()
+    assert stats._server is not None
+    host, port = stats._server.sockets[0].getsockname()[:2]
+
+    try:
+        # when
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"GET /stats HTTP/1.0\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+    finally:
+        await stats.stop()
+
+    # then
+    headers, body = response.split(b"\r\n\r\n", 1)
+    assert headers.startswith(b"HTTP/1.0 200 OK")
+    assert json.loads(body)["total"]["p50_ms"] == pytest.approx(3.0)
+
+
+class SlowTarget(RecordingTarget):
+    async def send_batch(self, output_events: Sequence[Any]) -> None:
+        await asyncio.sleep(0.02)
+        await super().send_batch(output_events)
+
+
+@pytest.mark.asyncio
+async def test_slow_target_does_not_block_reading_and_skips_stale_values() -> None:
+    # given
+    device = SlowDevice([[abs_event(ecodes.ABS_X, value)] for value in range(1, 101)], config=read_config(Path("config/moza.json")))
+    target = SlowTarget()
+    loop = EventLoop(device=device, mapper=EvdevToTopologyMapper(config=device.config), target=target)
+
+    # when
+    await loop.create_task()
+
+    # then every value is either sent or replaced by a newer one before it was sent, and the last value is always sent
+    values = [signal.value for batch in target.batches for signal in batch]
+    assert len(target.batches) < 50
+    assert len(values) + loop.coalesced == 100
+    assert values[-1] == pytest.approx(100 * 0.01345)
+    assert values == sorted(values)
+
+
+class GateTarget(RecordingTarget):
+    """Blocks the first batch until the gate opens, like a broker that stalls in update_signals."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.gate = asyncio.Event()
+
+    async def send_batch(self, output_events: Sequence[Any]) -> None:
+        await self.gate.wait()
+        await super().send_batch(output_events)
+
+
+def key_event(code: int, value: int) -> DeviceEvent:
+    return DeviceEvent(device_name=WHEEL, event=InputEvent(0, 0, ecodes.EV_KEY, code, value))
+
+
+@pytest.mark.asyncio
+async def test_button_press_and_release_are_sent_in_order_while_the_target_is_blocked() -> None:
+    # given
+    hazard = 643
+    packets = [[abs_event(ecodes.ABS_X, 100)], [key_event(hazard, 1)], [abs_event(ecodes.ABS_X, 200)], [key_event(hazard, 0)]]
+    packets += [[abs_event(ecodes.ABS_X, 300)]]
+    device = SlowDevice(packets, config=read_config(Path("config/moza.json")))
+    target = GateTarget()
+    loop = EventLoop(device=device, mapper=CompiledEvdevToTopologyMapper(config=device.config), target=target)
+
+    # when the target is blocked on the first value while the button is pressed and released
+    task = loop.create_task()
+    await asyncio.sleep(0.05)
+    target.gate.set()
+    await task
+
+    # then the axis values in between are replaced by the latest one, but both edges of the button are sent, in separate batches
+    batches = [[(signal.signal_id.split(".")[0], signal.value) for signal in batch] for batch in target.batches]
+    assert batches == [
+        [("SteeringAngle", pytest.approx(100 * 0.01345))],
+        [("HazardLightButton", 1)],
+        [("HazardLightButton", 0), ("SteeringAngle", pytest.approx(300 * 0.01345))],
+    ]
+    assert loop.coalesced == 1
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Sequence
+
+import pytest
+
+from sccm.adapters.compiled_mapper import CompiledEvdevToTopologyMapper
+from sccm.adapters.evdev_to_topology_mapper import Signal
+from sccm.adapters.fanout import FanoutTarget
+from sccm.adapters.signal_log import SignalLog
+from sccm.config import read_config
+from sccm.target import Target
+
+
+class SlowTarget(Target):
+    def __init__(self, delay_s: float = 0.0, fail: int = 0) -> None:
+        self.delay_s = delay_s
+        self.fail = fail
+        self.batches: list[list[Any]] = []
+        self.entered = 0
+        self.exited = 0
+
+    async def __aenter__(self) -> SlowTarget:
+        self.entered += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        self.exited += 1
+
+    async def send(self, output_event: Any) -> None:
+        await self.send_batch([output_event])
+
+    async def send_batch(self, output_events: Sequence[Any]) -> None:
+        await asyncio.sleep(self.delay_s)
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError("broker gone")
+        self.batches.append(list(output_events))
+
+
+MAPPER = CompiledEvdevToTopologyMapper(config=read_config(Path("config/moza.json")))
+
+
+def steering(value: float) -> Signal:
+    return Signal("SCCM", "SteeringAngle.SteeringAngle", value)
+
+
+def hazard(value: int) -> Signal:
+    return Signal("SCCM", "HazardLightButton.HazardLightButton", value)
+
+
+@pytest.mark.asyncio
+async def test_slow_target_does_not_delay_other_targets() -> None:
+    # given
+    fast, slow = SlowTarget(), SlowTarget(delay_s=0.05)
+
+    # when
+    async with FanoutTarget([fast, slow], mapper=MAPPER) as fanout:
+        for value in range(5):
+            await fanout.send_batch([steering(value)])
+            await asyncio.sleep(0.001)
+
+        # then the fast target has everything while the slow one is still busy with its first batch
+        assert fast.batches == [[steering(value)] for value in range(5)]
+        assert slow.batches == []
+
+    # and the slow target got its first value and then the latest one
+    assert slow.batches == [[steering(0)], [steering(4)]]
+    assert fast.entered == fast.exited == slow.entered == slow.exited == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_target_gets_every_button_edge_in_order() -> None:
+    # given
+    slow = SlowTarget(delay_s=0.02)
+
+    # when
+    async with FanoutTarget([slow], mapper=MAPPER) as fanout:
+        for batch in [[steering(0)], [hazard(1)], [steering(1)], [hazard(0)], [steering(2)]]:
+            await fanout.send_batch(batch)
+            await asyncio.sleep(0.001)
+
+    # then the press and the release are sent in separate batches, and the steering values in between are replaced by the latest
+    assert slow.batches == [[steering(0)], [hazard(1)], [hazard(0), steering(2)]]
+
+
+@pytest.mark.asyncio
+async def test_drop_newest_keeps_the_queued_events() -> None:
+    # given
+    slow = SlowTarget(delay_s=0.02)
+
+    # when
+    async with FanoutTarget([slow], mapper=MAPPER, max_queued=2, drop_policy="drop_newest") as fanout:
+        for value in range(5):
+            await fanout.send_batch([hazard(value)])
+            await asyncio.sleep(0.001)
+
+    # then
+    assert slow.batches == [[hazard(0)], [hazard(1)], [hazard(2)]]
+
+
+@pytest.mark.asyncio
+async def test_failing_target_is_reconnected_without_failing_the_others() -> None:
+    # given
+    other, failing = SlowTarget(), SlowTarget(fail=1)
+
+    async with FanoutTarget([other, failing], mapper=MAPPER, reconnect_delay_s=0.01) as fanout:
+        # when
+        await fanout.send_batch([hazard(1)])
+        await asyncio.sleep(0.005)
+        await fanout.send_batch([hazard(0)])
+        await asyncio.sleep(0.05)
+
+        # then
+        assert fanout.failures == [0, 1]
+
+    assert other.batches == [[hazard(1)], [hazard(0)]]
+    assert failing.batches == [[hazard(0)]]
+    assert failing.entered == failing.exited == 2
+
+
+@pytest.mark.asyncio
+async def test_signal_log_writes_one_json_line_per_signal(tmp_path: Path) -> None:
+    # given
+    path = tmp_path / "signals.jsonl"
+
+    # when
+    async with SignalLog(path) as log:
+        await log.send_batch([Signal("SCCM", "SteeringAngle.SteeringAngle", 1.5), Signal("SCCM", "Turn.Indicator", 2)])
+
+    # then
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(line["signal"], line["value"]) for line in lines] == [("SteeringAngle.SteeringAngle", 1.5), ("Turn.Indicator", 2)]